@@ -75,7 +75,9 @@ class AnalyticsAgent(BaseAgent):
                     "conversion_rate_minimum": 2.0,
                     "cost_per_acquisition_maximum": 50
                 },
-                "attribution_model": "last_click"
+                "attribution_model": "last_click",
+                # Calculs purs exécutés hors de la boucle d'événements
+                "process_pool_task_types": ["track_attribution", "cohort_analysis", "forecast"]
             }
         )
 
@@ -191,6 +193,8 @@ class AnalyticsAgent(BaseAgent):
 
         if task_type == "collect_data":
             return await self._collect_marketing_data(data)
+        elif task_type == "collect_campaign_data":
+            return await self._collect_campaign_data(data)
         elif task_type == "generate_report":
             return await self._generate_marketing_report(data)
         elif task_type == "analyze_campaign":
@@ -234,6 +238,32 @@ class AnalyticsAgent(BaseAgent):
             "collection_status": "success"
         }
 
+    async def _collect_campaign_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Collecte les métriques par canal d'une campagne (format orchestrateur, taux en ratio)"""
+        campaign_id = data.get("campaign_id")
+        channels = {}
+
+        for channel in data.get("channels", ["social_media", "email"]):
+            campaign_data = self._simulate_campaign_data(f"{campaign_id}_{channel}")
+            metrics = self._calculate_campaign_metrics(campaign_data)
+            channels[channel] = {
+                "impressions": metrics["impressions"],
+                "clicks": metrics["clicks"],
+                "conversions": metrics["conversions"],
+                "revenue": metrics["revenue"],
+                "cost": float(campaign_data["budget"]),
+                "ctr": metrics["ctr"] / 100,
+                "conversion_rate": metrics["conversion_rate"] / 100,
+                "cpc": metrics["cpc"],
+                "cpa": metrics["cpa"]
+            }
+
+        return {
+            "campaign_id": campaign_id,
+            "collection_timestamp": datetime.now().isoformat(),
+            "channels": channels
+        }
+
     async def _generate_marketing_report(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Génère un rapport marketing complet"""
         report_type = data.get("type", "monthly")  # daily, weekly, monthly, quarterly
@@ -11,7 +11,6 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
 import sys
 from pathlib import Path
 
@@ -19,9 +18,10 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.base_agent import BaseAgent, AgentTask
+from utils.records import record, record_to_dict
 from config.settings import COMPANY_INFO, API_KEYS
 
-@dataclass
+@record
 class PendingPost:
     """Structure pour un post en attente d'approbation"""
     id: str
@@ -47,6 +47,7 @@ class ApprovalWorkflowAgent(BaseAgent):
             config={
                 "approval_timeout_hours": 24,
                 "auto_reminder_hours": 12,
+                "expiry_sweep_interval": 900,  # Balayage des posts expirés (secondes)
                 "notification_email": "richard@ifiveme.com",  # Votre email
                 "approval_base_url": "https://approve.ifiveme.com",  # URL pour les actions
                 "smtp_settings": {
@@ -60,6 +61,11 @@ class ApprovalWorkflowAgent(BaseAgent):
         # Posts en attente d'approbation
         self.pending_posts: Dict[str, PendingPost] = {}
 
+        # Rappels, expirations et balayage exécutés par le planificateur partagé
+        self.scheduler.register("approval_workflow.reminder", self._reminder_job)
+        self.scheduler.register("approval_workflow.expire", self._expiry_job)
+        self.scheduler.register("approval_workflow.expiry_sweep", self._cleanup_expired_posts)
+
         # Templates d'emails d'approbation
         self.approval_email_templates = {
             "new_post_approval": {
@@ -407,6 +413,10 @@ L'équipe Marketing iFiveMe
 
             await self._notify_approval_result(post, "needs_revision", reason)
 
+        # Les rappels et l'expiration ne concernent plus ce post
+        if post.status != "pending":
+            self._cancel_post_jobs(post_id)
+
         # Sauvegarder les changements
         await self._save_approval_decision(post)
 
@@ -469,11 +479,47 @@ L'équipe Marketing iFiveMe
     async def _schedule_reminders(self, post: PendingPost):
         """Programme les rappels d'approbation"""
         reminder_time = post.created_at + timedelta(hours=self.config["auto_reminder_hours"])
+        expires_at = post.created_at + timedelta(hours=self.config["approval_timeout_hours"])
+
+        # Rappel manqué (redémarrage): envoyé une fois au démarrage, s'il n'a pas expiré
+        self.scheduler.schedule_at(
+            f"approval_reminder_{post.id}", "approval_workflow.reminder", reminder_time,
+            {"post_id": post.id}, misfire_policy="fire_once"
+        )
+        self.scheduler.schedule_at(
+            f"approval_expiry_{post.id}", "approval_workflow.expire", expires_at,
+            {"post_id": post.id}, misfire_policy="fire_once"
+        )
+        # Filet de sécurité pour les posts sans job (créés avant le planificateur)
+        self.scheduler.schedule_every(
+            "approval_expiry_sweep", "approval_workflow.expiry_sweep",
+            self.config["expiry_sweep_interval"], misfire_policy="skip", replace=False
+        )
 
-        # En production, utiliser un scheduler comme Celery
-        # Pour la démo, on simule
         self.logger.info(f"Rappel programmé pour {reminder_time} pour post {post.id}")
 
+    def _cancel_post_jobs(self, post_id: str):
+        """Annule le rappel et l'expiration d'un post traité"""
+        self.scheduler.cancel(f"approval_reminder_{post_id}")
+        self.scheduler.cancel(f"approval_expiry_{post_id}")
+
+    async def _reminder_job(self, payload: Dict[str, Any]):
+        """Job planifié: rappel d'approbation d'un post encore en attente"""
+        post = self.pending_posts.get(payload.get("post_id"))
+        if post is None or post.status != "pending":
+            return
+        expires_at = post.created_at + timedelta(hours=self.config["approval_timeout_hours"])
+        if datetime.now() < expires_at:
+            await self._send_reminder_email(post)
+
+    async def _expiry_job(self, payload: Dict[str, Any]):
+        """Job planifié: expiration d'un post resté sans réponse"""
+        post = self.pending_posts.get(payload.get("post_id"))
+        if post is None or post.status != "pending":
+            return
+        post.status = "expired"
+        await self._notify_post_expired(post)
+
     async def _send_approval_reminders(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Envoie les rappels pour posts en attente"""
         reminders_sent = 0
@@ -609,7 +655,7 @@ L'équipe Marketing iFiveMe
         try:
             decision_file = self.data_dir / f"approval_decision_{post.id}.json"
             with open(decision_file, 'w', encoding='utf-8') as f:
-                json.dump(asdict(post), f, indent=2, default=str, ensure_ascii=False)
+                json.dump(record_to_dict(post), f, indent=2, default=str, ensure_ascii=False)
         except Exception as e:
             self.logger.error(f"Erreur sauvegarde décision: {str(e)}")
 
@@ -641,13 +687,8 @@ async def submit_post_for_approval(
     await approval_agent.execute_tasks()
 
     # Récupérer le résultat
-    results = []
-    for file_path in approval_agent.data_dir.glob("task_*_result.json"):
-        with open(file_path, 'r') as f:
-            result = json.load(f)
-            if result.get("result"):
-                results.append(result["result"])
+    saved = await approval_agent.get_task_result(task.id)
 
     await approval_agent.stop()
 
-    return results[-1] if results else {"error": "Échec de soumission"}
\ No newline at end of file
+    return saved["result"] if saved and saved.get("result") else {"error": "Échec de soumission"}
\ No newline at end of file
@@ -7,12 +7,14 @@ import json
 import asyncio
 import smtplib
 import hashlib
+import random
+import uuid
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import sys
 from pathlib import Path
 
@@ -20,9 +22,12 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.base_agent import BaseAgent, AgentTask
+from utils.records import record, record_to_dict
+from utils.experimentation import get_experiment_engine
+from utils.rate_limiter import RateLimitExceeded, get_rate_limiter
 from config.settings import COMPANY_INFO, API_KEYS
 
-@dataclass
+@record
 class EmailContact:
     """Structure pour un contact email"""
     email: str
@@ -68,9 +73,15 @@ class EmailMarketingAgent(BaseAgent):
             config={
                 "smtp_server": "smtp.gmail.com",
                 "smtp_port": 587,
-                "max_emails_per_hour": 100,
+                "send_batch_size": 50,  # Emails par lot; le débit est limité par RATE_LIMITS["limits"]["email"]
+                "send_max_wait": 60,  # Attente max des jetons d'un lot avant de reprogrammer le reste (secondes)
                 "segment_size_limit": 1000,
-                "a_b_test_split": 0.1
+                "a_b_test_split": 0.1,
+                # Contre-pression: les producteurs attendent que la queue redescende à 400
+                "max_queue_size": 500,
+                "queue_low_watermark": 400,
+                "admission_policy": "wait",
+                "admission_timeout": 60
             }
         )
 
@@ -170,6 +181,10 @@ class EmailMarketingAgent(BaseAgent):
         self.contacts_db = []
         self.campaigns_history = []
 
+        # Envois limités par le débit: reste à envoyer par campagne, repris par le planificateur
+        self.pending_sends: Dict[str, Tuple[EmailCampaign, List[EmailContact]]] = {}
+        self.scheduler.register("email_marketing.resume_send", self._resume_send_job)
+
     def get_capabilities(self) -> List[str]:
         return [
             "Segmentation avancée des contacts",
@@ -239,8 +254,10 @@ class EmailMarketingAgent(BaseAgent):
 
         return {
             "campaign_id": campaign.id,
-            "status": "sent" if immediate else "scheduled",
+            "status": result["status"],
             "recipients": len(contacts),
+            "sent": result.get("sent", 0),
+            "retry_after": result.get("retry_after"),
             "segments": campaign.segments,
             "subject": campaign.subject,
             "send_time": campaign.send_time.isoformat(),
@@ -330,7 +347,7 @@ class EmailMarketingAgent(BaseAgent):
             "segment_name": segment_name,
             "criteria": criteria,
             "total_contacts": segment_size,
-            "sample_contacts": [asdict(c) for c in segment_contacts[:10]],
+            "sample_contacts": [record_to_dict(c) for c in segment_contacts[:10]],
             "segment_characteristics": {
                 "avg_engagement_score": sum(c.engagement_score for c in segment_contacts) / len(segment_contacts),
                 "active_percentage": len([c for c in segment_contacts if c.status == "active"]) / len(segment_contacts) * 100,
@@ -374,49 +391,117 @@ class EmailMarketingAgent(BaseAgent):
         }
 
     async def _run_ab_test(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Exécute un test A/B sur une campagne"""
+        """Exécute un test A/B séquentiel sur une campagne
+
+        Les envois partent par vagues; après chaque vague, le moteur
+        d'expérimentation met à jour les postérieures et réduit la part des
+        variantes perdantes. Le test s'arrête dès qu'un gagnant est probable.
+        """
         test_element = data.get("element", "subject_line")  # subject_line, cta, content, send_time
         variant_a = data.get("variant_a")
         variant_b = data.get("variant_b")
         sample_size = data.get("sample_size", 100)
         significance_level = data.get("significance_level", 0.05)
-
-        # Simuler les résultats du test A/B
-        results_a = self._simulate_variant_performance(variant_a, test_element)
-        results_b = self._simulate_variant_performance(variant_b, test_element)
-
-        # Calculer la signification statistique
-        is_significant = self._calculate_statistical_significance(
-            results_a, results_b, sample_size, significance_level
+        wave_size = data.get("wave_size", max(10, sample_size // 10))
+
+        engine = get_experiment_engine()
+        test_id = data.get("test_id") or f"abtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        # Un test_id fourni et déjà connu reprend l'expérience existante (signalé dans le résultat)
+        reused = engine.exists(test_id)
+        if reused and test_id not in engine.experiments:
+            summary = engine.summary(test_id)
+            return {
+                "test_id": test_id,
+                "element_tested": summary.get("metadata", {}).get("element", test_element),
+                "reused_existing": True,
+                "status": summary["status"],
+                "results": {"winner": summary["winner"], "is_statistically_significant": summary["is_significant"],
+                            "improvement": summary["improvement"]}
+            }
+        if reused:
+            self.logger.info(f"Test A/B {test_id} déjà existant: reprise de l'expérience")
+        engine.create(
+            test_id, ["A", "B"],
+            traffic_split=data.get("traffic_split"),
+            metric=data.get("success_metric", "open_rate"),
+            win_probability=1 - significance_level,
+            min_samples=data.get("min_samples", max(10, sample_size // 20)),
+            max_samples=sample_size,
+            metadata={"agent_id": self.agent_id, "element": test_element, "campaign_id": data.get("campaign_id")}
         )
 
-        winner = "A" if results_a["performance_score"] > results_b["performance_score"] else "B"
-        confidence = abs(results_a["performance_score"] - results_b["performance_score"]) / max(results_a["performance_score"], results_b["performance_score"]) * 100
+        # Résultats réels fournis ({"A": {"trials": .., "successes": ..}}) ou envois simulés par vagues
+        outcomes = data.get("outcomes")
+        if outcomes:
+            engine.record_events(
+                (test_id, variant, result["trials"], result["successes"]) for variant, result in outcomes.items()
+            )
+        elif not reused:
+            configs = {"A": variant_a, "B": variant_b}
+            while engine.experiments[test_id].status == "running":
+                sends = engine.assign(test_id, wave_size)
+                engine.record_events(
+                    (test_id, variant, count, self._simulate_variant_successes(configs[variant], test_element, count))
+                    for variant, count in sends.items() if count
+                )
+
+        summary = engine.summary(test_id)
+        winner = summary["leader"]
+        is_significant = summary["is_significant"]
 
         return {
-            "test_id": f"abtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "test_id": test_id,
             "element_tested": test_element,
-            "sample_size": sample_size,
+            "reused_existing": reused,
+            "status": summary["status"],
+            "sample_size": summary["total_trials"],
             "variants": {
-                "A": {
-                    "config": variant_a,
-                    "metrics": results_a
-                },
-                "B": {
-                    "config": variant_b,
-                    "metrics": results_b
-                }
+                "A": {"config": variant_a, "metrics": summary["variants"]["A"]},
+                "B": {"config": variant_b, "metrics": summary["variants"]["B"]}
             },
             "results": {
                 "winner": winner,
-                "confidence_level": confidence,
+                "confidence_level": summary["variants"][winner]["probability_best"] * 100,
                 "is_statistically_significant": is_significant,
-                "improvement": abs(results_a["performance_score"] - results_b["performance_score"]),
+                "improvement": summary["improvement"],
+                "sends_saved": max(0, sample_size - summary["total_trials"]),
                 "recommendation": f"Utiliser la variante {winner}" if is_significant else "Continuer le test"
             },
-            "next_actions": self._generate_ab_test_actions(results_a, results_b, is_significant)
+            "next_actions": (
+                [f"Déployer la variante {winner} sur le reste de la liste", "Tester un nouvel élément"]
+                if is_significant else
+                ["Augmenter la taille d'échantillon", "Tester des variantes plus contrastées"]
+            )
         }
 
+    def _simulate_variant_successes(self, config: Any, test_element: str, sends: int) -> int:
+        """Ouvertures simulées pour une vague d'envois (taux stable par variante)"""
+        seed = int(hashlib.md5(f"{test_element}:{config}".encode()).hexdigest()[:8], 16)
+        rate = 0.15 + (seed % 1000) / 1000 * 0.2
+        return sum(1 for _ in range(sends) if random.random() < rate)
+
+    def _get_recent_ab_tests(self, period: str) -> List[Dict[str, Any]]:
+        """Tests A/B de cet agent terminés sur la période ("30d")"""
+        since = datetime.now() - timedelta(days=int(period.rstrip("d")) if period.rstrip("d").isdigit() else 30)
+        engine = get_experiment_engine()
+        engine.evict_concluded()
+        results = []
+        summaries = [(experiment.metadata, engine.summary(experiment.id)) for experiment in engine.list_experiments()
+                     if experiment.status != "running"]
+        summaries.extend((summary.get("metadata", {}), summary) for summary in engine.archived.values())
+        for metadata, summary in summaries:
+            if metadata.get("agent_id") != self.agent_id:
+                continue
+            if datetime.fromisoformat(summary["created_at"]) < since:
+                continue
+            results.append({
+                "test_id": summary["experiment_id"],
+                "winner": summary["winner"],
+                "significant": summary["is_significant"],
+                "improvement": summary["improvement"]
+            })
+        return results
+
     async def _manage_contacts(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Gère les contacts (ajout, mise à jour, suppression)"""
         action = data.get("action", "add")  # add, update, remove, bulk_import
@@ -793,20 +878,65 @@ L'équipe iFiveMe
         try:
             campaign_file = self.data_dir / f"campaign_{campaign.id}.json"
             with open(campaign_file, 'w', encoding='utf-8') as f:
-                json.dump(asdict(campaign), f, indent=2, default=str, ensure_ascii=False)
+                json.dump(record_to_dict(campaign), f, indent=2, default=str, ensure_ascii=False)
         except Exception as e:
             self.logger.error(f"Erreur sauvegarde campagne: {str(e)}")
 
     async def _execute_campaign_send(self, campaign: EmailCampaign, contacts: List[EmailContact]) -> Dict[str, Any]:
-        """Exécute l'envoi réel d'une campagne (mode simulation)"""
-        # Simulation d'envoi
-        await asyncio.sleep(1)  # Simuler le temps d'envoi
+        """Exécute l'envoi réel d'une campagne (mode simulation)
+
+        Chaque lot attend ses jetons (limite partagée entre processus) puis part
+        aussitôt. Si un lot devrait attendre plus de send_max_wait secondes, le
+        reste est reprogrammé à la disponibilité des jetons au lieu de bloquer
+        un worker: le résultat porte alors "partially_sent" et retry_after.
+        """
+        limiter = get_rate_limiter()
+        batch_size = self.config["send_batch_size"]
+        sent = 0
+        for start in range(0, len(contacts), batch_size):
+            batch = contacts[start:start + batch_size]
+            try:
+                await limiter.acquire("email", "send", tokens=len(batch), timeout=self.config["send_max_wait"])
+            except RateLimitExceeded as e:
+                return self._defer_campaign_send(campaign, contacts[start:], sent, e.wait)
 
+            await self._send_batch(campaign, batch)
+            sent += len(batch)
+
+        self.pending_sends.pop(campaign.id, None)
         metrics = self._generate_mock_campaign_metrics(campaign.id)
-        campaign.metrics = asdict(metrics)
+        campaign.metrics = record_to_dict(metrics)
         campaign.status = "sent"
 
-        return {"status": "sent", "metrics": asdict(metrics)}
+        return {"status": "sent", "sent": sent, "metrics": record_to_dict(metrics)}
+
+    async def _send_batch(self, campaign: EmailCampaign, batch: List[EmailContact]):
+        """Envoie un lot d'emails (simulation)"""
+        await asyncio.sleep(0.05)  # Simuler le temps d'envoi du lot
+
+    def _defer_campaign_send(self, campaign: EmailCampaign, remaining: List[EmailContact],
+                             sent: int, retry_after: float) -> Dict[str, Any]:
+        """Reprogramme le reste d'un envoi limité par le débit"""
+        campaign.status = "sending"
+        self.pending_sends[campaign.id] = (campaign, remaining)
+        # La file des envois en attente est propre au processus
+        self.scheduler.schedule_in(
+            f"email_send_{campaign.id}", "email_marketing.resume_send", retry_after,
+            {"campaign_id": campaign.id}, misfire_policy="fire_once", exclusive=False
+        )
+        self.logger.info(
+            f"Campagne {campaign.id}: {sent} emails envoyés, {len(remaining)} reprogrammés dans {retry_after:.0f}s"
+        )
+        return {"status": "partially_sent", "sent": sent, "remaining": len(remaining), "retry_after": round(retry_after, 1)}
+
+    async def _resume_send_job(self, payload: Dict[str, Any]):
+        """Job planifié: reprend l'envoi d'une campagne quand ses jetons sont disponibles"""
+        pending = self.pending_sends.pop(payload["campaign_id"], None)
+        if pending is None:
+            return
+        campaign, remaining = pending
+        await self._execute_campaign_send(campaign, remaining)
+        await self._save_campaign_data(campaign)
 
     async def _schedule_campaign(self, campaign: EmailCampaign, contacts: List[EmailContact]) -> Dict[str, Any]:
         """Programme une campagne pour envoi ultérieur"""
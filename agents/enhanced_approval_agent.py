@@ -411,13 +411,8 @@ async def submit_for_web_approval(
     await approval_agent.execute_tasks()
 
     # Récupérer le résultat
-    results = []
-    for file_path in approval_agent.data_dir.glob("task_*_result.json"):
-        with open(file_path, 'r') as f:
-            result = json.load(f)
-            if result.get("result"):
-                results.append(result["result"])
+    saved = await approval_agent.get_task_result(task.id)
 
     await approval_agent.stop()
 
-    return results[-1] if results else {"error": "Échec de soumission"}
\ No newline at end of file
+    return saved["result"] if saved and saved.get("result") else {"error": "Échec de soumission"}
\ No newline at end of file
@@ -8,16 +8,16 @@ import asyncio
 import requests
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from dataclasses import dataclass, asdict
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.base_agent import BaseAgent, AgentTask
+from utils.records import record, record_to_dict
 from config.settings import API_KEYS
 
-@dataclass
+@record
 class DriveAsset:
     """Structure pour un asset Google Drive"""
     id: str
@@ -136,7 +136,7 @@ class GoogleDriveAgent(BaseAgent):
         return {
             "source": "drive_api",
             "assets_count": len(assets),
-            "assets": [asdict(asset) for asset in assets],
+            "assets": [record_to_dict(asset) for asset in assets],
             "fetched_at": self.cache_timestamp.isoformat(),
             "folder_url": self.config["base_drive_url"]
         }
@@ -282,7 +282,7 @@ class GoogleDriveAgent(BaseAgent):
             "category": category,
             "type": image_type,
             "results_count": len(matching_assets),
-            "results": [asdict(asset) for asset in matching_assets],
+            "results": [record_to_dict(asset) for asset in matching_assets],
             "searched_at": datetime.now().isoformat()
         }
 
@@ -539,7 +539,7 @@ class GoogleDriveAgent(BaseAgent):
 
         return {
             "image_id": image_id,
-            "original_image": asdict(image),
+            "original_image": record_to_dict(image),
             "channel": channel,
             "optimization_specs": channel_specs,
             "recommendations": [
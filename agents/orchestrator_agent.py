@@ -6,32 +6,38 @@ Agent principal qui coordonne toutes les activités marketing
 import asyncio
 import json
 import logging
+import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import uuid
 
 # Ajouter le répertoire parent au path pour les imports
 sys.path.append(str(Path(__file__).parent.parent))
 
-from utils.base_agent import BaseAgent, AgentTask, AgentMetrics
+from utils.base_agent import BaseAgent, AgentTask, AgentMetrics, AdmissionStatus
+from utils.agent_registry import LazyAgentRegistry
+from utils.records import record_to_dict
+from utils.rule_engine import RuleEngine
+from utils.dashboard import DashboardView, HealthProbeCache
+from utils.alert_store import AlertStore
+from utils.timeseries import TimeSeriesStore, PERIODS
+from utils.budget_optimizer import BudgetOptimizer
+from utils.experimentation import get_experiment_engine
+from utils.campaign_state import CampaignStateStore
+from utils.metrics import MetricsHTTPServer, start_metrics_server
 from config.settings import COMPANY_INFO, API_KEYS
 
-# Import des agents spécialisés
-try:
-    from agents.content_creator_agent import ContentCreatorAgent
-    from agents.social_media_agent import SocialMediaAgent
-    from agents.email_marketing_agent import EmailMarketingAgent
-    from agents.analytics_agent import AnalyticsAgent
-except ImportError:
-    # Mode dégradé si les agents ne sont pas disponibles
-    ContentCreatorAgent = None
-    SocialMediaAgent = None
-    EmailMarketingAgent = None
-    AnalyticsAgent = None
+# Agents spécialisés, importés et construits à la première tâche qui les concerne
+MARKETING_AGENT_SPECS = {
+    "content_creator": ("agents.content_creator_agent", "ContentCreatorAgent"),
+    "social_media": ("agents.social_media_agent", "SocialMediaAgent"),
+    "email_marketing": ("agents.email_marketing_agent", "EmailMarketingAgent"),
+    "analytics": ("agents.analytics_agent", "AnalyticsAgent")
+}
 
 class CampaignType(Enum):
     """Types de campagnes marketing"""
@@ -80,6 +86,26 @@ class MarketingCampaign:
     performance_data: Dict[str, Any] = None
     notes: str = ""
 
+_CAMPAIGN_DATETIME_FIELDS = ("start_date", "end_date", "created_at")
+
+def campaign_to_state(campaign: MarketingCampaign) -> Dict[str, Any]:
+    """Convertit une campagne en dict JSON (instantanés et journal de l'état persistant)"""
+    state = record_to_dict(campaign)
+    state["type"] = campaign.type.value
+    state["status"] = campaign.status.value
+    for field_name in _CAMPAIGN_DATETIME_FIELDS:
+        state[field_name] = getattr(campaign, field_name).isoformat()
+    return state
+
+def campaign_from_state(state: Dict[str, Any]) -> MarketingCampaign:
+    """Reconstruit une campagne à partir de campaign_to_state()"""
+    state = dict(state)
+    state["type"] = CampaignType(state["type"])
+    state["status"] = CampaignStatus(state["status"])
+    for field_name in _CAMPAIGN_DATETIME_FIELDS:
+        state[field_name] = datetime.fromisoformat(state[field_name])
+    return MarketingCampaign(**state)
+
 @dataclass
 class OrchestratorMetrics:
     """Métriques spécifiques à l'orchestrateur"""
@@ -108,83 +134,174 @@ class MarketingOrchestrator(BaseAgent):
                 "performance_check_interval": 300,  # 5 minutes
                 "crisis_detection_threshold": 0.2,
                 "auto_optimization": True,
-                "real_time_monitoring": True
+                "real_time_monitoring": True,
+                "channel_admission_timeout": 30,  # Attente max si la queue d'un agent est saturée
+                "agent_call_timeout": 10,  # Attente max des réponses des agents (fan-out)
+                "max_concurrent_monitoring": 10,  # Campagnes surveillées en parallèle
+                "dashboard_flush_interval": 10,  # Au plus une écriture du dashboard toutes les N secondes
+                "health_check_ttl": 60,  # Durée de validité d'un health check d'agent
+                "max_alerts": 1000,  # Alertes distinctes conservées (les plus anciennes sont évincées)
+                "alert_dedup_window": 3600,  # Une alerte répétée dans cette fenêtre incrémente son compteur
+                "history_max_points": 10_000,  # Points bruts conservés par série (les agrégats restent)
+                "channel_minimum_budget": {"social_media": 100.0, "email": 50.0, "content_marketing": 50.0},
+                "budget_elasticity": 0.5,  # Rendements décroissants des courbes de réponse budget -> revenu
+                "state_checkpoint_interval": 60,  # Instantané des campagnes modifiées toutes les N secondes
+                "state_wal_max_entries": 1000,  # Checkpoint anticipé si le journal dépasse cette taille
+                "fast_lane_task_types": ["crisis_management"],  # Hors queue, sur un worker réservé
+                "reserved_workers": 1,
+                "crisis_pause_below_priority": 5,  # Tâches suspendues chez les agents pendant une crise grave
+                "crisis_pause_duration": 1800,  # Reprise automatique après N secondes
+                "metrics_export_enabled": True,  # Export Prometheus démarré par create_marketing_orchestrator
+                "metrics_export_host": "127.0.0.1",
+                "metrics_export_port": 9108
             }
         )
 
         # Métriques spécialisées
         self.orchestrator_metrics = OrchestratorMetrics()
+        self.metrics_server: Optional[MetricsHTTPServer] = None
 
         # Storage des campagnes et agents
         self.campaigns: Dict[str, MarketingCampaign] = {}
         self.active_campaigns: Dict[str, MarketingCampaign] = {}
-        self.marketing_agents: Dict[str, BaseAgent] = {}
+        self.marketing_agents = LazyAgentRegistry(self.logger)
+
+        # État persistant des campagnes: instantanés + journal des mutations, rechargés au démarrage
+        self.campaign_state = CampaignStateStore(
+            self.data_dir / "campaign_state.db",
+            serialize=campaign_to_state,
+            deserialize=campaign_from_state,
+            wal_max_entries=self.config["state_wal_max_entries"]
+        )
+        self.restore_seconds = self._restore_campaign_state()
+
+        # État du dernier passage de monitoring par campagne (évaluation incrémentale)
+        self._monitoring_state: Dict[str, Dict[str, Any]] = {}
+
+        # Tâches de canal refusées par un agent saturé, à redistribuer au lancement
+        self.deferred_channel_tasks: Dict[str, List[Tuple[str, AgentTask]]] = {}
 
-        # Dashboard et monitoring
-        self.dashboard_data: Dict[str, Any] = {}
-        self.alerts: List[Dict[str, Any]] = []
-        self.performance_history: List[Dict[str, Any]] = []
+        # Dashboard (vue incrémentale en mémoire) et monitoring
+        self.dashboard = DashboardView(
+            self.data_dir / "dashboard_data.json",
+            flush_interval=self.config["dashboard_flush_interval"],
+            campaigns_key="performance_summary"
+        )
+        self.dashboard_data: Dict[str, Any] = self.dashboard.data
+        self.health_probes = HealthProbeCache(ttl=self.config["health_check_ttl"])
+        self.alerts = AlertStore(
+            max_alerts=self.config["max_alerts"],
+            dedup_window=self.config["alert_dedup_window"]
+        )
+        # Historique de performance par (campagne, canal, métrique), avec agrégats minute/heure/jour
+        self.performance_history = TimeSeriesStore(max_raw_points=self.config["history_max_points"])
+
+        # Réallocation budgétaire au ROI marginal, toutes campagnes et canaux confondus
+        self.budget_optimizer = BudgetOptimizer(
+            channel_minimums=self.config["channel_minimum_budget"],
+            max_concurrent_campaigns=self.config["max_concurrent_campaigns"],
+            elasticity=self.config["budget_elasticity"]
+        )
 
         # Configuration des règles d'automatisation
         self.automation_rules = self._initialize_automation_rules()
+        self.rule_engine = RuleEngine(self.automation_rules)
 
         # Templates de campagnes iFiveMe
         self.campaign_templates = self._initialize_campaign_templates()
 
-        # Initialiser les agents
-        asyncio.create_task(self._initialize_agents())
-
-    async def _initialize_agents(self):
-        """Initialise et configure tous les agents marketing"""
-        try:
-            # Content Creator Agent
-            if ContentCreatorAgent:
-                self.marketing_agents["content_creator"] = ContentCreatorAgent()
-                self.logger.info("Content Creator Agent initialisé")
-
-            # Social Media Agent
-            if SocialMediaAgent:
-                self.marketing_agents["social_media"] = SocialMediaAgent()
-                self.logger.info("Social Media Agent initialisé")
-
-            # Email Marketing Agent
-            if EmailMarketingAgent:
-                self.marketing_agents["email_marketing"] = EmailMarketingAgent()
-                self.logger.info("Email Marketing Agent initialisé")
-
-            # Analytics Agent
-            if AnalyticsAgent:
-                self.marketing_agents["analytics"] = AnalyticsAgent()
-                self.logger.info("Analytics Agent initialisé")
-
-            # Vérification de santé des agents
-            await self._health_check_all_agents()
-
-            self.logger.info(f"Orchestrateur initialisé avec {len(self.marketing_agents)} agents")
+        # Déclarer les agents (aucun import ni construction avant la première tâche)
+        self._initialize_agents()
+
+        # Jobs récurrents exécutés par le planificateur partagé
+        self.scheduler.register("orchestrator.performance_monitoring", self._run_monitoring_job)
+        self.scheduler.register("orchestrator.state_checkpoint", self._run_checkpoint_job)
+
+    def _restore_campaign_state(self) -> float:
+        """Recharge les campagnes du dernier instantané et rejoue le journal; retourne la durée"""
+        start = time.perf_counter()
+        campaigns, active_ids, replayed = self.campaign_state.load()
+        self.campaigns.update(campaigns)
+        self.active_campaigns.update({campaign_id: campaigns[campaign_id] for campaign_id in active_ids})
+        elapsed = time.perf_counter() - start
+
+        if campaigns:
+            self.orchestrator_metrics.campaigns_managed = len(self.campaigns)
+            self.orchestrator_metrics.active_campaigns = len(self.active_campaigns)
+            self.logger.info(
+                f"{len(campaigns)} campagnes restaurées ({len(active_ids)} actives, "
+                f"{replayed} mutations rejouées) en {elapsed * 1000:.0f} ms"
+            )
+        return elapsed
 
-        except Exception as e:
-            self.logger.error(f"Erreur lors de l'initialisation des agents: {str(e)}")
+    def _log_campaign_change(self, campaign: MarketingCampaign, op: str, *field_names: str):
+        """Journalise une mutation de campagne (état complet pour "create")"""
+        if op == "create":
+            changes = campaign_to_state(campaign)
+        else:
+            full_state = campaign_to_state(campaign)
+            changes = {field_name: full_state[field_name] for field_name in field_names}
+        changes["active"] = campaign.id in self.active_campaigns
+        self.campaign_state.log(campaign.id, op, changes)
+
+        if self.campaign_state.needs_checkpoint:
+            self.checkpoint_campaign_state()
+
+    def checkpoint_campaign_state(self) -> int:
+        """Écrit l'instantané des campagnes modifiées et tronque le journal"""
+        written = self.campaign_state.checkpoint(self.campaigns, self.active_campaigns)
+        if written:
+            self.logger.debug(f"Checkpoint de l'état: {written} campagnes écrites")
+        return written
+
+    async def _run_checkpoint_job(self, payload: Dict[str, Any]):
+        """Job planifié: checkpoint périodique de l'état des campagnes"""
+        self.checkpoint_campaign_state()
+
+    def _initialize_agents(self):
+        """Déclare les agents marketing dans le registre paresseux"""
+        for agent_name, (module_path, class_name) in MARKETING_AGENT_SPECS.items():
+            self.marketing_agents.register(agent_name, module_path, class_name)
+
+        self.logger.info(
+            f"Orchestrateur initialisé avec {len(MARKETING_AGENT_SPECS)} agents déclarés (chargement à la demande)"
+        )
 
     def _initialize_automation_rules(self) -> List[Dict[str, Any]]:
-        """Initialise les règles d'automatisation"""
+        """Initialise les règles d'automatisation
+
+        La condition est une expression sur les métriques de campagne (voir
+        _campaign_rule_metrics) et les paramètres de la règle; elle est compilée
+        une fois par le moteur de règles. Une règle avec "alert_type" génère une alerte.
+        """
         return [
             {
                 "name": "budget_alert",
                 "condition": "budget_spent > budget_threshold",
                 "action": "send_alert_and_pause_campaign",
-                "parameters": {"threshold": 0.8}
+                "parameters": {"budget_threshold": self.config.get("budget_threshold_alert", 0.8)},
+                "alert_type": "budget_alert",
+                "severity": "high",
+                "message": "Budget {budget_spent:.1%} dépensé pour la campagne {campaign_name}"
             },
             {
                 "name": "poor_performance_optimization",
                 "condition": "conversion_rate < minimum_threshold",
                 "action": "optimize_campaign_automatically",
-                "parameters": {"min_conversion_rate": 0.02}
+                "parameters": {"minimum_threshold": 0.02},
+                "alert_type": "performance_alert",
+                "severity": "medium",
+                "message": "Taux de conversion faible ({conversion_rate:.2%}) pour la campagne {campaign_name}"
             },
             {
                 "name": "crisis_detection",
                 "condition": "negative_sentiment > crisis_threshold",
                 "action": "activate_crisis_response",
-                "parameters": {"crisis_threshold": 0.3}
+                "crisis_type": "negative_sentiment",
+                "parameters": {"crisis_threshold": 0.3},
+                "alert_type": "crisis_alert",
+                "severity": "critical",
+                "message": "Sentiment négatif à {negative_sentiment:.0%} pour la campagne {campaign_name}"
             },
             {
                 "name": "high_performance_scaling",
@@ -265,8 +382,12 @@ class MarketingOrchestrator(BaseAgent):
                 return await self._handle_crisis(task_data)
             elif task_type == "ab_test_setup":
                 return await self._setup_ab_test(task_data)
+            elif task_type == "ab_test_results":
+                return await self._record_ab_test_results(task_data)
             elif task_type == "budget_reallocation":
                 return await self._reallocate_budget(task_data)
+            elif task_type == "portfolio_budget_optimization":
+                return await self._optimize_portfolio_budget(task_data)
             elif task_type == "performance_monitoring":
                 return await self._monitor_performance()
             else:
@@ -321,6 +442,7 @@ class MarketingOrchestrator(BaseAgent):
             # Stocker la campagne
             self.campaigns[campaign_id] = campaign
             self.orchestrator_metrics.campaigns_managed += 1
+            self._log_campaign_change(campaign, "create")
 
             # Créer les tâches pour chaque canal
             channel_tasks = await self._create_channel_tasks(campaign)
@@ -330,8 +452,9 @@ class MarketingOrchestrator(BaseAgent):
             return {
                 "success": True,
                 "campaign_id": campaign_id,
-                "campaign": asdict(campaign),
+                "campaign": record_to_dict(campaign),
                 "channel_tasks": channel_tasks,
+                "deferred_tasks": [task.id for _, task in self.deferred_channel_tasks.get(campaign_id, [])],
                 "message": f"Campagne '{campaign.name}' créée avec succès"
             }
 
@@ -354,7 +477,7 @@ class MarketingOrchestrator(BaseAgent):
         }
 
         # Si l'agent créateur de contenu est disponible, lui demander un plan détaillé
-        if "content_creator" in self.marketing_agents:
+        if self.marketing_agents.get("content_creator") is not None:
             try:
                 content_task = self.marketing_agents["content_creator"].create_task(
                     task_type="create_content_plan",
@@ -368,11 +491,15 @@ class MarketingOrchestrator(BaseAgent):
                         ).days,
                         "channels": campaign_data.get("channels", []),
                         "themes": content_plan["themes"]
-                    }
+                    },
+                    deduplicate=True
                 )
 
-                await self.marketing_agents["content_creator"].add_task(content_task)
-                # Note: Dans un vrai système, on attendrait la réponse
+                future = await self.marketing_agents["content_creator"].submit(content_task)
+                detailed_plan = await asyncio.wait_for(future, self.config["agent_call_timeout"])
+                if isinstance(detailed_plan, dict):
+                    content_plan["content_calendar"] = detailed_plan.get("content_calendar", content_plan["content_calendar"])
+                    content_plan["asset_requirements"] = detailed_plan.get("asset_requirements", content_plan["asset_requirements"])
 
             except Exception as e:
                 self.logger.warning(f"Impossible de créer le plan de contenu avec l'agent: {str(e)}")
@@ -386,7 +513,7 @@ class MarketingOrchestrator(BaseAgent):
         for channel in campaign.channels:
             tasks = []
 
-            if channel == "social_media" and "social_media" in self.marketing_agents:
+            if channel == "social_media" and self.marketing_agents.get("social_media") is not None:
                 # Tâches réseaux sociaux
                 social_task = self.marketing_agents["social_media"].create_task(
                     task_type="campaign_execution",
@@ -400,10 +527,10 @@ class MarketingOrchestrator(BaseAgent):
                         "duration": (campaign.end_date - campaign.start_date).days
                     }
                 )
-                await self.marketing_agents["social_media"].add_task(social_task)
-                tasks.append(social_task.id)
+                if await self._dispatch_channel_task(campaign.id, "social_media", social_task):
+                    tasks.append(social_task.id)
 
-            if channel == "email" and "email_marketing" in self.marketing_agents:
+            if channel == "email" and self.marketing_agents.get("email_marketing") is not None:
                 # Tâches email marketing
                 email_task = self.marketing_agents["email_marketing"].create_task(
                     task_type="campaign_setup",
@@ -416,13 +543,42 @@ class MarketingOrchestrator(BaseAgent):
                         "objectives": campaign.objectives
                     }
                 )
-                await self.marketing_agents["email_marketing"].add_task(email_task)
-                tasks.append(email_task.id)
+                if await self._dispatch_channel_task(campaign.id, "email_marketing", email_task):
+                    tasks.append(email_task.id)
 
             channel_tasks[channel] = tasks
 
         return channel_tasks
 
+    async def _dispatch_channel_task(self, campaign_id: str, agent_name: str, task: AgentTask,
+                                     policy: str = "wait") -> bool:
+        """Soumet une tâche de canal en respectant la contre-pression de l'agent
+
+        Si l'agent refuse la tâche (queue saturée), elle est mise de côté pour
+        être redistribuée au lancement de la campagne au lieu d'être perdue.
+        """
+        status = await self.marketing_agents[agent_name].admit_task(
+            task, policy=policy, timeout=self.config["channel_admission_timeout"]
+        )
+        if status is AdmissionStatus.ACCEPTED:
+            return True
+
+        task.status = "pending"
+        self.deferred_channel_tasks.setdefault(campaign_id, []).append((agent_name, task))
+        self.logger.warning(
+            f"Tâche {task.id} différée pour la campagne {campaign_id}: {agent_name} saturé ({status.value})"
+        )
+        return False
+
+    async def _redispatch_deferred_tasks(self, campaign_id: str) -> Dict[str, int]:
+        """Resoumet sans attendre les tâches de canal différées d'une campagne"""
+        deferred = self.deferred_channel_tasks.pop(campaign_id, [])
+        dispatched = 0
+        for agent_name, task in deferred:
+            if await self._dispatch_channel_task(campaign_id, agent_name, task, policy="reject"):
+                dispatched += 1
+        return {"dispatched": dispatched, "still_deferred": len(deferred) - dispatched}
+
     async def _launch_campaign(self, launch_data: Dict[str, Any]) -> Dict[str, Any]:
         """Lance une campagne et coordonne tous les agents"""
         campaign_id = launch_data.get("campaign_id")
@@ -447,11 +603,15 @@ class MarketingOrchestrator(BaseAgent):
             campaign.status = CampaignStatus.RUNNING
             self.active_campaigns[campaign_id] = campaign
             self.orchestrator_metrics.active_campaigns += 1
+            self._log_campaign_change(campaign, "launch", "status")
 
             # Lancer tous les agents concernés
             launch_results = {}
+            if campaign_id in self.deferred_channel_tasks:
+                launch_results["deferred_tasks"] = await self._redispatch_deferred_tasks(campaign_id)
+
             for channel in campaign.channels:
-                if channel == "social_media" and "social_media" in self.marketing_agents:
+                if channel == "social_media" and self.marketing_agents.get("social_media") is not None:
                     # Démarrer la campagne social media
                     social_launch_task = self.marketing_agents["social_media"].create_task(
                         task_type="launch_campaign",
@@ -461,7 +621,7 @@ class MarketingOrchestrator(BaseAgent):
                     await self.marketing_agents["social_media"].add_task(social_launch_task)
                     launch_results["social_media"] = "launched"
 
-                if channel == "email" and "email_marketing" in self.marketing_agents:
+                if channel == "email" and self.marketing_agents.get("email_marketing") is not None:
                     # Démarrer la campagne email
                     email_launch_task = self.marketing_agents["email_marketing"].create_task(
                         task_type="start_campaign",
@@ -486,6 +646,7 @@ class MarketingOrchestrator(BaseAgent):
 
         except Exception as e:
             campaign.status = CampaignStatus.FAILED
+            self._log_campaign_change(campaign, "fail", "status")
             self.logger.error(f"Erreur lors du lancement de la campagne {campaign_id}: {str(e)}")
             raise
 
@@ -507,7 +668,7 @@ class MarketingOrchestrator(BaseAgent):
         # Vérifier les agents nécessaires
         for channel in campaign.channels:
             agent_key = channel.replace("_marketing", "").replace("_media", "_media")
-            if agent_key not in self.marketing_agents:
+            if self.marketing_agents.get(agent_key) is None:
                 issues.append(f"Agent pour le canal {channel} non disponible")
 
         # Vérifier le contenu
@@ -525,22 +686,55 @@ class MarketingOrchestrator(BaseAgent):
 
     async def _start_campaign_monitoring(self, campaign_id: str):
         """Démarre le monitoring temps réel d'une campagne"""
+        # Checkpoint périodique de l'état des campagnes (un seul job pour l'orchestrateur)
+        self.scheduler.schedule_every(
+            "orchestrator_state_checkpoint",
+            "orchestrator.state_checkpoint",
+            self.config["state_checkpoint_interval"],
+            misfire_policy="skip",
+            replace=False,
+            exclusive=False  # Chaque processus écrit ses propres mutations
+        )
+
         if not self.config.get("real_time_monitoring", True):
             return
 
-        # Créer une tâche de monitoring récurrente
+        # Un seul job récurrent surveille toutes les campagnes actives à chaque passage
+        interval = self.config.get("performance_check_interval", 300)
+        self.scheduler.schedule_every(
+            "orchestrator_performance_monitoring",
+            "orchestrator.performance_monitoring",
+            interval,
+            payload={"interval": interval},
+            jitter=interval * 0.05,
+            misfire_policy="skip",
+            replace=False
+        )
+
+        self.logger.info(f"Monitoring démarré pour la campagne {campaign_id}")
+
+    async def _run_monitoring_job(self, payload: Dict[str, Any]):
+        """Job planifié: lance un passage de monitoring tant que des campagnes sont actives"""
+        if not self.active_campaigns:
+            self.scheduler.cancel("orchestrator_performance_monitoring")
+            self.logger.info("Plus de campagne active: monitoring récurrent arrêté")
+            return
+
+        # Un passage ne doit pas déborder sur le suivant: échéance = intervalle
+        interval = payload.get("interval", self.config.get("performance_check_interval", 300))
         monitoring_task = self.create_task(
             task_type="performance_monitoring",
             priority=3,
-            data={
-                "campaign_id": campaign_id,
-                "interval": self.config.get("performance_check_interval", 300)
-            }
+            data={"interval": interval},
+            timeout=interval
         )
+        future = await self.submit(monitoring_task)
+        future.add_done_callback(self._log_monitoring_outcome)
 
-        await self.add_task(monitoring_task)
-
-        self.logger.info(f"Monitoring démarré pour la campagne {campaign_id}")
+    def _log_monitoring_outcome(self, future: asyncio.Future):
+        """Consulte l'issue d'un passage de monitoring: un échec est journalisé, pas perdu"""
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.warning(f"Passage de monitoring en échec: {future.exception()}")
 
     async def _optimize_campaign(self, optimization_data: Dict[str, Any]) -> Dict[str, Any]:
         """Optimise automatiquement une campagne basée sur les performances"""
@@ -552,11 +746,14 @@ class MarketingOrchestrator(BaseAgent):
         campaign = self.active_campaigns[campaign_id]
 
         try:
-            # Collecter les données de performance
-            performance_data = await self._collect_performance_data(campaign_id)
+            # Réutiliser les données et l'analyse du passage de monitoring s'il les fournit
+            performance_data = optimization_data.get("performance_data")
+            if performance_data is None:
+                performance_data = await self._collect_performance_data(campaign_id)
 
-            # Analyser les performances
-            analysis = await self._analyze_campaign_performance(campaign, performance_data)
+            analysis = optimization_data.get("analysis")
+            if analysis is None:
+                analysis = await self._analyze_campaign_performance(campaign, performance_data)
 
             # Générer des recommandations d'optimisation
             optimizations = await self._generate_optimization_recommendations(campaign, analysis)
@@ -572,6 +769,7 @@ class MarketingOrchestrator(BaseAgent):
                 "optimization_analysis": analysis,
                 "applied_optimizations": applied_optimizations
             })
+            self._log_campaign_change(campaign, "update", "performance_data")
 
             self.logger.info(f"Campagne {campaign_id} optimisée avec {len(applied_optimizations)} modifications")
 
@@ -588,50 +786,129 @@ class MarketingOrchestrator(BaseAgent):
             self.logger.error(f"Erreur lors de l'optimisation de la campagne {campaign_id}: {str(e)}")
             raise
 
+    async def _call_agents(self, calls: Dict[str, Tuple[str, str, Dict[str, Any]]],
+                           timeout: Optional[float] = None, priority: int = 7) -> Dict[str, Any]:
+        """Appelle plusieurs agents en parallèle et rassemble leurs résultats
+
+        calls associe un nom d'appel à (agent, type de tâche, données). Le résultat
+        associe chaque appel à la réponse de l'agent, ou à l'exception obtenue
+        (TimeoutError si l'agent n'a pas répondu à temps). Les agents absents sont ignorés.
+        L'attente totale est bornée par timeout: elle dure autant que l'agent le plus lent.
+        """
+        timeout = timeout if timeout is not None else self.config["agent_call_timeout"]
+        futures: Dict[str, asyncio.Future] = {}
+
+        for call_name, (agent_name, task_type, data) in calls.items():
+            agent = self.marketing_agents.get(agent_name)
+            if agent is None:
+                continue
+            # Lectures de données: appels simultanés partagés, mais jamais servis depuis le
+            # cache (la clé ne dépend que de la campagne, chaque passage veut des données fraîches)
+            task = agent.create_task(task_type, priority, data, deduplicate=True, timeout=timeout,
+                                     cache_result=False)
+            # Pas d'attente sur une queue saturée: l'appelant dispose d'un repli
+            futures[call_name] = await agent.submit(task, policy="reject")
+
+        if futures:
+            await asyncio.wait(futures.values(), timeout=timeout)
+
+        results = {}
+        for call_name, future in futures.items():
+            if not future.done():
+                # La tâche continue; son issue ne sera plus consultée
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                results[call_name] = asyncio.TimeoutError(f"{call_name}: pas de réponse en {timeout}s")
+            elif future.exception() is not None:
+                results[call_name] = future.exception()
+            else:
+                results[call_name] = future.result()
+        return results
+
     async def _collect_performance_data(self, campaign_id: str) -> Dict[str, Any]:
         """Collecte les données de performance de tous les canaux"""
         performance_data = {
             "campaign_id": campaign_id,
             "timestamp": datetime.now().isoformat(),
-            "channels": {}
+            "channels": {},
+            "sources": {}
         }
 
-        # Collecter les données de l'agent analytics si disponible
-        if "analytics" in self.marketing_agents:
-            analytics_task = self.marketing_agents["analytics"].create_task(
-                task_type="collect_campaign_data",
-                priority=7,
-                data={"campaign_id": campaign_id}
-            )
-            await self.marketing_agents["analytics"].add_task(analytics_task)
-            # Note: Dans un vrai système, on attendrait la réponse
+        campaign = self.campaigns.get(campaign_id)
+        channels = campaign.channels if campaign else ["social_media", "email"]
+
+        # Interroger analytics et les agents de canal en parallèle
+        calls = {"analytics": ("analytics", "collect_campaign_data", {"campaign_id": campaign_id, "channels": channels})}
+        if "social_media" in channels:
+            calls["social_media"] = ("social_media", "analyze_performance", {"campaign_id": campaign_id})
+        if "email" in channels:
+            calls["email"] = ("email_marketing", "analyze_campaign", {"campaign_id": campaign_id})
+
+        results = await self._call_agents(calls)
+        for call_name in calls:
+            result = results.get(call_name)
+            if result is None:
+                performance_data["sources"][call_name] = "unavailable"
+            elif isinstance(result, Exception):
+                performance_data["sources"][call_name] = "timeout" if isinstance(result, asyncio.TimeoutError) else "error"
+                self.logger.warning(f"Données {call_name} indisponibles pour {campaign_id}: {str(result)}")
+            else:
+                performance_data["sources"][call_name] = "ok"
 
-            # Données simulées pour la démonstration
+        analytics = results.get("analytics")
+        if isinstance(analytics, dict):
             performance_data["channels"] = {
-                "social_media": {
-                    "impressions": 15000,
-                    "clicks": 750,
-                    "conversions": 45,
-                    "cost": 300.0,
-                    "ctr": 0.05,
-                    "conversion_rate": 0.06,
-                    "cpc": 0.4,
-                    "cpa": 6.67
-                },
-                "email": {
-                    "sent": 2000,
-                    "opened": 600,
-                    "clicked": 120,
-                    "conversions": 24,
-                    "cost": 150.0,
-                    "open_rate": 0.3,
-                    "click_rate": 0.06,
-                    "conversion_rate": 0.2
-                }
+                channel: dict(metrics) for channel, metrics in analytics.get("channels", {}).items()
             }
 
+        # Données simulées en repli pour les canaux sans réponse
+        simulated = self._simulated_channel_data()
+        for channel in ("social_media", "email"):
+            if channel in channels and channel not in performance_data["channels"]:
+                performance_data["channels"][channel] = dict(simulated[channel])
+
+        # Compléter avec les métriques propres aux agents de canal
+        social = results.get("social_media")
+        if isinstance(social, dict) and "social_media" in performance_data["channels"]:
+            for metric, value in social.get("total_metrics", {}).items():
+                performance_data["channels"]["social_media"].setdefault(metric, value)
+
+        email = results.get("email")
+        if isinstance(email, dict) and "email" in performance_data["channels"]:
+            email_metrics = email.get("metrics", {})
+            performance_data["channels"]["email"].update({
+                "sent": email_metrics.get("sent", 0),
+                "delivered": email_metrics.get("delivered", 0),
+                "open_rate": email_metrics.get("open_rate", 0) / 100,
+                "click_rate": email_metrics.get("click_rate", 0) / 100
+            })
+
         return performance_data
 
+    def _simulated_channel_data(self) -> Dict[str, Dict[str, Any]]:
+        """Données de démonstration utilisées quand un agent ne répond pas"""
+        return {
+            "social_media": {
+                "impressions": 15000,
+                "clicks": 750,
+                "conversions": 45,
+                "cost": 300.0,
+                "ctr": 0.05,
+                "conversion_rate": 0.06,
+                "cpc": 0.4,
+                "cpa": 6.67
+            },
+            "email": {
+                "sent": 2000,
+                "opened": 600,
+                "clicked": 120,
+                "conversions": 24,
+                "cost": 150.0,
+                "open_rate": 0.3,
+                "click_rate": 0.06,
+                "conversion_rate": 0.2
+            }
+        }
+
     async def _analyze_campaign_performance(self, campaign: MarketingCampaign, performance_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyse les performances de campagne"""
         analysis = {
@@ -771,7 +1048,7 @@ class MarketingOrchestrator(BaseAgent):
                 elif optimization["type"] == "channel_optimization":
                     # Optimisation de canal
                     channel = optimization["channel"]
-                    if channel in self.marketing_agents:
+                    if self.marketing_agents.get(channel) is not None:
                         opt_task = self.marketing_agents[channel].create_task(
                             task_type="optimize_performance",
                             priority=9,
@@ -809,63 +1086,126 @@ class MarketingOrchestrator(BaseAgent):
         campaign = self.active_campaigns[campaign_id]
 
         try:
-            # Analyser les performances actuelles pour déterminer la réallocation
-            performance_data = await self._collect_performance_data(campaign_id)
+            # Dernières performances observées (historique, ou collecte si la campagne n'a pas été surveillée)
+            performance = await self._channel_cost_inputs(campaign)
 
-            # Calculer les nouveaux allocations basées sur les performances
-            new_allocation = {}
-            total_budget = campaign.budget
-
-            # Identifier le canal le plus performant (ROI le plus élevé)
+            # Meilleur canal observé (ROI le plus élevé), conservé pour le suivi
             best_channel = None
             best_roi = 0
-
-            for channel, data in performance_data.get("channels", {}).items():
-                conversions = data.get("conversions", 0)
-                cost = data.get("cost", 1)  # Éviter division par zéro
-                roi = (conversions * 25 - cost) / cost if cost > 0 else 0
-
+            for channel, data in performance.items():
+                cost = data.get("cost", 0)
+                roi = (data.get("conversions", 0) * 25 - cost) / cost if cost > 0 else 0
                 if roi > best_roi:
                     best_roi = roi
                     best_channel = channel
 
-            # Réallouer 20% du budget vers le meilleur canal
-            if best_channel:
-                reallocation_amount = total_budget * 0.2
-
-                for channel in campaign.channels:
-                    current_allocation = campaign.allocated_budget.get(channel, 0)
-
-                    if channel == best_channel:
-                        new_allocation[channel] = current_allocation + reallocation_amount
-                    else:
-                        # Réduire proportionnellement les autres canaux
-                        reduction = reallocation_amount / (len(campaign.channels) - 1)
-                        new_allocation[channel] = max(0, current_allocation - reduction)
-
-                # Mettre à jour la campagne
-                campaign.allocated_budget = new_allocation
-
-                self.logger.info(f"Budget réalloué pour la campagne {campaign_id}")
-
-                return {
-                    "success": True,
-                    "campaign_id": campaign_id,
-                    "previous_allocation": campaign.allocated_budget,
-                    "new_allocation": new_allocation,
-                    "best_performing_channel": best_channel,
-                    "message": "Budget réalloué avec succès"
-                }
-            else:
+            if not best_channel:
                 return {
                     "success": False,
                     "message": "Impossible de déterminer le meilleur canal pour la réallocation"
                 }
 
+            # Même solveur que le portefeuille, limité aux canaux de cette campagne
+            result = self.budget_optimizer.optimize(
+                {campaign_id: performance}, campaign.budget, {campaign_id: campaign.channels}
+            )
+            previous_allocation = dict(campaign.allocated_budget)
+            new_allocation = result.allocations[campaign_id]
+
+            # Mettre à jour la campagne
+            campaign.allocated_budget = new_allocation
+            self._log_campaign_change(campaign, "budget", "allocated_budget")
+
+            self.logger.info(f"Budget réalloué pour la campagne {campaign_id}")
+
+            return {
+                "success": True,
+                "campaign_id": campaign_id,
+                "previous_allocation": previous_allocation,
+                "new_allocation": new_allocation,
+                "best_performing_channel": best_channel,
+                "expected_revenue": result.expected_revenue,
+                "message": "Budget réalloué avec succès"
+            }
+
         except Exception as e:
             self.logger.error(f"Erreur lors de la réallocation budgétaire: {str(e)}")
             raise
 
+    async def _optimize_portfolio_budget(self, optimization_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Réalloue le budget de toutes les campagnes actives en un seul calcul
+
+        Le budget total (par défaut la somme des budgets actifs) est réparti au
+        ROI marginal entre toutes les campagnes et tous leurs canaux, en
+        respectant les minimums par canal et max_concurrent_campaigns. Les
+        campagnes écartées par cette limite sont mises en pause avec leur
+        budget inchangé, pour pouvoir être reprises telles quelles.
+        """
+        campaigns = list(self.active_campaigns.values())
+        if not campaigns:
+            return {"success": False, "message": "Aucune campagne active à optimiser"}
+
+        try:
+            inputs = await asyncio.gather(*(self._channel_cost_inputs(campaign) for campaign in campaigns))
+            performance = {campaign.id: data for campaign, data in zip(campaigns, inputs)}
+            total_budget = optimization_data.get("total_budget", sum(campaign.budget for campaign in campaigns))
+
+            result = self.budget_optimizer.optimize(
+                performance, total_budget, {campaign.id: campaign.channels for campaign in campaigns}
+            )
+
+            previous_allocations = {campaign.id: dict(campaign.allocated_budget) for campaign in campaigns}
+            paused_campaigns = []
+            if optimization_data.get("apply", True):
+                for campaign in campaigns:
+                    allocation = result.allocations.get(campaign.id)
+                    if allocation is None:
+                        if campaign.status == CampaignStatus.RUNNING and await self.pause_campaign(campaign.id):
+                            paused_campaigns.append(campaign.id)
+                        continue
+                    campaign.allocated_budget = allocation
+                    campaign.budget = round(sum(allocation.values()), 2)
+                    self._log_campaign_change(campaign, "budget", "budget", "allocated_budget")
+
+            self.logger.info(
+                f"Budget de {len(result.allocations)} campagnes optimisé en {result.solve_seconds * 1000:.1f} ms "
+                f"({result.method})"
+            )
+
+            return {
+                "success": True,
+                "applied": optimization_data.get("apply", True),
+                "total_budget": total_budget,
+                "previous_allocations": previous_allocations,
+                "allocations": result.allocations,
+                "unfunded_campaigns": result.unfunded_campaigns,
+                "paused_campaigns": paused_campaigns,
+                "expected_revenue": result.expected_revenue,
+                "marginal_return": result.marginal_return,
+                "solve_ms": round(result.solve_seconds * 1000, 3),
+                "method": result.method
+            }
+
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'optimisation du budget global: {str(e)}")
+            raise
+
+    async def _channel_cost_inputs(self, campaign: MarketingCampaign) -> Dict[str, Dict[str, float]]:
+        """Dernier coût et dernières conversions par canal, lus dans l'historique de performance"""
+        if not self.performance_history.has_campaign(campaign.id):
+            performance_data = await self._collect_performance_data(campaign.id)
+            self._record_performance(campaign, performance_data)
+
+        inputs = {}
+        for channel in campaign.channels:
+            cost = self.performance_history.latest(campaign.id, channel, "cost")
+            if cost is not None:
+                inputs[channel] = {
+                    "cost": cost,
+                    "conversions": self.performance_history.latest(campaign.id, channel, "conversions") or 0.0
+                }
+        return inputs
+
     async def _monitor_performance(self) -> Dict[str, Any]:
         """Surveille les performances de toutes les campagnes actives"""
         monitoring_results = {
@@ -877,34 +1217,43 @@ class MarketingOrchestrator(BaseAgent):
         }
 
         try:
-            for campaign_id, campaign in self.active_campaigns.items():
-                # Collecter les données de performance
-                performance_data = await self._collect_performance_data(campaign_id)
+            # Campagnes surveillées en parallèle, dans la limite du sémaphore
+            semaphore = asyncio.Semaphore(self.config.get("max_concurrent_monitoring", 10))
+            campaigns = list(self.active_campaigns.values())
 
-                # Vérifier les règles d'alerte
-                alerts = await self._check_alert_rules(campaign, performance_data)
+            async def monitor(campaign: MarketingCampaign) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._monitor_campaign(campaign)
 
-                # Vérifier les règles d'optimisation automatique
-                if self.config.get("auto_optimization", True):
-                    optimizations = await self._check_optimization_triggers(campaign, performance_data)
+            outcomes = await asyncio.gather(*(monitor(campaign) for campaign in campaigns))
 
-                    if optimizations:
-                        await self._optimize_campaign({"campaign_id": campaign_id})
-                        monitoring_results["optimizations_triggered"] += 1
+            # Règles d'alerte évaluées en un lot pour les campagnes dont les métriques ont changé
+            batch_alerts = self._check_alert_rules_batch({
+                campaign.id: outcome["rule_metrics"]
+                for campaign, outcome in zip(campaigns, outcomes) if "rule_metrics" in outcome
+            })
+            for campaign, outcome in zip(campaigns, outcomes):
+                outcome["alerts"] = batch_alerts.get(campaign.id, [])
+                outcome["status"]["alerts"] = outcome["alerts"]
 
-                # Stocker les résultats
-                monitoring_results["campaign_status"][campaign_id] = {
-                    "status": campaign.status.value,
-                    "performance": performance_data,
-                    "alerts": alerts,
-                    "last_monitored": datetime.now().isoformat()
-                }
+            # Oublier l'état des campagnes qui ne sont plus actives
+            for campaign_id in set(self._monitoring_state) - set(self.active_campaigns):
+                del self._monitoring_state[campaign_id]
 
+            for campaign, outcome in zip(campaigns, outcomes):
+                # Stocker les résultats
+                monitoring_results["campaign_status"][campaign.id] = outcome["status"]
                 monitoring_results["campaigns_monitored"] += 1
-                monitoring_results["alerts_generated"] += len(alerts)
+                monitoring_results["alerts_generated"] += len(outcome["alerts"])
+                monitoring_results["optimizations_triggered"] += int(outcome["optimized"])
 
                 # Ajouter aux alertes globales
-                self.alerts.extend(alerts)
+                self.alerts.extend(outcome["alerts"])
+
+            # Règles de crise: réponse par la voie rapide, sans attendre la fin du monitoring
+            await self._escalate_crisis_alerts([
+                alert for outcome in outcomes for alert in outcome["alerts"] if "crisis_type" in alert
+            ])
 
             # Mettre à jour les données du dashboard
             await self._update_dashboard_data(monitoring_results)
@@ -917,58 +1266,166 @@ class MarketingOrchestrator(BaseAgent):
             self.logger.error(f"Erreur lors du monitoring des performances: {str(e)}")
             raise
 
-    async def _check_alert_rules(self, campaign: MarketingCampaign, performance_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Vérifie les règles d'alerte pour une campagne"""
-        alerts = []
+    async def _monitor_campaign(self, campaign: MarketingCampaign) -> Dict[str, Any]:
+        """Un passage de monitoring pour une campagne: collecte, analyse unique, règles incrémentales
 
-        # Calculer le budget dépensé
-        total_cost = sum(
-            channel_data.get("cost", 0)
-            for channel_data in performance_data.get("channels", {}).values()
-        )
+        Les règles ne sont réévaluées que si les métriques d'au moins un canal
+        ont changé depuis le passage précédent; les déclencheurs par canal ne
+        sont recalculés que pour les canaux modifiés.
+        """
+        outcome = {"alerts": [], "optimized": False}
 
-        budget_spent_ratio = total_cost / campaign.budget if campaign.budget > 0 else 0
+        try:
+            # Collecter les données de performance
+            performance_data = await self._collect_performance_data(campaign.id)
+            channels = performance_data.get("channels", {})
+            observed_at = time.time()
+
+            previous = self._monitoring_state.get(campaign.id, {})
+            previous_channels = previous.get("channels", {})
+            changed_channels = {
+                channel for channel, metrics in channels.items()
+                if previous_channels.get(channel) != metrics
+            }
 
-        # Alerte budget
-        if budget_spent_ratio > self.config.get("budget_threshold_alert", 0.8):
-            alerts.append({
-                "type": "budget_alert",
-                "severity": "high",
-                "message": f"Budget {budget_spent_ratio:.1%} dépensé pour la campagne {campaign.name}",
-                "campaign_id": campaign.id,
-                "timestamp": datetime.now().isoformat(),
-                "data": {"budget_spent": total_cost, "budget_total": campaign.budget}
-            })
+            if changed_channels or set(previous_channels) != set(channels):
+                # Une seule analyse par campagne et par passage
+                analysis = await self._analyze_campaign_performance(campaign, performance_data)
 
-        # Alerte performance faible
-        total_conversions = sum(
-            channel_data.get("conversions", 0)
-            for channel_data in performance_data.get("channels", {}).values()
-        )
+                # Les règles d'alerte sont évaluées en lot par _monitor_performance
+                outcome["rule_metrics"] = self._campaign_rule_metrics(campaign, performance_data, analysis)
+
+                # Vérifier les règles d'optimisation automatique
+                channel_triggers = dict(previous.get("channel_triggers", {}))
+                optimizations = []
+                if self.config.get("auto_optimization", True):
+                    optimizations = await self._check_optimization_triggers(
+                        campaign, performance_data, analysis, changed_channels, channel_triggers
+                    )
+                    if optimizations:
+                        await self._optimize_campaign({
+                            "campaign_id": campaign.id,
+                            "performance_data": performance_data,
+                            "analysis": analysis
+                        })
+                        outcome["optimized"] = True
 
-        conversion_rate = total_conversions / max(1, sum(
-            channel_data.get("clicks", 0)
-            for channel_data in performance_data.get("channels", {}).values()
-        ))
+                self._monitoring_state[campaign.id] = {
+                    "channels": {channel: dict(metrics) for channel, metrics in channels.items()},
+                    "channel_triggers": channel_triggers,
+                    "analysis": analysis
+                }
+            else:
+                self.logger.debug(f"Aucune métrique modifiée pour {campaign.id}: règles non réévaluées")
 
-        if conversion_rate < 0.02:  # Moins de 2% de conversion
-            alerts.append({
-                "type": "performance_alert",
-                "severity": "medium",
-                "message": f"Taux de conversion faible ({conversion_rate:.2%}) pour la campagne {campaign.name}",
+            self._record_performance(campaign, performance_data, outcome.get("rule_metrics"), observed_at)
+
+            outcome["status"] = {
+                "status": campaign.status.value,
+                "performance": performance_data,
+                "changed_channels": sorted(changed_channels),
+                "last_monitored": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            # Une campagne en erreur n'interrompt pas le passage de monitoring
+            self.logger.error(f"Erreur lors du monitoring de la campagne {campaign.id}: {str(e)}")
+            outcome["status"] = {
+                "status": campaign.status.value,
+                "error": str(e),
+                "last_monitored": datetime.now().isoformat()
+            }
+
+        return outcome
+
+    def _record_performance(self, campaign: MarketingCampaign, performance_data: Dict[str, Any],
+                            campaign_metrics: Optional[Dict[str, float]] = None, timestamp: Optional[float] = None):
+        """Ajoute une observation à l'historique: métriques par canal et agrégées (canal "campaign")"""
+        timestamp = timestamp or time.time()
+        if campaign_metrics is None:
+            campaign_metrics = self._campaign_rule_metrics(campaign, performance_data)
+        self.performance_history.record_channels(campaign.id, performance_data.get("channels", {}), timestamp)
+        self.performance_history.record_channels(campaign.id, {"campaign": campaign_metrics}, timestamp)
+
+    def _campaign_rule_metrics(self, campaign: MarketingCampaign, performance_data: Dict[str, Any],
+                               analysis: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        """Métriques de campagne lues par les conditions des règles d'automatisation"""
+        channels = performance_data.get("channels", {}).values()
+        total_cost = sum(channel_data.get("cost", 0) for channel_data in channels)
+        total_conversions = sum(channel_data.get("conversions", 0) for channel_data in channels)
+        total_clicks = sum(channel_data.get("clicks", 0) for channel_data in channels)
+
+        if analysis is not None:
+            roi = analysis["roi"]
+        else:
+            # Même valeur moyenne par conversion que _analyze_campaign_performance
+            roi = (total_conversions * 25 - total_cost) / total_cost if total_cost > 0 else 0.0
+
+        return {
+            "budget_spent": total_cost / campaign.budget if campaign.budget > 0 else 0.0,
+            "total_cost": total_cost,
+            "conversions": total_conversions,
+            "clicks": total_clicks,
+            "conversion_rate": total_conversions / max(1, total_clicks),
+            "negative_sentiment": max(
+                (channel_data.get("negative_sentiment", 0.0) for channel_data in channels), default=0.0
+            ),
+            "roi": roi
+        }
+
+    def _build_rule_alerts(self, campaign: MarketingCampaign, metrics: Dict[str, float],
+                           rules: List[Any]) -> List[Dict[str, Any]]:
+        """Construit les alertes des règles déclenchées qui en déclarent une"""
+        alerts = []
+        for rule in rules:
+            definition = rule.definition
+            if "alert_type" not in definition:
+                continue
+            alert = {
+                "type": definition["alert_type"],
+                "severity": definition.get("severity", "medium"),
+                "message": definition.get("message", rule.name).format(campaign_name=campaign.name, **metrics),
                 "campaign_id": campaign.id,
+                "rule": rule.name,
+                "action": rule.action,
                 "timestamp": datetime.now().isoformat(),
-                "data": {"conversion_rate": conversion_rate}
-            })
-
+                "data": {variable: metrics.get(variable) for variable in rule.variables}
+            }
+            if "crisis_type" in definition:
+                alert["crisis_type"] = definition["crisis_type"]
+            alerts.append(alert)
         return alerts
 
-    async def _check_optimization_triggers(self, campaign: MarketingCampaign, performance_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Vérifie si des optimisations automatiques doivent être déclenchées"""
+    async def _check_alert_rules(self, campaign: MarketingCampaign, performance_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Vérifie les règles d'alerte pour une campagne"""
+        metrics = self._campaign_rule_metrics(campaign, performance_data)
+        return self._build_rule_alerts(campaign, metrics, self.rule_engine.evaluate(metrics))
+
+    def _check_alert_rules_batch(self, campaign_metrics: Dict[str, Dict[str, float]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Évalue les règles d'alerte en un seul lot pour plusieurs campagnes"""
+        matches = self.rule_engine.evaluate_batch(campaign_metrics)
+        return {
+            campaign_id: self._build_rule_alerts(self.campaigns[campaign_id], campaign_metrics[campaign_id], rules)
+            for campaign_id, rules in matches.items()
+        }
+
+    async def _check_optimization_triggers(self, campaign: MarketingCampaign, performance_data: Dict[str, Any],
+                                           analysis: Optional[Dict[str, Any]] = None,
+                                           changed_channels: Optional[set] = None,
+                                           channel_triggers: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """Vérifie si des optimisations automatiques doivent être déclenchées
+
+        analysis évite de réanalyser la campagne. Avec changed_channels, seuls ces
+        canaux sont réévalués; les déclencheurs des autres sont repris de
+        channel_triggers, mis à jour en place.
+        """
         optimizations = []
 
         # Analyser les performances
-        analysis = await self._analyze_campaign_performance(campaign, performance_data)
+        if analysis is None:
+            analysis = await self._analyze_campaign_performance(campaign, performance_data)
+        if channel_triggers is None:
+            channel_triggers = {}
 
         # Déclencheur ROI faible
         if analysis["roi"] < 1.0:
@@ -980,42 +1437,61 @@ class MarketingOrchestrator(BaseAgent):
 
         # Déclencheur performance canal
         for channel, channel_analysis in analysis["channel_performance"].items():
+            if changed_channels is not None and channel not in changed_channels and channel in channel_triggers:
+                continue
+            channel_triggers[channel] = []
             if channel_analysis["performance"] == "poor":
-                optimizations.append({
+                channel_triggers[channel].append({
                     "trigger": "poor_channel_performance",
                     "action": "optimize_channel",
                     "channel": channel,
                     "priority": "medium"
                 })
 
+        for channel in analysis["channel_performance"]:
+            optimizations.extend(channel_triggers.get(channel, []))
+
         return optimizations
 
     async def _update_dashboard_data(self, monitoring_data: Dict[str, Any]):
-        """Met à jour les données du dashboard temps réel"""
-        self.dashboard_data = {
+        """Met à jour la vue dashboard temps réel (seules les campagnes surveillées changent)"""
+        for campaign_id, status in monitoring_data.get("campaign_status", {}).items():
+            self.dashboard.update_campaign(campaign_id, status)
+        self.dashboard.retain_campaigns(self.active_campaigns)
+
+        self.dashboard.update({
             "last_update": datetime.now().isoformat(),
             "active_campaigns": len(self.active_campaigns),
             "total_campaigns": len(self.campaigns),
             "alerts_count": len(self.alerts),
-            "performance_summary": monitoring_data.get("campaign_status", {}),
-            "orchestrator_metrics": asdict(self.orchestrator_metrics),
-            "agent_status": {
-                agent_id: await agent.health_check()
-                for agent_id, agent in self.marketing_agents.items()
-            }
-        }
+            "alerts_by_severity": self.alerts.count_by("severity"),
+            "orchestrator_metrics": record_to_dict(self.orchestrator_metrics),
+            "agent_status": await self.health_probes.probe_all(self.marketing_agents)
+        })
 
-        # Sauvegarder les données du dashboard
-        dashboard_file = self.data_dir / "dashboard_data.json"
-        with open(dashboard_file, 'w', encoding='utf-8') as f:
-            json.dump(self.dashboard_data, f, indent=2, default=str, ensure_ascii=False)
+        # Sauvegarde regroupée: au plus une écriture par fenêtre dashboard_flush_interval
+        self.dashboard.request_flush()
 
     async def _generate_comprehensive_report(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
         """Génère un rapport complet sur les campagnes et performances"""
         report_type = report_data.get("type", "campaign_summary")
         period = report_data.get("period", "last_30_days")
 
+        # Les statistiques sont lues dans les agrégats de l'historique, sur la période demandée
+        window = PERIODS.get(period)
+        since = time.time() - window if window else None
+        resolution = "day" if window is None else "minute" if window <= 86400 else "hour" if window <= 90 * 86400 else "day"
+
         try:
+            for campaign_id in self.active_campaigns:
+                if not self.performance_history.has_campaign(campaign_id):
+                    # Campagne pas encore surveillée: une collecte initiale alimente l'historique
+                    performance_data = await self._collect_performance_data(campaign_id)
+                    self._record_performance(self.campaigns[campaign_id], performance_data)
+
+            roi_by_campaign = self.performance_history.aggregate("roi", channel="campaign",
+                                                                 resolution=resolution, start=since)
+
             report = {
                 "report_id": f"report_{uuid.uuid4().hex[:8]}",
                 "type": report_type,
@@ -1033,7 +1509,7 @@ class MarketingOrchestrator(BaseAgent):
                 "active_campaigns": len(self.active_campaigns),
                 "completed_campaigns": len([c for c in self.campaigns.values() if c.status == CampaignStatus.COMPLETED]),
                 "total_budget_managed": sum(c.budget for c in self.campaigns.values()),
-                "average_roi": self.orchestrator_metrics.roi_average,
+                "average_roi": roi_by_campaign.get("campaign", {}).get("avg", self.orchestrator_metrics.roi_average),
                 "key_achievements": [
                     "Coordination réussie de campagnes multi-canaux",
                     "Optimisation automatique des performances",
@@ -1043,7 +1519,7 @@ class MarketingOrchestrator(BaseAgent):
 
             # Détails par campagne
             for campaign_id, campaign in self.campaigns.items():
-                performance_data = await self._collect_performance_data(campaign_id) if campaign_id in self.active_campaigns else {}
+                performance_data = self.performance_history.summarize_campaign(campaign_id, resolution, start=since)
 
                 report["campaigns"][campaign_id] = {
                     "name": campaign.name,
@@ -1054,20 +1530,21 @@ class MarketingOrchestrator(BaseAgent):
                     "channels": campaign.channels,
                     "objectives": campaign.objectives,
                     "performance": performance_data,
-                    "roi": performance_data.get("roi", "N/A")
+                    "roi": performance_data.get("campaign", {}).get("roi", {}).get("last", "N/A"),
+                    "alerts": self.alerts.query(campaign_id=campaign.id, limit=10)
                 }
 
             # Recommandations stratégiques
-            report["recommendations"] = await self._generate_strategic_recommendations()
+            report["recommendations"] = await self._generate_strategic_recommendations(since, resolution)
 
             # Appendices avec données techniques
             report["appendices"] = {
                 "agent_performance": {
-                    agent_id: asdict(agent.metrics)
+                    agent_id: record_to_dict(agent.metrics)
                     for agent_id, agent in self.marketing_agents.items()
                 },
                 "automation_rules": self.automation_rules,
-                "alerts_history": self.alerts[-50:]  # 50 dernières alertes
+                "alerts_history": self.alerts.recent(50)  # 50 dernières alertes
             }
 
             # Sauvegarder le rapport
@@ -1089,12 +1566,15 @@ class MarketingOrchestrator(BaseAgent):
             self.logger.error(f"Erreur lors de la génération du rapport: {str(e)}")
             raise
 
-    async def _generate_strategic_recommendations(self) -> List[Dict[str, Any]]:
+    async def _generate_strategic_recommendations(self, since: Optional[float] = None,
+                                                  resolution: str = "day") -> List[Dict[str, Any]]:
         """Génère des recommandations stratégiques basées sur l'ensemble des données"""
         recommendations = []
 
-        # Analyse des tendances de performance
-        if self.orchestrator_metrics.roi_average < 2.0:
+        # Analyse des tendances de performance (agrégats de l'historique)
+        roi = self.performance_history.aggregate("roi", channel="campaign", resolution=resolution, start=since)
+        roi_average = roi.get("campaign", {}).get("avg", self.orchestrator_metrics.roi_average)
+        if roi_average < 2.0:
             recommendations.append({
                 "category": "performance_optimization",
                 "priority": "high",
@@ -1107,6 +1587,40 @@ class MarketingOrchestrator(BaseAgent):
                 ]
             })
 
+        # Conversion par canal: signaler les baisses et l'écart entre canaux
+        conversion = {
+            channel: stats for channel, stats in self.performance_history.aggregate(
+                "conversion_rate", resolution=resolution, start=since
+            ).items() if channel != "campaign"
+        }
+        for channel, stats in conversion.items():
+            if stats["trend"] < -0.2:
+                recommendations.append({
+                    "category": "channel_performance",
+                    "priority": "high",
+                    "title": f"Conversion en baisse sur {channel}",
+                    "description": f"Le taux de conversion {channel} a baissé de {abs(stats['trend']):.0%} sur la période.",
+                    "actions": [
+                        "Renouveler les créatifs du canal",
+                        "Vérifier le ciblage et la fréquence d'exposition"
+                    ]
+                })
+        if len(conversion) >= 2:
+            best = max(conversion, key=lambda channel: conversion[channel]["avg"])
+            worst = min(conversion, key=lambda channel: conversion[channel]["avg"])
+            if conversion[worst]["avg"] < conversion[best]["avg"] / 2:
+                recommendations.append({
+                    "category": "budget_allocation",
+                    "priority": "medium",
+                    "title": f"Réallouer du budget de {worst} vers {best}",
+                    "description": (f"Conversion moyenne {conversion[best]['avg']:.1%} sur {best} "
+                                    f"contre {conversion[worst]['avg']:.1%} sur {worst}."),
+                    "actions": [
+                        f"Augmenter progressivement le budget {best}",
+                        f"Limiter {worst} aux audiences les plus engagées"
+                    ]
+                })
+
         # Analyse des canaux
         channel_usage = {}
         for campaign in self.campaigns.values():
@@ -1142,10 +1656,50 @@ class MarketingOrchestrator(BaseAgent):
 
         return recommendations
 
+    async def _escalate_crisis_alerts(self, alerts: List[Dict[str, Any]]):
+        """Soumet une tâche de gestion de crise (voie rapide) par alerte de crise"""
+        for alert in alerts:
+            task = self.create_task(
+                task_type="crisis_management",
+                priority=10,
+                data={
+                    "type": alert["crisis_type"],
+                    "severity": alert.get("severity", "high"),
+                    "campaign_id": alert.get("campaign_id"),
+                    "detected_at": alert["timestamp"]
+                },
+                # Une crise redétectée n'est rattachée au traitement précédent que s'il est
+                # encore en cours et de même gravité (une escalade high -> critical est traitée)
+                idempotency_key=f"crisis:{alert.get('campaign_id')}:{alert.get('rule')}:{alert.get('severity', 'high')}",
+                cache_result=False
+            )
+            future = await self.submit(task)
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    def _pause_low_priority_work(self, reason: str) -> List[str]:
+        """Suspend les tâches peu prioritaires des agents chargés; retourne leurs noms"""
+        paused = []
+        for name, agent in self.marketing_agents.items():
+            if isinstance(agent, BaseAgent):
+                agent.pause_low_priority(
+                    self.config["crisis_pause_below_priority"],
+                    duration=self.config["crisis_pause_duration"],
+                    reason=reason
+                )
+                paused.append(name)
+        return paused
+
     async def _handle_crisis(self, crisis_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Gère les situations de crise marketing"""
+        """Gère les situations de crise marketing
+
+        Exécutée par la voie rapide (hors queue). detected_at (datetime ou ISO)
+        sert à mesurer le délai entre la détection et la première action.
+        """
         crisis_type = crisis_data.get("type", "general")
         severity = crisis_data.get("severity", "medium")
+        detected_at = crisis_data.get("detected_at") or datetime.now()
+        if isinstance(detected_at, str):
+            detected_at = datetime.fromisoformat(detected_at)
 
         try:
             crisis_id = f"crisis_{uuid.uuid4().hex[:8]}"
@@ -1154,11 +1708,22 @@ class MarketingOrchestrator(BaseAgent):
                 "crisis_id": crisis_id,
                 "type": crisis_type,
                 "severity": severity,
-                "detected_at": datetime.now().isoformat(),
+                "detected_at": detected_at.isoformat(),
                 "actions_taken": [],
                 "status": "handling"
             }
 
+            # Crise grave: plus aucune publication de routine tant qu'elle est en cours
+            latency = None
+            if severity in ("high", "critical"):
+                paused_agents = self._pause_low_priority_work(f"crise {crisis_id} ({crisis_type})")
+                crisis_response["actions_taken"].append({
+                    "action": "pause_low_priority_work",
+                    "agents": paused_agents,
+                    "below_priority": self.config["crisis_pause_below_priority"]
+                })
+                latency = self.record_crisis_response(detected_at)
+
             # Actions immédiates selon le type de crise
             if crisis_type == "negative_sentiment":
                 # Pause des campagnes sensibles
@@ -1166,6 +1731,7 @@ class MarketingOrchestrator(BaseAgent):
                 for campaign_id, campaign in self.active_campaigns.items():
                     if campaign.type in [CampaignType.BRAND_AWARENESS, CampaignType.PRODUCT_LAUNCH]:
                         campaign.status = CampaignStatus.PAUSED
+                        self._log_campaign_change(campaign, "pause", "status")
                         paused_campaigns.append(campaign_id)
 
                 crisis_response["actions_taken"].append({
@@ -1177,6 +1743,7 @@ class MarketingOrchestrator(BaseAgent):
                 # Pause toutes les campagnes actives
                 for campaign_id, campaign in self.active_campaigns.items():
                     campaign.status = CampaignStatus.PAUSED
+                    self._log_campaign_change(campaign, "pause", "status")
 
                 crisis_response["actions_taken"].append({
                     "action": "pause_all_campaigns",
@@ -1193,6 +1760,10 @@ class MarketingOrchestrator(BaseAgent):
                     "campaigns_optimized": list(self.active_campaigns.keys())
                 })
 
+            if latency is None and crisis_response["actions_taken"]:
+                latency = self.record_crisis_response(detected_at)
+            crisis_response["detection_to_response_ms"] = round(latency * 1000, 1) if latency is not None else None
+
             # Notification aux parties prenantes
             await self._send_crisis_notifications(crisis_response)
 
@@ -1252,10 +1823,22 @@ class MarketingOrchestrator(BaseAgent):
                 "results": {}
             }
 
+            # Test bayésien séquentiel: les variantes perdantes cessent de recevoir du trafic
+            get_experiment_engine().create(
+                ab_test["test_id"], ab_test["variants"],
+                traffic_split=ab_test["traffic_split"],
+                metric=ab_test["success_metric"],
+                win_probability=ab_test["confidence_level"],
+                min_samples=ab_test_data.get("min_samples", 100),
+                max_samples=ab_test_data.get("max_samples"),
+                metadata={"agent_id": self.agent_id, "campaign_id": campaign_id, "variable": test_variable}
+            )
+
             # Ajouter le test A/B à la campagne
             if not campaign.ab_tests:
                 campaign.ab_tests = []
             campaign.ab_tests.append(ab_test)
+            self._log_campaign_change(campaign, "update", "ab_tests")
 
             # Configurer les variants avec les agents concernés
             for i, variant in enumerate(ab_test["variants"]):
@@ -1264,7 +1847,7 @@ class MarketingOrchestrator(BaseAgent):
                 # Configuration selon la variable testée
                 if test_variable == "creative":
                     # Créer différentes versions créatives
-                    if "content_creator" in self.marketing_agents:
+                    if self.marketing_agents.get("content_creator") is not None:
                         creative_task = self.marketing_agents["content_creator"].create_task(
                             task_type="create_ab_variant",
                             priority=8,
@@ -1279,7 +1862,7 @@ class MarketingOrchestrator(BaseAgent):
 
                 elif test_variable == "audience":
                     # Configurer différents ciblages d'audience
-                    if "social_media" in self.marketing_agents:
+                    if self.marketing_agents.get("social_media") is not None:
                         audience_task = self.marketing_agents["social_media"].create_task(
                             task_type="setup_ab_audience",
                             priority=8,
@@ -1293,6 +1876,7 @@ class MarketingOrchestrator(BaseAgent):
                         await self.marketing_agents["social_media"].add_task(audience_task)
 
             ab_test["status"] = "running"
+            ab_test["allocation"] = get_experiment_engine().allocation(ab_test["test_id"])
 
             self.logger.info(f"Test A/B {ab_test['test_id']} configuré pour la campagne {campaign_id}")
 
@@ -1306,6 +1890,45 @@ class MarketingOrchestrator(BaseAgent):
             self.logger.error(f"Erreur lors de la configuration du test A/B: {str(e)}")
             raise
 
+    async def _record_ab_test_results(self, results_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Intègre des résultats de test A/B et applique l'arrêt anticipé
+
+        results_data["results"]: {variante: {"trials": n, "successes": k}} (cumul depuis le dernier envoi)
+        """
+        test_id = results_data.get("test_id")
+        engine = get_experiment_engine()
+        if test_id not in engine.experiments:
+            raise ValueError(f"Test A/B {test_id} introuvable")
+
+        engine.record_events(
+            (test_id, variant, result.get("trials", 0), result.get("successes", 0))
+            for variant, result in results_data.get("results", {}).items()
+        )
+        summary = engine.summary(test_id)
+
+        # Refléter l'état du test dans la campagne
+        campaign = self.campaigns.get(engine.experiments[test_id].metadata.get("campaign_id"))
+        for ab_test in (campaign.ab_tests or []) if campaign else []:
+            if ab_test["test_id"] == test_id:
+                ab_test["status"] = summary["status"]
+                ab_test["allocation"] = summary["allocation"]
+                ab_test["results"] = summary["variants"]
+                if summary["winner"]:
+                    ab_test["winner"] = summary["winner"]
+                self._log_campaign_change(campaign, "update", "ab_tests")
+
+        if summary["status"] != "running":
+            self.logger.info(f"Test A/B {test_id} terminé: variante {summary['winner']} ({summary['status']})")
+
+        return {
+            "success": True,
+            "test_id": test_id,
+            "status": summary["status"],
+            "winner": summary["winner"],
+            "allocation": summary["allocation"],
+            "summary": summary
+        }
+
     def get_capabilities(self) -> List[str]:
         """Retourne les capacités de l'orchestrateur"""
         return [
@@ -1369,16 +1992,7 @@ class MarketingOrchestrator(BaseAgent):
 
     async def _health_check_all_agents(self) -> Dict[str, bool]:
         """Vérifie la santé de tous les agents"""
-        health_status = {}
-
-        for agent_id, agent in self.marketing_agents.items():
-            try:
-                health_status[agent_id] = await agent.health_check()
-            except Exception as e:
-                health_status[agent_id] = False
-                self.logger.error(f"Health check failed for {agent_id}: {str(e)}")
-
-        return health_status
+        return await self.health_probes.probe_all(self.marketing_agents, force=True)
 
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Retourne les données actuelles du dashboard"""
@@ -1392,10 +2006,16 @@ class MarketingOrchestrator(BaseAgent):
         """Retourne une campagne par son ID"""
         return self.campaigns.get(campaign_id)
 
+    def get_alerts(self, campaign_id: Optional[str] = None, alert_type: Optional[str] = None,
+                   severity: Optional[str] = None, limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+        """Retourne les alertes filtrées, les plus récentes d'abord"""
+        return self.alerts.query(campaign_id=campaign_id, type=alert_type, severity=severity, limit=limit)
+
     async def pause_campaign(self, campaign_id: str) -> bool:
         """Met en pause une campagne"""
         if campaign_id in self.active_campaigns:
             self.active_campaigns[campaign_id].status = CampaignStatus.PAUSED
+            self._log_campaign_change(self.active_campaigns[campaign_id], "pause", "status")
             self.logger.info(f"Campagne {campaign_id} mise en pause")
             return True
         return False
@@ -1407,6 +2027,7 @@ class MarketingOrchestrator(BaseAgent):
             if campaign.status == CampaignStatus.PAUSED:
                 campaign.status = CampaignStatus.RUNNING
                 self.active_campaigns[campaign_id] = campaign
+                self._log_campaign_change(campaign, "resume", "status")
                 self.logger.info(f"Campagne {campaign_id} reprise")
                 return True
         return False
@@ -1415,14 +2036,36 @@ class MarketingOrchestrator(BaseAgent):
         """Retourne les métriques de l'orchestrateur"""
         return self.orchestrator_metrics
 
+    async def start_metrics_export(self, host: Optional[str] = None, port: Optional[int] = None) -> MetricsHTTPServer:
+        """Expose les métriques de l'orchestrateur et de ses agents au format Prometheus"""
+        if self.metrics_server is None:
+            self.metrics_server = await start_metrics_server(
+                lambda: [self, *self.marketing_agents.values()],
+                host or self.config["metrics_export_host"],
+                self.config["metrics_export_port"] if port is None else port
+            )
+        return self.metrics_server
+
+    async def stop(self):
+        """Arrête l'export des métriques, écrit le dashboard en attente puis arrête l'orchestrateur"""
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+            self.metrics_server = None
+        # Les écritures regroupées par l'anti-rebond seraient sinon perdues
+        await self.dashboard.close()
+        await super().stop()
+
 # Fonction utilitaire pour créer et initialiser l'orchestrateur
 async def create_marketing_orchestrator() -> MarketingOrchestrator:
     """Crée et initialise l'orchestrateur marketing"""
+    # Les agents sont chargés à la demande: aucune attente d'initialisation
     orchestrator = MarketingOrchestrator()
-
-    # Attendre l'initialisation des agents
-    await asyncio.sleep(1)
-
+    if orchestrator.config["metrics_export_enabled"]:
+        try:
+            await orchestrator.start_metrics_export()
+        except OSError as e:
+            # Port occupé: l'orchestrateur reste utilisable sans export
+            orchestrator.logger.warning(f"Export Prometheus indisponible: {str(e)}")
     return orchestrator
 
 # Point d'entrée principal
@@ -1456,7 +2099,7 @@ if __name__ == "__main__":
 
         # Afficher les résultats
         status = orchestrator.get_status()
-        print(f"Orchestrateur initialisé avec {len(orchestrator.marketing_agents)} agents")
+        print(f"Orchestrateur initialisé avec {len(orchestrator.marketing_agents)} agents chargés")
         print(f"Campagnes gérées: {orchestrator.orchestrator_metrics.campaigns_managed}")
 
     asyncio.run(main())
\ No newline at end of file
@@ -16,12 +16,16 @@ import sys
 from pathlib import Path
 import hashlib
 import random
+import uuid
 from urllib.parse import urlencode
 
 # Ajouter le répertoire parent au path pour les imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.base_agent import BaseAgent, AgentTask
+from utils.records import record
+from utils.due_queue import DueQueue
+from utils.rate_limiter import RateLimiter, get_rate_limiter
 from config.settings import COMPANY_INFO, API_KEYS, AGENTS_CONFIG
 
 class Platform(Enum):
@@ -47,7 +51,7 @@ class EngagementType(Enum):
     MENTION = "mention"
     DM = "direct_message"
 
-@dataclass
+@record
 class SocialMediaPost:
     """Structure d'une publication sur les réseaux sociaux"""
     id: str
@@ -195,25 +199,57 @@ class HashtagOptimizer:
 class SocialMediaAPIManager:
     """Gestionnaire des APIs des réseaux sociaux avec mocks pour testing"""
 
-    def __init__(self, use_mock: bool = True):
+    def __init__(self, use_mock: bool = True, rate_limiter: Optional[RateLimiter] = None,
+                 max_concurrency: Optional[Dict[str, int]] = None):
         self.use_mock = use_mock
         self.mock_responses = {}
-        self.rate_limits = {
-            Platform.LINKEDIN: {"requests_per_hour": 100, "current": 0, "reset_time": None},
-            Platform.TWITTER: {"requests_per_hour": 300, "current": 0, "reset_time": None},
-            Platform.FACEBOOK: {"requests_per_hour": 200, "current": 0, "reset_time": None},
-            Platform.INSTAGRAM: {"requests_per_hour": 200, "current": 0, "reset_time": None}
-        }
+        # Seaux à jetons par plateforme (RATE_LIMITS), partagés avec les autres agents
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Publications simultanées par plateforme ({"linkedin": 2, ..., "default": 2})
+        self.max_concurrency = max_concurrency or {}
+        self._platform_slots: Dict[Platform, asyncio.Semaphore] = {}
+
+    def concurrency_for(self, platform: Platform) -> int:
+        """Nombre de publications simultanées autorisées sur une plateforme"""
+        return max(1, self.max_concurrency.get(platform.value, self.max_concurrency.get("default", 2)))
+
+    def _slots(self, platform: Platform) -> asyncio.Semaphore:
+        slots = self._platform_slots.get(platform)
+        if slots is None:
+            slots = self._platform_slots[platform] = asyncio.Semaphore(self.concurrency_for(platform))
+        return slots
 
     async def publish_post(self, platform: Platform, post: SocialMediaPost) -> Dict[str, Any]:
         """Publie un post sur une plateforme"""
-        if self.use_mock:
-            return await self._mock_publish(platform, post)
-
-        # Vérifier les limites de taux
-        if not self._check_rate_limit(platform):
-            raise Exception(f"Rate limit dépassé pour {platform.value}")
-
+        if not self.use_mock:
+            # Attendre un jeton plutôt qu'échouer quand la limite de la plateforme est atteinte
+            # (avant de prendre une place: l'attente du jeton n'occupe pas la plateforme)
+            await self.rate_limiter.acquire(platform.value, "publish")
+
+        async with self._slots(platform):
+            if self.use_mock:
+                return await self._mock_publish(platform, post)
+            return await self._publish_real(platform, post)
+
+    async def publish_fanout(self, posts: List[SocialMediaPost]) -> Dict[str, Dict[str, Any]]:
+        """Publie simultanément les déclinaisons d'un post (une par plateforme)
+
+        La durée totale est celle de la plateforme la plus lente; une erreur
+        sur une plateforme n'interrompt pas les autres. Retourne le résultat
+        par plateforme.
+        """
+        results = await asyncio.gather(
+            *(self.publish_post(post.platform, post) for post in posts), return_exceptions=True
+        )
+        combined = {}
+        for post, result in zip(posts, results):
+            if isinstance(result, BaseException):
+                logging.error(f"Erreur publication {post.platform.value}: {str(result)}")
+                result = {"success": False, "error": str(result)}
+            combined[post.platform.value] = result
+        return combined
+
+    async def _publish_real(self, platform: Platform, post: SocialMediaPost) -> Dict[str, Any]:
         try:
             if platform == Platform.LINKEDIN:
                 return await self._publish_linkedin(post)
@@ -250,28 +286,13 @@ class SocialMediaAPIManager:
                 "error": "Mock API error for testing"
             }
 
-    def _check_rate_limit(self, platform: Platform) -> bool:
-        """Vérifie si on peut faire une requête selon les limites"""
-        limit_info = self.rate_limits.get(platform)
-        if not limit_info:
-            return True
-
-        now = datetime.now(timezone.utc)
-
-        # Reset si l'heure est passée
-        if limit_info["reset_time"] and now > limit_info["reset_time"]:
-            limit_info["current"] = 0
-            limit_info["reset_time"] = now + timedelta(hours=1)
-
-        # Vérifier la limite
-        return limit_info["current"] < limit_info["requests_per_hour"]
-
     async def get_post_analytics(self, platform: Platform, post_id: str) -> Dict[str, Any]:
         """Récupère les analytics d'un post"""
         if self.use_mock:
             return await self._mock_analytics(platform, post_id)
 
         # Implementation réelle des APIs ici
+        await self.rate_limiter.acquire(platform.value, "analytics")
         return {}
 
     async def _mock_analytics(self, platform: Platform, post_id: str) -> Dict[str, Any]:
@@ -312,22 +333,43 @@ class SocialMediaAgent(BaseAgent):
                 "platforms": ["linkedin", "twitter", "facebook", "instagram"],
                 "posting_frequency": {"daily": 3, "weekly": 21},
                 "engagement_response_time": 3600,  # 1 heure en secondes
-                "crisis_monitoring_interval": 300   # 5 minutes
+                "crisis_monitoring_interval": 300,  # 5 minutes
+                "max_workers": 4,  # Publications I/O-bound traitées en parallèle
+                "process_pool_task_types": ["generate_content_calendar"],
+                # Contre-pression: au-delà de 1000 tâches, seules les priorités > 3 sont admises
+                "max_queue_size": 2000,
+                "queue_high_watermark": 1000,
+                "queue_low_watermark": 800,
+                "admission_policy": "shed",
+                # Voie rapide: la gestion de crise ne passe jamais derrière les publications
+                "fast_lane_task_types": ["crisis_management"],
+                "reserved_workers": 1,
+                "crisis_pause_below_priority": 5,  # Publications de routine suspendues en crise grave
+                "crisis_pause_duration": 1800,
+                "auto_crisis_response": True,  # Gestion de crise lancée dès la détection d'une alerte grave
+                "dispatch_batch_size": 500,  # Posts échus publiés par réveil du dispatcher
+                # Publications simultanées par plateforme (publication multi-plateforme, posts programmés)
+                "platform_publish_concurrency": {"default": 2, "twitter": 4}
             }
         )
 
         # Composants spécialisés
         self.timing_analyzer = OptimalTimingAnalyzer()
         self.hashtag_optimizer = HashtagOptimizer()
-        self.api_manager = SocialMediaAPIManager(use_mock=use_mock_apis)
+        self.api_manager = SocialMediaAPIManager(
+            use_mock=use_mock_apis, max_concurrency=self.config["platform_publish_concurrency"]
+        )
 
         # Stockage des données
-        self.scheduled_posts: List[SocialMediaPost] = []
+        self.scheduled_posts: DueQueue[SocialMediaPost] = DueQueue()  # Tas min sur scheduled_time
         self.published_posts: List[SocialMediaPost] = []
         self.engagement_queue: List[EngagementActivity] = []
         self.influencer_database: List[InfluencerProfile] = []
         self.crisis_alerts: List[CrisisAlert] = []
 
+        # Publication des posts programmés déclenchée par le planificateur partagé
+        self.scheduler.register("social_media.dispatch_scheduled_posts", self._dispatch_scheduled_posts_job)
+
         # Cache pour les analytics
         self.analytics_cache = {}
         self.cache_ttl = 1800  # 30 minutes
@@ -387,6 +429,8 @@ class SocialMediaAgent(BaseAgent):
                 return await self._handle_crisis_management(data)
             elif task_type == "competitive_analysis":
                 return await self._handle_competitive_analysis(data)
+            elif task_type == "generate_content_calendar":
+                return await self.generate_content_calendar(data.get("days", 30))
             else:
                 raise ValueError(f"Type de tâche non supporté: {task_type}")
 
@@ -395,59 +439,96 @@ class SocialMediaAgent(BaseAgent):
             return {"success": False, "error": str(e)}
 
     async def _handle_publish_post(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Gère la publication immédiate d'un post"""
-        try:
-            platform = Platform(data["platform"])
-            content = data["content"]
-            media_urls = data.get("media_urls", [])
+        """Gère la publication immédiate d'un post
 
-            # Optimiser les hashtags
-            hashtags = self.hashtag_optimizer.optimize_hashtags(
-                platform, content, data.get("category", "business")
-            )
+        Avec "platforms" (liste), le post est décliné et publié simultanément
+        sur chaque plateforme: le résultat est combiné par plateforme.
+        """
+        try:
+            if "platforms" in data:
+                return await self._publish_multi_platform(data)
 
-            # Créer le post
-            post = SocialMediaPost(
-                id=f"post_{int(time.time())}_{platform.value}",
-                platform=platform,
-                content=content,
-                media_urls=media_urls,
-                hashtags=hashtags,
-                scheduled_time=datetime.now(timezone.utc),
-                status=PostStatus.DRAFT,
-                analytics={},
-                created_at=datetime.now(timezone.utc)
-            )
+            platform = Platform(data["platform"])
+            post = self._build_immediate_post(platform, data)
 
             # Publier
             result = await self.api_manager.publish_post(platform, post)
-
-            if result["success"]:
-                post.status = PostStatus.PUBLISHED
-                post.published_at = datetime.now(timezone.utc)
-                self.published_posts.append(post)
-
-                self.logger.info(f"Post publié avec succès sur {platform.value}: {result['post_id']}")
-
-                return {
-                    "success": True,
-                    "post_id": result["post_id"],
-                    "platform": platform.value,
-                    "url": result.get("url"),
-                    "analytics_available": False
-                }
-            else:
-                post.status = PostStatus.FAILED
-                return {
-                    "success": False,
-                    "error": result["error"],
-                    "post_id": post.id
-                }
+            return self._record_publication(post, result)
 
         except Exception as e:
             self.logger.error(f"Erreur publication post: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def _publish_multi_platform(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Publie un contenu sur toutes les plateformes cibles en parallèle"""
+        platforms = list(dict.fromkeys(Platform(p) for p in data["platforms"]))
+        posts = [self._build_immediate_post(platform, data) for platform in platforms]
+
+        started = time.perf_counter()
+        results = await self.api_manager.publish_fanout(posts)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        per_platform = {
+            post.platform.value: self._record_publication(post, results[post.platform.value])
+            for post in posts
+        }
+        published = [platform for platform, result in per_platform.items() if result["success"]]
+        self.logger.info(
+            f"Publication multi-plateforme: {len(published)}/{len(posts)} réussies en {elapsed_ms:.0f} ms"
+        )
+
+        return {
+            "success": bool(published),
+            "partial": 0 < len(published) < len(posts),
+            "published_platforms": published,
+            "failed_platforms": [platform for platform in per_platform if platform not in published],
+            "results": per_platform,
+            "elapsed_ms": round(elapsed_ms, 1)
+        }
+
+    def _build_immediate_post(self, platform: Platform, data: Dict[str, Any]) -> SocialMediaPost:
+        """Crée le post d'une plateforme avec ses hashtags optimisés"""
+        content = data["content"]
+        hashtags = self.hashtag_optimizer.optimize_hashtags(
+            platform, content, data.get("category", "business")
+        )
+
+        return SocialMediaPost(
+            id=f"post_{int(time.time())}_{platform.value}",
+            platform=platform,
+            content=content,
+            media_urls=data.get("media_urls", []),
+            hashtags=hashtags,
+            scheduled_time=datetime.now(timezone.utc),
+            status=PostStatus.DRAFT,
+            analytics={},
+            created_at=datetime.now(timezone.utc)
+        )
+
+    def _record_publication(self, post: SocialMediaPost, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Met à jour le statut du post selon le résultat de l'API"""
+        if result["success"]:
+            post.status = PostStatus.PUBLISHED
+            post.published_at = datetime.now(timezone.utc)
+            self.published_posts.append(post)
+
+            self.logger.info(f"Post publié avec succès sur {post.platform.value}: {result['post_id']}")
+
+            return {
+                "success": True,
+                "post_id": result["post_id"],
+                "platform": post.platform.value,
+                "url": result.get("url"),
+                "analytics_available": False
+            }
+
+        post.status = PostStatus.FAILED
+        return {
+            "success": False,
+            "error": result["error"],
+            "post_id": post.id
+        }
+
     async def _handle_schedule_posts(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Gère la planification de posts sur plusieurs plateformes"""
         try:
@@ -470,7 +551,7 @@ class SocialMediaAgent(BaseAgent):
 
                     # Créer post planifié
                     post = SocialMediaPost(
-                        id=f"scheduled_{int(time.time())}_{i}_{platform.value}",
+                        id=f"scheduled_{int(time.time())}_{i}_{platform.value}_{uuid.uuid4().hex[:8]}",
                         platform=platform,
                         content=content_item["content"],
                         media_urls=content_item.get("media_urls", []),
@@ -481,7 +562,7 @@ class SocialMediaAgent(BaseAgent):
                         created_at=datetime.now(timezone.utc)
                     )
 
-                    self.scheduled_posts.append(post)
+                    self.scheduled_posts.push(post, optimal_time)
                     scheduled_posts.append({
                         "post_id": post.id,
                         "platform": platform.value,
@@ -490,6 +571,7 @@ class SocialMediaAgent(BaseAgent):
                     })
 
             self.logger.info(f"Planification de {len(scheduled_posts)} posts terminée")
+            self._schedule_next_dispatch()
 
             return {
                 "success": True,
@@ -657,6 +739,7 @@ class SocialMediaAgent(BaseAgent):
 
             # Générer des alertes si nécessaire
             if critical_mentions:
+                new_alerts = []
                 for mention in critical_mentions:
                     alert = CrisisAlert(
                         id=f"alert_{int(time.time())}",
@@ -668,6 +751,12 @@ class SocialMediaAgent(BaseAgent):
                         timestamp=datetime.now(timezone.utc)
                     )
                     self.crisis_alerts.append(alert)
+                    new_alerts.append(alert)
+
+                if self.config["auto_crisis_response"] and any(
+                    self._get_severity_level(alert.severity) >= self._get_severity_level("high") for alert in new_alerts
+                ):
+                    await self._escalate_crisis()
 
             return {
                 "success": True,
@@ -733,8 +822,19 @@ class SocialMediaAgent(BaseAgent):
             self.logger.error(f"Erreur outreach influenceurs: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def _escalate_crisis(self):
+        """Soumet la gestion de crise en voie rapide (hors queue de publication)"""
+        task = self.create_task("crisis_management", 10, {"severity_threshold": "high"})
+        future = await self.submit(task)
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
     async def _handle_crisis_management(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Gère les crises de réputation"""
+        """Gère les crises de réputation
+
+        Pour une alerte high/critical, la première action est de suspendre les
+        publications peu prioritaires; le délai depuis la détection de chaque
+        alerte jusqu'à sa première action est mesuré (crisis_response_latency).
+        """
         try:
             severity_threshold = data.get("severity_threshold", "medium")
             auto_respond = data.get("auto_respond", False)
@@ -746,6 +846,19 @@ class SocialMediaAgent(BaseAgent):
             ]
 
             crisis_actions = []
+            response_latencies = []
+
+            severe_alerts = [
+                alert for alert in active_alerts
+                if self._get_severity_level(alert.severity) >= self._get_severity_level("high")
+            ]
+            if severe_alerts:
+                self.pause_low_priority(
+                    self.config["crisis_pause_below_priority"],
+                    duration=self.config["crisis_pause_duration"],
+                    reason=f"{len(severe_alerts)} alerte(s) de crise"
+                )
+                response_latencies.extend(self.record_crisis_response(alert.timestamp) for alert in severe_alerts)
 
             for alert in active_alerts:
                 action_plan = await self._generate_crisis_action_plan(alert)
@@ -758,6 +871,9 @@ class SocialMediaAgent(BaseAgent):
                     # Escalade pour les crises importantes
                     alert.action_taken = "escalated_to_human"
 
+                if self._get_severity_level(alert.severity) < self._get_severity_level("high"):
+                    response_latencies.append(self.record_crisis_response(alert.timestamp))
+
                 crisis_actions.append({
                     "alert_id": alert.id,
                     "severity": alert.severity,
@@ -777,6 +893,8 @@ class SocialMediaAgent(BaseAgent):
                 "auto_resolved": sum(1 for a in crisis_actions if "automated" in a["action_taken"]),
                 "escalated": sum(1 for a in crisis_actions if "escalated" in a["action_taken"]),
                 "crisis_actions": crisis_actions,
+                "publishing_paused": self.low_priority_paused,
+                "max_detection_to_response_ms": round(max(response_latencies) * 1000, 1) if response_latencies else None,
                 "situation_report": situation_report
             }
 
@@ -1076,33 +1194,82 @@ iFiveMe
 
         return recommendations
 
-    async def execute_scheduled_posts(self):
-        """Exécute les posts programmés qui sont dus"""
-        now = datetime.now(timezone.utc)
-        due_posts = [
-            post for post in self.scheduled_posts
-            if post.scheduled_time <= now and post.status == PostStatus.SCHEDULED
-        ]
+    async def execute_scheduled_posts(self) -> int:
+        """Publie les posts programmés échus; retourne le nombre de posts traités
 
+        Au plus dispatch_batch_size posts sortent du tas par appel; chaque
+        plateforme publie ses posts dans l'ordre, par groupes de sa concurrence
+        maximale, les plateformes en parallèle.
+        """
+        # Publications de routine suspendues (crise): les posts restent dans la file
+        if self.low_priority_paused:
+            self.logger.warning(f"Publication programmée suspendue: {len(self.scheduled_posts)} posts en attente")
+            return 0
+
+        due_posts = self.scheduled_posts.pop_due(datetime.now(timezone.utc), limit=self.config["dispatch_batch_size"])
+        by_platform: Dict[Platform, List[SocialMediaPost]] = {}
         for post in due_posts:
-            try:
-                result = await self.api_manager.publish_post(post.platform, post)
-
-                if result["success"]:
-                    post.status = PostStatus.PUBLISHED
-                    post.published_at = now
-                    self.published_posts.append(post)
-                    self.logger.info(f"Post programmé publié: {post.id}")
-                else:
-                    post.status = PostStatus.FAILED
-                    self.logger.error(f"Échec publication post programmé: {post.id}")
+            by_platform.setdefault(post.platform, []).append(post)
 
-                # Retirer de la liste des posts programmés
-                self.scheduled_posts.remove(post)
+        await asyncio.gather(*(self._publish_scheduled_batch(posts) for posts in by_platform.values()))
+        return len(due_posts)
 
-            except Exception as e:
-                self.logger.error(f"Erreur publication post programmé {post.id}: {str(e)}")
+    async def _publish_scheduled_batch(self, posts: List[SocialMediaPost]):
+        """Publie les posts échus d'une plateforme, par groupes de sa concurrence maximale"""
+        step = self.api_manager.concurrency_for(posts[0].platform)
+        for index in range(0, len(posts), step):
+            if self.low_priority_paused:
+                # Pause en cours de lot: les posts non publiés retournent dans la file
+                for pending in posts[index:]:
+                    self.scheduled_posts.push(pending, pending.scheduled_time)
+                self.logger.warning(f"Publication {posts[0].platform.value} suspendue: {len(posts) - index} posts remis en file")
+                return
+
+            await asyncio.gather(*(self._publish_scheduled_post(post) for post in posts[index:index + step]))
+
+    async def _publish_scheduled_post(self, post: SocialMediaPost):
+        try:
+            result = await self.api_manager.publish_post(post.platform, post)
+
+            if result["success"]:
+                post.status = PostStatus.PUBLISHED
+                post.published_at = datetime.now(timezone.utc)
+                self.published_posts.append(post)
+                self.logger.info(f"Post programmé publié: {post.id}")
+            else:
                 post.status = PostStatus.FAILED
+                self.logger.error(f"Échec publication post programmé: {post.id}")
+
+        except Exception as e:
+            self.logger.error(f"Erreur publication post programmé {post.id}: {str(e)}")
+            post.status = PostStatus.FAILED
+
+    def _schedule_next_dispatch(self):
+        """Planifie un réveil à la prochaine échéance de post (pas de polling)"""
+        next_time = self.scheduled_posts.next_due()
+        if next_time is None:
+            self.scheduler.cancel("social_scheduled_posts_dispatch")
+            return
+
+        job = self.scheduler.get_job("social_scheduled_posts_dispatch")
+        if job is None or next_time < job.base_time:
+            self.scheduler.schedule_at(
+                "social_scheduled_posts_dispatch", "social_media.dispatch_scheduled_posts",
+                next_time, misfire_policy="fire_once",
+                exclusive=False  # File des posts propre au processus
+            )
+
+    async def _dispatch_scheduled_posts_job(self, payload: Dict[str, Any]):
+        """Job planifié: publie les posts dus puis se replanifie sur le suivant"""
+        await self.execute_scheduled_posts()
+        # En pause, resume_low_priority() replanifie (sinon le job se redéclencherait en boucle)
+        if not self.low_priority_paused:
+            self._schedule_next_dispatch()
+
+    def resume_low_priority(self):
+        """Lève la pause et relance la publication des posts programmés en retard"""
+        super().resume_low_priority()
+        self._schedule_next_dispatch()
 
     async def generate_content_calendar(self, days: int = 30) -> Dict[str, Any]:
         """Génère un calendrier de contenu pour les prochains jours"""
@@ -1197,7 +1364,7 @@ iFiveMe
             }
 
         # Posts en attente
-        pending_posts = len([p for p in self.scheduled_posts if p.status == PostStatus.SCHEDULED])
+        pending_posts = len(self.scheduled_posts)
 
         # Engagement à traiter
         pending_engagements = len([e for e in self.engagement_queue if not e.handled])
@@ -17,6 +17,7 @@ from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.base_agent import BaseAgent, AgentTask
+from utils.rate_limiter import get_rate_limiter
 from config.settings import COMPANY_INFO
 from config.ifiveme_content_templates import AUTHENTIC_IFIVEME_POSTS, get_ifiveme_hashtags
 from agents.google_drive_agent import GoogleDriveAgent
@@ -52,6 +53,8 @@ class SocialMediaPublisherAgent(BaseAgent):
         self.context: Optional[BrowserContext] = None
         self.credentials: Dict[str, SocialMediaCredentials] = {}
         self.google_drive_agent = GoogleDriveAgent()
+        # Mêmes seaux à jetons que les publications par API (SocialMediaAgent)
+        self.rate_limiter = get_rate_limiter()
 
         # URLs des plateformes
         self.platform_urls = {
@@ -442,6 +445,7 @@ class SocialMediaPublisherAgent(BaseAgent):
             return {"error": "Impossible d'initialiser le navigateur"}
 
         try:
+            await self.rate_limiter.acquire(platform, "publish")
             if platform == "Facebook":
                 result = await self._publish_to_facebook(post_content, image_url)
             elif platform == "LinkedIn":
@@ -641,15 +645,10 @@ async def setup_all_social_platforms():
     await publisher.add_task(task)
     await publisher.execute_tasks()
 
-    results = []
-    for file_path in publisher.data_dir.glob("task_*_result.json"):
-        with open(file_path, 'r') as f:
-            result = json.load(f)
-            if result.get("result"):
-                results.append(result["result"])
+    saved = await publisher.get_task_result(task.id)
 
     await publisher.stop()
-    return results[-1] if results else {"error": "Configuration échouée"}
+    return saved["result"] if saved and saved.get("result") else {"error": "Configuration échouée"}
 
 async def publish_approved_post(post_data: Dict[str, Any]):
     """Publication automatique d'un post approuvé"""
@@ -665,12 +664,7 @@ async def publish_approved_post(post_data: Dict[str, Any]):
     await publisher.add_task(task)
     await publisher.execute_tasks()
 
-    results = []
-    for file_path in publisher.data_dir.glob("task_*_result.json"):
-        with open(file_path, 'r') as f:
-            result = json.load(f)
-            if result.get("result"):
-                results.append(result["result"])
+    saved = await publisher.get_task_result(task.id)
 
     await publisher.stop()
-    return results[-1] if results else {"error": "Publication échouée"}
\ No newline at end of file
+    return saved["result"] if saved and saved.get("result") else {"error": "Publication échouée"}
\ No newline at end of file
@@ -5,7 +5,6 @@ Navigation intelligente, actions complexes, résolution de problèmes autonome
 """
 
 import asyncio
-import json
 import os
 import time
 import random
@@ -811,15 +810,10 @@ async def execute_web_instruction(instruction: str, url: str = "", options: Dict
     await agent.execute_tasks()
 
     # Récupérer les résultats
-    results = []
-    for file_path in agent.data_dir.glob("task_*_result.json"):
-        with open(file_path, 'r') as f:
-            result = json.load(f)
-            if result.get("result"):
-                results.append(result["result"])
+    saved = await agent.get_task_result(task.id)
 
     await agent.stop()
-    return results[-1] if results else {"error": "Exécution échouée"}
+    return saved["result"] if saved and saved.get("result") else {"error": "Exécution échouée"}
 
 async def navigate_and_automate(url: str, actions: List[Dict]):
     """Navigation et automation avancée"""
@@ -839,12 +833,7 @@ async def navigate_and_automate(url: str, actions: List[Dict]):
     await agent.execute_tasks()
 
     # Récupérer les résultats
-    results = []
-    for file_path in agent.data_dir.glob("task_*_result.json"):
-        with open(file_path, 'r') as f:
-            result = json.load(f)
-            if result.get("result"):
-                results.append(result["result"])
+    saved = await agent.get_task_result(task.id)
 
     await agent.stop()
-    return results[-1] if results else {"error": "Navigation échouée"}
\ No newline at end of file
+    return saved["result"] if saved and saved.get("result") else {"error": "Navigation échouée"}
\ No newline at end of file
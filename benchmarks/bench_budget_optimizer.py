@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'optimiseur de budget iFiveMe
+Temps de résolution d'une réallocation de portefeuille (N campagnes x M canaux), NumPy vs Python pur
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.budget_optimizer import BudgetOptimizer, NUMPY_AVAILABLE
+
+CHANNELS = ["social_media", "email", "content_marketing", "influencer", "google_ads", "video"]
+
+def make_portfolio(campaigns: int, channels: int, seed: int = 42):
+    rng = random.Random(seed)
+    names = CHANNELS[:channels] + [f"channel_{j}" for j in range(len(CHANNELS), channels)]
+    performance, campaign_channels = {}, {}
+    for i in range(campaigns):
+        used = [name for name in names if rng.random() < 0.85] or names[:1]
+        campaign_channels[f"campaign_{i}"] = used
+        performance[f"campaign_{i}"] = {
+            # ~5% de canaux sans historique: coefficient médian du canal
+            name: {"cost": rng.uniform(50, 2000), "conversions": rng.uniform(0, 120)}
+            for name in used if rng.random() > 0.05
+        }
+    return performance, campaign_channels
+
+def run_benchmark(campaigns: int, channels: int, max_concurrent: int, repeats: int) -> dict:
+    performance, campaign_channels = make_portfolio(campaigns, channels)
+    total_budget = 1000.0 * campaigns
+    optimizer = BudgetOptimizer(
+        channel_minimums={"social_media": 100.0, "email": 50.0, "content_marketing": 50.0},
+        max_concurrent_campaigns=max_concurrent
+    )
+
+    report = {
+        "campaigns": campaigns,
+        "channels": channels,
+        "max_concurrent_campaigns": max_concurrent,
+        "numpy_available": NUMPY_AVAILABLE,
+        "methods": {}
+    }
+
+    for use_numpy in ([True, False] if NUMPY_AVAILABLE else [False]):
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = optimizer.optimize(performance, total_budget, campaign_channels, use_numpy=use_numpy)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        allocated = sum(sum(allocation.values()) for allocation in result.allocations.values())
+        report["methods"][result.method] = {
+            "solve_ms_median": round(statistics.median(samples), 3),
+            "solve_ms_min": round(min(samples), 3),
+            "funded_campaigns": len(result.allocations),
+            "allocated_budget": round(allocated, 2),
+            "expected_revenue": result.expected_revenue,
+            "marginal_return": round(result.marginal_return, 6)
+        }
+
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--campaigns", type=int, default=1000)
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("--max-concurrent", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.campaigns, args.channels, args.max_concurrent, args.repeats), indent=2))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark du redémarrage à chaud de l'orchestrateur iFiveMe
+Recharge N campagnes depuis l'instantané SQLite + journal des mutations et mesure la durée
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.campaign_state import CampaignStateStore
+from agents.orchestrator_agent import (
+    MarketingCampaign, CampaignType, CampaignStatus, campaign_to_state, campaign_from_state
+)
+
+def make_campaign(i: int, rng: random.Random) -> MarketingCampaign:
+    now = datetime.now()
+    channels = ["social_media", "email", "content_marketing"]
+    return MarketingCampaign(
+        id=f"campaign_{i:06d}",
+        name=f"Campagne iFiveMe {i}",
+        type=rng.choice(list(CampaignType)),
+        status=CampaignStatus.RUNNING,
+        description="Lancement des cartes d'affaires virtuelles iFiveMe",
+        target_audience={"segments": ["entrepreneurs", "pme"], "regions": ["QC", "ON"]},
+        channels=channels,
+        budget=5000.0,
+        allocated_budget={channel: 5000.0 / len(channels) for channel in channels},
+        start_date=now,
+        end_date=now + timedelta(days=30),
+        objectives=["Augmenter les inscriptions", "Notoriété de marque"],
+        kpis={"target_ctr": 0.05, "target_conversion_rate": 0.03, "target_cpa": 20.0},
+        content_plan={"posts_per_week": 5, "themes": ["networking", "écologie", "innovation"]},
+        automation_rules=[],
+        created_at=now,
+        created_by="bench",
+        tags=["bench"],
+        ab_tests=[],
+        performance_data={}
+    )
+
+def populate(db_path: Path, campaigns: int, mutations: int, checkpoint: bool) -> dict:
+    rng = random.Random(42)
+    store = CampaignStateStore(db_path, campaign_to_state, campaign_from_state, wal_max_entries=10 ** 9)
+    state = {}
+    start = time.perf_counter()
+    for i in range(campaigns):
+        campaign = make_campaign(i, rng)
+        state[campaign.id] = campaign
+        changes = campaign_to_state(campaign)
+        changes["active"] = True
+        store.log(campaign.id, "create", changes)
+    log_seconds = time.perf_counter() - start
+
+    checkpoint_seconds = None
+    if checkpoint:
+        start = time.perf_counter()
+        store.checkpoint(state, state.keys())
+        checkpoint_seconds = time.perf_counter() - start
+
+    # Mutations postérieures au dernier checkpoint (pause/reprise, budgets)
+    ids = list(state)
+    for _ in range(mutations):
+        campaign_id = rng.choice(ids)
+        if rng.random() < 0.5:
+            store.log(campaign_id, "pause", {"status": "paused", "active": True})
+        else:
+            store.log(campaign_id, "budget", {"budget": rng.uniform(1000, 9000), "active": True})
+    store.close()
+    return {"log_seconds": log_seconds, "checkpoint_seconds": checkpoint_seconds}
+
+def measure_restart(db_path: Path) -> dict:
+    start = time.perf_counter()
+    store = CampaignStateStore(db_path, campaign_to_state, campaign_from_state)
+    campaigns, active_ids, replayed = store.load()
+    elapsed = time.perf_counter() - start
+    store.close()
+    return {"restart_ms": round(elapsed * 1000, 1), "campaigns": len(campaigns),
+            "active": len(active_ids), "wal_replayed": replayed}
+
+def run_benchmark(campaigns: int, mutations: int) -> dict:
+    report = {"campaigns": campaigns, "mutations_after_checkpoint": mutations, "scenarios": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, checkpoint in (("snapshot_plus_wal", True), ("wal_only", False)):
+            db_path = Path(tmp) / f"{name}.db"
+            timings = populate(db_path, campaigns, mutations, checkpoint)
+            result = measure_restart(db_path)
+            result["log_us_per_mutation"] = round(timings["log_seconds"] / campaigns * 1e6, 1)
+            if timings["checkpoint_seconds"] is not None:
+                result["checkpoint_ms"] = round(timings["checkpoint_seconds"] * 1000, 1)
+            result["db_bytes"] = sum(path.stat().st_size for path in Path(tmp).glob(f"{name}.db*"))
+            report["scenarios"][name] = result
+    report["under_one_second"] = all(s["restart_ms"] < 1000 for s in report["scenarios"].values())
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--campaigns", type=int, default=10_000)
+    parser.add_argument("--mutations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.campaigns, args.mutations), indent=2))
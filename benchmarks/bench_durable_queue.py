@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la queue persistante iFiveMe
+Mesure les débits d'enqueue / dequeue / ack de DurableTaskQueue sur 100k tâches
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.base_agent import AgentTask
+from utils.durable_queue import DurableTaskQueue
+
+def make_tasks(count: int):
+    now = datetime.now()
+    return [
+        AgentTask(
+            id=f"bench_{i}",
+            type="publish_post",
+            priority=i % 10,
+            data={"platform": "linkedin", "content": f"Post iFiveMe #{i}"},
+            created_at=now
+        )
+        for i in range(count)
+    ]
+
+def run_benchmark(count: int, batch_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = DurableTaskQueue(Path(tmp) / "bench_queue.db", prefetch=batch_size)
+        tasks = make_tasks(count)
+
+        # Enqueue en lots
+        start = time.perf_counter()
+        for i in range(0, count, batch_size):
+            queue.push_many(tasks[i:i + batch_size])
+        enqueue_seconds = time.perf_counter() - start
+
+        # Dequeue + ack en lots
+        start = time.perf_counter()
+        dequeued = 0
+        while True:
+            leased = queue.pop_many(batch_size)
+            if not leased:
+                break
+            queue.ack_many([task.id for task in leased])
+            dequeued += len(leased)
+        dequeue_seconds = time.perf_counter() - start
+
+        # Chemin unitaire (push / pop / ack), sur un échantillon
+        sample = make_tasks(min(count, 5000))
+        start = time.perf_counter()
+        for task in sample:
+            queue.push(task)
+        single_enqueue_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        while queue:
+            queue.ack(queue.pop())
+        single_dequeue_seconds = time.perf_counter() - start
+
+        queue.close()
+
+    return {
+        "tasks": count,
+        "batch_size": batch_size,
+        "batched_enqueue_per_second": round(count / enqueue_seconds),
+        "batched_dequeue_ack_per_second": round(dequeued / dequeue_seconds),
+        "single_sample": len(sample),
+        "single_enqueue_per_second": round(len(sample) / single_enqueue_seconds),
+        "single_dequeue_ack_per_second": round(len(sample) / single_dequeue_seconds)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.tasks, args.batch_size), indent=2))
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Benchmark de charge de l'orchestrateur iFiveMe
+Synthétise N campagnes, M posts programmés et C contacts, puis enchaîne création, lancement,
+monitoring et optimisation contre des agents simulés; rapport JSON (débit, latences, retard de boucle, mémoire)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.base_agent import BaseAgent, AgentTask
+
+TICK_INTERVAL = 0.01
+CAMPAIGN_TYPES = ["product_launch", "brand_awareness", "lead_generation", "customer_retention", "seasonal_promo"]
+CHANNEL_MIXES = [["social_media", "email"], ["social_media"], ["email"], ["social_media", "email", "content_marketing"]]
+
+# Noms sous lesquels l'orchestrateur cherche les agents (tâches et vérifications pré-lancement)
+MOCK_AGENT_ALIASES = {
+    "social_media": ["social_media"],
+    "email_marketing": ["email_marketing", "email"],
+    "content_creator": ["content_creator", "content"],
+    "analytics": ["analytics"]
+}
+
+class MockMarketingAgent(BaseAgent):
+    """Agent simulé: latence I/O aléatoire et réponses au format attendu par l'orchestrateur"""
+
+    def __init__(self, name: str, latency_ms: float, max_workers: int, rng: random.Random):
+        super().__init__(
+            agent_id=f"bench_{name}",
+            name=f"Bench {name}",
+            config={"max_workers": max_workers, "result_store": "json", "result_cache_ttl": 0}
+        )
+        self.latency = latency_ms / 1000
+        self.rng = rng
+        self.scheduled_posts: Dict[str, List[Dict[str, Any]]] = {}
+        self.contacts: List[Dict[str, Any]] = []
+
+    async def process_task(self, task: AgentTask) -> Dict[str, Any]:
+        # Latence d'un appel API (distribution exponentielle, queue longue)
+        await asyncio.sleep(self.rng.expovariate(1 / self.latency) if self.latency > 0 else 0)
+        handler = getattr(self, f"_handle_{task.type}", None)
+        return handler(task.data) if handler else {"success": True}
+
+    def _handle_create_content_plan(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        themes = data.get("themes", [])
+        return {
+            "content_calendar": {f"day_{day}": themes[day % len(themes)] for day in range(14)} if themes else {},
+            "asset_requirements": {"images": 10, "videos": 2}
+        }
+
+    def _handle_collect_campaign_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        channels = {}
+        for channel in data.get("channels", []):
+            clicks = self.rng.randint(200, 2000)
+            conversions = self.rng.randint(0, clicks // 10)
+            cost = self.rng.uniform(50, 800)
+            channels[channel] = {
+                "impressions": clicks * self.rng.randint(15, 40),
+                "clicks": clicks,
+                "conversions": conversions,
+                "cost": round(cost, 2),
+                "conversion_rate": conversions / clicks,
+                "negative_sentiment": self.rng.uniform(0.0, 0.35)
+            }
+        return {"success": True, "channels": channels}
+
+    def _handle_analyze_performance(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        posts = self.scheduled_posts.get(data.get("campaign_id"), [])
+        return {"success": True, "total_metrics": {"posts": len(posts), "engagement_rate": self.rng.uniform(0.01, 0.08)}}
+
+    def _handle_analyze_campaign(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        sent = len(self.contacts)
+        return {"success": True, "metrics": {
+            "sent": sent,
+            "delivered": int(sent * 0.97),
+            "open_rate": self.rng.uniform(15, 40),
+            "click_rate": self.rng.uniform(1, 8)
+        }}
+
+    def get_capabilities(self) -> List[str]:
+        return ["bench"]
+
+def synthesize_data(agents: Dict[str, MockMarketingAgent], campaign_ids: List[str],
+                    posts: int, contacts: int, rng: random.Random):
+    """Répartit M posts programmés entre les campagnes et crée C contacts"""
+    social = agents["social_media"]
+    now = datetime.now()
+    for i in range(posts):
+        campaign_id = campaign_ids[i % len(campaign_ids)] if campaign_ids else None
+        social.scheduled_posts.setdefault(campaign_id, []).append({
+            "id": f"post_{i}",
+            "platform": rng.choice(["linkedin", "twitter", "facebook", "instagram"]),
+            "content": f"Découvrez les cartes d'affaires virtuelles iFiveMe #{i}",
+            "scheduled_time": (now + timedelta(minutes=rng.randint(1, 30 * 24 * 60))).isoformat()
+        })
+    agents["email_marketing"].contacts = [
+        {"email": f"contact{i}@example.com", "segment": rng.choice(["entrepreneurs", "pme", "etudiants"]),
+         "engagement_score": rng.random()}
+        for i in range(contacts)
+    ]
+
+def latency_summary(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+class LoopLagMonitor:
+    """Mesure le retard des réveils d'une coroutine (blocages de la boucle d'événements)"""
+
+    def __init__(self, interval: float = TICK_INTERVAL):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - expected))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def reset(self) -> List[float]:
+        lags, self.lags = self.lags, []
+        return lags
+
+async def run_phase(name: str, orchestrator, task_specs: List[tuple], concurrency: int,
+                    lag_monitor: LoopLagMonitor) -> Tuple[Dict[str, Any], List[Any]]:
+    """Soumet les tâches (type, données) à l'orchestrateur, au plus concurrency à la fois"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+    results = []
+
+    async def run_one(task_type: str, data: Dict[str, Any]):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                future = await orchestrator.submit(orchestrator.create_task(task_type, 5, data))
+                result = await future
+            except Exception:
+                failures += 1
+                result = None
+            latencies.append(time.perf_counter() - start)
+            results.append(result)
+
+    lag_monitor.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one(task_type, data) for task_type, data in task_specs))
+    elapsed = time.perf_counter() - start
+    lag_stats = latency_summary(lag_monitor.reset())
+
+    report = {
+        "operations": len(task_specs),
+        "failures": failures,
+        "wall_seconds": round(elapsed, 3),
+        "ops_per_second": round(len(task_specs) / elapsed, 1) if elapsed > 0 else None,
+        "latency": latency_summary(latencies),
+        "loop_lag": {
+            "ticks": lag_stats["count"],
+            "p50_ms": lag_stats.get("p50_ms"),
+            "p99_ms": lag_stats.get("p99_ms"),
+            "max_ms": lag_stats.get("max_ms")
+        }
+    }
+    logging.getLogger("bench").info(f"Phase {name}: {report['ops_per_second']} ops/s")
+    return report, results
+
+async def drain_agents(agents: Dict[str, MockMarketingAgent]) -> int:
+    """Exécute les tâches de canal laissées en queue (add_task ne démarre pas les workers)"""
+    pending = sum(len(agent.task_queue) for agent in agents.values())
+    for agent in agents.values():
+        # Une crise simulée (sentiment négatif) suspend les tâches peu prioritaires pour 30 minutes
+        agent.resume_low_priority()
+    await asyncio.gather(*(agent.execute_tasks() for agent in agents.values()
+                           if agent.task_queue and not agent.is_active))
+    return pending
+
+async def run_benchmark(campaigns: int, posts: int, contacts: int, cycles: int, concurrency: int,
+                        agent_latency_ms: float, agent_workers: int, seed: int) -> Dict[str, Any]:
+    from agents.orchestrator_agent import MarketingOrchestrator
+
+    rng = random.Random(seed)
+    orchestrator = MarketingOrchestrator()
+    orchestrator.max_workers = concurrency
+
+    agents = {name: MockMarketingAgent(name, agent_latency_ms, agent_workers, rng) for name in MOCK_AGENT_ALIASES}
+    for name, aliases in MOCK_AGENT_ALIASES.items():
+        for alias in aliases:
+            orchestrator.marketing_agents.register_instance(alias, agents[name])
+
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    phases = {}
+
+    try:
+        start_date = datetime.now() + timedelta(hours=1)
+        create_specs = [
+            ("create_campaign", {
+                "name": f"Campagne de charge {i}",
+                "type": rng.choice(CAMPAIGN_TYPES),
+                "channels": rng.choice(CHANNEL_MIXES),
+                "budget": round(rng.uniform(500, 20_000), 2),
+                "priority": rng.randint(1, 10),
+                "start_date": start_date.isoformat(),
+                "end_date": (start_date + timedelta(days=rng.randint(7, 90))).isoformat()
+            })
+            for i in range(campaigns)
+        ]
+        phases["create"], results = await run_phase("create", orchestrator, create_specs, concurrency, lag_monitor)
+        campaign_ids = [result["campaign_id"] for result in results if result and result.get("success")]
+
+        synthesize_data(agents, campaign_ids, posts, contacts, rng)
+        phases["create"]["channel_tasks_drained"] = await drain_agents(agents)
+
+        launch_specs = [("launch_campaign", {"campaign_id": campaign_id}) for campaign_id in campaign_ids]
+        phases["launch"], results = await run_phase("launch", orchestrator, launch_specs, concurrency, lag_monitor)
+        phases["launch"]["launched"] = sum(1 for result in results if result and result.get("success"))
+        phases["launch"]["channel_tasks_drained"] = await drain_agents(agents)
+
+        # Un passage de monitoring couvre toutes les campagnes actives
+        monitor_specs = [("performance_monitoring", {})]
+        monitor_reports = []
+        for _ in range(cycles):
+            report, _ = await run_phase("monitor", orchestrator, monitor_specs, 1, lag_monitor)
+            monitor_reports.append(report)
+        phases["monitor"] = {
+            "cycles": cycles,
+            "campaigns_per_cycle": len(orchestrator.active_campaigns),
+            "cycle_latency": latency_summary([report["wall_seconds"] for report in monitor_reports]),
+            "campaigns_per_second": round(
+                len(orchestrator.active_campaigns) * cycles / sum(r["wall_seconds"] for r in monitor_reports), 1
+            ) if monitor_reports and sum(r["wall_seconds"] for r in monitor_reports) > 0 else None,
+            "loop_lag_max_ms": max((r["loop_lag"]["max_ms"] or 0 for r in monitor_reports), default=None),
+            "alerts_stored": len(orchestrator.alerts),
+            "crisis_responses": orchestrator.orchestrator_metrics.crisis_responses,
+            "crisis_response_latency": orchestrator.crisis_response_latency.snapshot()
+        }
+
+        optimize_specs = [("optimize_campaign", {"campaign_id": campaign_id}) for campaign_id in orchestrator.active_campaigns]
+        phases["optimize"], _ = await run_phase("optimize", orchestrator, optimize_specs, concurrency, lag_monitor)
+        phases["optimize"]["channel_tasks_drained"] = await drain_agents(agents)
+
+        phases["portfolio_budget"], results = await run_phase(
+            "portfolio_budget", orchestrator, [("portfolio_budget_optimization", {})], 1, lag_monitor
+        )
+    finally:
+        await lag_monitor.stop()
+        orchestrator.checkpoint_campaign_state()
+        await orchestrator.stop()
+        for agent in agents.values():
+            await agent.stop()
+
+    return {
+        "campaigns": campaigns,
+        "campaigns_created": len(campaign_ids),
+        "active_campaigns": len(orchestrator.active_campaigns),
+        "scheduled_posts": posts,
+        "contacts": contacts,
+        "phases": phases,
+        "orchestrator_latency": orchestrator.latency_metrics.snapshot()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--campaigns", type=int, default=500)
+    parser.add_argument("--posts", type=int, default=50_000, help="Posts programmés synthétiques")
+    parser.add_argument("--contacts", type=int, default=100_000, help="Contacts email synthétiques")
+    parser.add_argument("--cycles", type=int, default=3, help="Passages de monitoring")
+    parser.add_argument("--concurrency", type=int, default=32, help="Tâches d'orchestration simultanées")
+    parser.add_argument("--agent-latency-ms", type=float, default=2.0, help="Latence moyenne des agents simulés")
+    parser.add_argument("--agent-workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Mesure le pic d'allocations Python (ralentit l'exécution)")
+    parser.add_argument("--output", type=Path, help="Écrit aussi le rapport JSON dans ce fichier")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    # Les logs INFO par tâche fausseraient la mesure
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    # Les agents créent data/<agent_id> dans le répertoire courant
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            start = time.perf_counter()
+            report = asyncio.run(run_benchmark(
+                args.campaigns, args.posts, args.contacts, args.cycles, args.concurrency,
+                args.agent_latency_ms, args.agent_workers, args.seed
+            ))
+            report["total_seconds"] = round(time.perf_counter() - start, 3)
+        finally:
+            os.chdir(cwd)
+
+    report["memory"] = {"max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    if args.tracemalloc:
+        report["memory"]["python_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    report["environment"] = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count()
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark du pool de processus iFiveMe
+Mesure la latence de la boucle d'événements pendant des tâches CPU, exécutées sur la boucle puis dans le pool
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import os
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.base_agent import BaseAgent, AgentTask
+from utils.process_pool import get_process_pool, shutdown_process_pool
+
+TICK_INTERVAL = 0.01
+
+class CPUBoundAgent(BaseAgent):
+    """Agent synthétique dont le handler est un calcul pur (type scoring/attribution)"""
+
+    def __init__(self, offload: bool = False, iterations: int = 300_000):
+        super().__init__(
+            agent_id="bench_cpu_agent",
+            name="Bench CPU Agent",
+            config={
+                "max_workers": 4,
+                "result_store": "json",
+                "process_pool_task_types": ["score"] if offload else [],
+                "process_pool_agent_kwargs": {"iterations": iterations}
+            }
+        )
+        self.iterations = iterations
+
+    async def process_task(self, task: AgentTask):
+        total = 0.0
+        for i in range(self.iterations):
+            total += (i * 31 % 97) ** 0.5
+        return {"success": True, "score": total}
+
+    def get_capabilities(self):
+        return ["score"]
+
+async def measure_loop_lag(agent: CPUBoundAgent, tasks: int) -> dict:
+    """Exécute les tâches pendant qu'une coroutine mesure le retard de ses réveils"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = time.perf_counter() + TICK_INTERVAL
+            await asyncio.sleep(TICK_INTERVAL)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    for _ in range(tasks):
+        await agent.add_task(agent.create_task("score", 5, {}))
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await agent.execute_tasks()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker_task
+
+    lags.sort()
+    return {
+        "tasks": tasks,
+        "wall_seconds": round(elapsed, 3),
+        "tasks_per_second": round(tasks / elapsed, 1),
+        "loop_lag_ms_p50": round(statistics.median(lags) * 1000, 2) if lags else None,
+        "loop_lag_ms_p99": round(lags[int(len(lags) * 0.99) - 1] * 1000, 2) if lags else None,
+        "loop_lag_ms_max": round(lags[-1] * 1000, 2) if lags else None,
+        "ticks": len(lags),
+        "tasks_offloaded": agent.metrics.tasks_offloaded,
+        "offloaded_cpu_seconds": round(agent.metrics.offloaded_cpu_seconds, 3)
+    }
+
+async def run_benchmark(tasks: int, iterations: int) -> dict:
+    # Démarrer les workers avant la mesure pour exclure le coût de création des processus
+    await asyncio.get_running_loop().run_in_executor(get_process_pool(), time.sleep, 0)
+    try:
+        inline = await measure_loop_lag(CPUBoundAgent(offload=False, iterations=iterations), tasks)
+        offloaded = await measure_loop_lag(CPUBoundAgent(offload=True, iterations=iterations), tasks)
+    finally:
+        shutdown_process_pool()
+    return {"cpu_count": os.cpu_count(), "inline": inline, "process_pool": offloaded}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--iterations", type=int, default=300_000)
+    args = parser.parse_args()
+
+    # Les agents créent data/<agent_id> dans le répertoire courant
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        print(json.dumps(asyncio.run(run_benchmark(args.tasks, args.iterations)), indent=2))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire des enregistrements iFiveMe
+Compare les records à __slots__ à leur équivalent @dataclass classique (mémoire et sérialisation)
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import MISSING, asdict, field, fields, make_dataclass
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.base_agent import AgentTask
+from utils.records import record_to_dict
+from utils.quality_control_loop import ProductionItem, QualityStatus
+from agents.email_marketing_agent import EmailContact
+from agents.approval_workflow_agent import PendingPost
+
+def plain_twin(cls):
+    """Recrée la classe en @dataclass classique (avec __dict__) pour la comparaison"""
+    spec = []
+    for f in fields(cls):
+        if f.default is not MISSING:
+            spec.append((f.name, f.type, field(default=f.default)))
+        elif f.default_factory is not MISSING:
+            spec.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass(f"Plain{cls.__name__}", spec)
+
+def factories():
+    now = datetime.now()
+    return {
+        AgentTask: lambda cls, i: cls(
+            id=f"task_{i}", type="publish_post", priority=i % 10,
+            data={"platform": "linkedin"}, created_at=now
+        ),
+        EmailContact: lambda cls, i: cls(
+            email=f"contact{i}@ifiveme.com", name=f"Contact {i}",
+            segments=["new_users"], preferences={}, engagement_score=0.5
+        ),
+        PendingPost: lambda cls, i: cls(
+            id=f"post_{i}", title="Post iFiveMe", content="Cartes d'affaires virtuelles",
+            platform="linkedin", created_by="bench", created_at=now, scheduled_time=None
+        ),
+        ProductionItem: lambda cls, i: cls(
+            id=f"item_{i}", type="social_post", content="Contenu", iteration=1,
+            status=QualityStatus.PENDING, quality_score=0.0, assessments=[],
+            created_at=now, last_modified=now, feedback_history=[]
+        ),
+    }
+
+def measure_memory(cls, factory, count: int) -> int:
+    tracemalloc.start()
+    instances = [factory(cls, i) for i in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return current
+
+def measure_serialization(instances, serializer) -> float:
+    start = time.perf_counter()
+    for instance in instances:
+        serializer(instance)
+    return time.perf_counter() - start
+
+def run_benchmark(count: int) -> dict:
+    report = {"records": count, "python": sys.version.split()[0], "classes": {}}
+
+    for cls, factory in factories().items():
+        plain_cls = plain_twin(cls)
+        slotted_bytes = measure_memory(cls, factory, count)
+        plain_bytes = measure_memory(plain_cls, factory, count)
+
+        sample = min(count, 50_000)
+        slotted = [factory(cls, i) for i in range(sample)]
+        plain = [factory(plain_cls, i) for i in range(sample)]
+
+        report["classes"][cls.__name__] = {
+            "has_dict": hasattr(slotted[0], "__dict__"),
+            "plain_bytes_per_record": round(plain_bytes / count, 1),
+            "slotted_bytes_per_record": round(slotted_bytes / count, 1),
+            "memory_saved_percent": round(100 * (1 - slotted_bytes / plain_bytes), 1),
+            "asdict_per_second": round(sample / measure_serialization(plain, asdict)),
+            "record_to_dict_per_second": round(sample / measure_serialization(slotted, record_to_dict))
+        }
+
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.records), indent=2))
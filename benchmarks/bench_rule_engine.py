@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur de règles iFiveMe
+Compile les règles d'automatisation de l'orchestrateur et les évalue sur N campagnes (lot vs unitaire)
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.rule_engine import RuleEngine
+
+def make_campaign_metrics(count: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    return {
+        f"campaign_{i}": {
+            "budget_spent": rng.uniform(0, 1.2),
+            "conversion_rate": rng.uniform(0, 0.1),
+            "negative_sentiment": rng.uniform(0, 0.5),
+            "roi": rng.uniform(-1, 5),
+            "clicks": rng.randint(0, 10_000)
+        }
+        for i in range(count)
+    }
+
+def load_orchestrator_rules() -> list:
+    # L'orchestrateur crée data/<agent_id> dans le répertoire courant
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            from agents.orchestrator_agent import MarketingOrchestrator
+            return MarketingOrchestrator().automation_rules
+        finally:
+            os.chdir(cwd)
+
+def run_benchmark(campaigns: int, repeats: int) -> dict:
+    rules = load_orchestrator_rules()
+
+    start = time.perf_counter()
+    engine = RuleEngine(rules)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    metrics = make_campaign_metrics(campaigns)
+
+    batch_samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        matches = engine.evaluate_batch(metrics)
+        batch_samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    single_matches = {campaign_id: engine.evaluate(row) for campaign_id, row in metrics.items()}
+    single_ms = (time.perf_counter() - start) * 1000
+
+    assert all(
+        [r.name for r in matches[cid]] == [r.name for r in single_matches[cid]] for cid in metrics
+    ), "Lot et évaluation unitaire divergent"
+
+    return {
+        "campaigns": campaigns,
+        "rules": len(engine.rules),
+        "compile_ms": round(compile_ms, 3),
+        "batch_ms_median": round(statistics.median(batch_samples), 3),
+        "batch_ms_min": round(min(batch_samples), 3),
+        "per_campaign_ms": round(single_ms, 3),
+        "rules_fired": sum(len(fired) for fired in matches.values())
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--campaigns", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.campaigns, args.repeats), indent=2))
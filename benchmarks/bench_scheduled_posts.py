@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la file des posts programmés iFiveMe
+Compare le tas min (DueQueue) à l'ancienne liste filtrée + remove() pour N posts répartis sur 30 jours
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.due_queue import DueQueue
+
+HORIZON = 30 * 86400  # Posts répartis sur 30 jours
+
+@dataclass
+class Post:
+    id: str
+    platform: str
+    scheduled_time: float
+    status: str = "scheduled"
+
+def make_posts(count: int, start: float, rng: random.Random) -> List[Post]:
+    platforms = ["linkedin", "twitter", "facebook", "instagram"]
+    return [
+        Post(id=f"post_{i}", platform=rng.choice(platforms), scheduled_time=start + rng.uniform(0, HORIZON))
+        for i in range(count)
+    ]
+
+def run_heap(posts: List[Post], start: float, ticks: int, batch_size: int) -> dict:
+    queue: DueQueue[Post] = DueQueue()
+    begin = time.perf_counter()
+    for post in posts:
+        queue.push(post, post.scheduled_time)
+    insert_seconds = time.perf_counter() - begin
+
+    # Réveils du dispatcher: chaque réveil vide les posts échus par lots et lit la prochaine échéance
+    dispatched = 0
+    begin = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        now = start + HORIZON * tick / ticks
+        while True:
+            batch = queue.pop_due(now, limit=batch_size)
+            dispatched += len(batch)
+            if len(batch) < batch_size:
+                break
+        queue.next_due()
+    dispatch_seconds = time.perf_counter() - begin
+
+    return {
+        "insert_us_per_post": round(insert_seconds / len(posts) * 1e6, 2),
+        "dispatch_seconds": round(dispatch_seconds, 4),
+        "dispatch_us_per_post": round(dispatch_seconds / max(1, dispatched) * 1e6, 2),
+        "dispatched": dispatched
+    }
+
+def run_legacy(posts: List[Post], start: float, ticks: int) -> dict:
+    scheduled: List[Post] = []
+    begin = time.perf_counter()
+    for post in posts:
+        scheduled.append(post)
+    insert_seconds = time.perf_counter() - begin
+
+    # Ancienne implémentation: filtre complet, remove() par post, min() pour la prochaine échéance
+    dispatched = 0
+    begin = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        now = start + HORIZON * tick / ticks
+        due_posts = [post for post in scheduled if post.scheduled_time <= now and post.status == "scheduled"]
+        for post in due_posts:
+            post.status = "published"
+            scheduled.remove(post)
+            dispatched += 1
+        pending = [post.scheduled_time for post in scheduled if post.status == "scheduled"]
+        if pending:
+            min(pending)
+    dispatch_seconds = time.perf_counter() - begin
+
+    return {
+        "insert_us_per_post": round(insert_seconds / len(posts) * 1e6, 2),
+        "dispatch_seconds": round(dispatch_seconds, 4),
+        "dispatch_us_per_post": round(dispatch_seconds / max(1, dispatched) * 1e6, 2),
+        "dispatched": dispatched
+    }
+
+def run_benchmark(posts: int, legacy_posts: int, ticks: int, batch_size: int) -> dict:
+    rng = random.Random(42)
+    start = time.time()
+    report = {
+        "posts": posts,
+        "ticks": ticks,
+        "batch_size": batch_size,
+        "heap": run_heap(make_posts(posts, start, rng), start, ticks, batch_size)
+    }
+    if legacy_posts:
+        # Comparaison à taille égale (l'ancienne version est quadratique)
+        report["legacy_posts"] = legacy_posts
+        report["heap_same_size"] = run_heap(make_posts(legacy_posts, start, rng), start, ticks, batch_size)
+        report["legacy"] = run_legacy(make_posts(legacy_posts, start, rng), start, ticks)
+        report["speedup"] = round(
+            report["legacy"]["dispatch_seconds"] / max(report["heap_same_size"]["dispatch_seconds"], 1e-9), 1
+        )
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--legacy-posts", type=int, default=5_000, help="0 pour ne pas mesurer l'ancienne version")
+    parser.add_argument("--ticks", type=int, default=720, help="Réveils du dispatcher sur 30 jours")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.posts, args.legacy_posts, args.ticks, args.batch_size), indent=2))
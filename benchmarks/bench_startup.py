@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark de démarrage à froid iFiveMe
+Mesure le temps d'import + construction de l'orchestrateur et la mémoire associée
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Exécuté dans un interpréteur neuf pour mesurer un vrai démarrage à froid
+COLD_START_SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from agents.orchestrator_agent import MarketingOrchestrator
+imported = time.perf_counter()
+orchestrator = MarketingOrchestrator()
+built = time.perf_counter()
+heavy = ["playwright", "openai", "pandas", "googleapiclient", "requests"]
+print(json.dumps({{
+    "import_seconds": imported - start,
+    "construct_seconds": built - imported,
+    "total_seconds": built - start,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules_loaded": len(sys.modules),
+    "heavy_modules_loaded": [name for name in heavy if name in sys.modules],
+    "agents_loaded": len(orchestrator.marketing_agents)
+}}))
+"""
+
+def run_once() -> dict:
+    # Répertoire temporaire: les agents créent data/<agent_id> dans le cwd
+    with tempfile.TemporaryDirectory() as tmp:
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT.format(root=str(PROJECT_ROOT))],
+            cwd=tmp, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(runs: int) -> dict:
+    samples = [run_once() for _ in range(runs)]
+    return {
+        "runs": runs,
+        "total_seconds_median": round(statistics.median(s["total_seconds"] for s in samples), 4),
+        "import_seconds_median": round(statistics.median(s["import_seconds"] for s in samples), 4),
+        "construct_seconds_median": round(statistics.median(s["construct_seconds"] for s in samples), 4),
+        "max_rss_kb_median": statistics.median(s["max_rss_kb"] for s in samples),
+        "modules_loaded": samples[-1]["modules_loaded"],
+        "heavy_modules_loaded": samples[-1]["heavy_modules_loaded"],
+        "agents_loaded": samples[-1]["agents_loaded"]
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.runs), indent=2))
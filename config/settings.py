@@ -100,6 +100,22 @@ API_KEYS = {
     "firecrawl": "fc-9693fe7608a14ff7a988520c8ccd7020"
 }
 
+# Limites de débit des APIs: débit soutenu et rafale par plateforme et endpoint
+# ("default" s'applique aux endpoints non listés). Le backend "sqlite" partage
+# les seaux entre les processus; "memory" les garde dans le processus courant.
+RATE_LIMITS = {
+    "backend": "sqlite",
+    "db_path": DATA_DIR / "rate_limits.db",
+    "limits": {
+        "linkedin": {"default": {"per_hour": 100, "burst": 10}},
+        "twitter": {"default": {"per_hour": 300, "burst": 25}},
+        "facebook": {"default": {"per_hour": 200, "burst": 20}},
+        "instagram": {"default": {"per_hour": 200, "burst": 20}},
+        "tiktok": {"default": {"per_hour": 100, "burst": 10}},
+        "email": {"send": {"per_hour": 100, "burst": 100}}
+    }
+}
+
 # Configuration des contenus
 CONTENT_TEMPLATES = {
     "social_posts": {
@@ -14,7 +14,7 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent))
 
 from config.settings import LOGGING_CONFIG
-from agents.orchestrator_agent import MarketingOrchestrator
+from agents.orchestrator_agent import MarketingOrchestrator, create_marketing_orchestrator
 from utils.base_agent import AgentTask
 
 # Configuration du logging
@@ -32,7 +32,7 @@ async def demo_campaign_creation():
 
     # Créer l'orchestrateur
     print("\n📋 Initialisation de l'orchestrateur marketing...")
-    orchestrator = MarketingOrchestrator()
+    orchestrator = await create_marketing_orchestrator()
 
     # Vérifier la santé du système
     health_check = await orchestrator.health_check()
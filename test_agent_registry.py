@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests du registre d'agents paresseux - chargement à la demande et mode dégradé
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.agent_registry import LazyAgentRegistry
+
+def test_contains_does_not_load():
+    """"in" répond depuis les déclarations, sans importer ni construire l'agent"""
+    registry = LazyAgentRegistry()
+    registry.register("stats", "statistics", "NormalDist", mu=0.0, sigma=1.0)
+    assert "stats" in registry
+    assert "unknown" not in registry
+    assert not registry.is_loaded("stats")
+    assert len(registry) == 0
+
+def test_get_loads_once():
+    """Le premier accès construit l'agent, les suivants le réutilisent"""
+    registry = LazyAgentRegistry()
+    registry.register("stats", "statistics", "NormalDist", mu=1.0, sigma=2.0)
+    agent = registry["stats"]
+    assert agent.mean == 1.0
+    assert registry.get("stats") is agent
+    assert registry.keys() == ["stats"]
+
+def test_unavailable_agent_is_degraded():
+    """Un import en échec marque l'agent indisponible: get() retourne None, "in" devient faux"""
+    registry = LazyAgentRegistry()
+    registry.register("missing", "module_introuvable_ifiveme", "Agent")
+    assert "missing" in registry
+    assert registry.get("missing") is None
+    assert "missing" not in registry
+    assert "missing" in registry.unavailable()
+    try:
+        registry["missing"]
+        raise AssertionError("KeyError attendue")
+    except KeyError:
+        pass
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests du stockage borné des alertes - déduplication, réindexation et éviction
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.alert_store import AlertStore
+
+def test_dedup_increments_count():
+    """Une alerte répétée incrémente son compteur au lieu d'être ajoutée"""
+    store = AlertStore()
+    store.add({"type": "perf", "campaign_id": "c1", "rule": "low_ctr", "severity": "medium"})
+    entry = store.add({"type": "perf", "campaign_id": "c1", "rule": "low_ctr", "severity": "medium"})
+    assert len(store) == 1
+    assert entry["count"] == 2
+    assert store.deduplicated == 1
+
+def test_dedup_reindexes_changed_severity():
+    """Une répétition de sévérité différente quitte l'ancien index"""
+    store = AlertStore()
+    store.add({"type": "perf", "campaign_id": "c", "severity": "low"})
+    store.add({"type": "perf", "campaign_id": "c", "severity": "high"})
+    assert store.query(severity="low") == []
+    assert [alert["severity"] for alert in store.query(severity="high")] == ["high"]
+    assert store.count_by("severity") == {"high": 1}
+
+def test_eviction_after_severity_change():
+    """L'éviction d'une alerte réindexée ne laisse pas d'entrée orpheline"""
+    store = AlertStore(max_alerts=1)
+    store.add({"type": "perf", "campaign_id": "c", "severity": "low"})
+    store.add({"type": "perf", "campaign_id": "c", "severity": "high"})
+    store.add({"type": "budget", "campaign_id": "d", "severity": "medium"})
+    assert store.query(severity="low") == []
+    assert store.query(severity="high") == []
+    assert len(store.query(campaign_id="d")) == 1
+    assert store.evicted == 1
+
+def test_bounded_and_most_recent_first():
+    """Au-delà de max_alerts, les plus anciennes sont évincées"""
+    store = AlertStore(max_alerts=3)
+    for i in range(5):
+        store.add({"type": "perf", "campaign_id": f"c{i}", "severity": "low"})
+    assert len(store) == 3
+    assert [alert["campaign_id"] for alert in store.query(type="perf")] == ["c4", "c3", "c2"]
+    assert store.query(campaign_id="c0") == []
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Tests de BaseAgent - queue de priorité, pool de workers, cache d'idempotence et contrôle d'admission
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.base_agent import AdmissionStatus, AgentTask, BaseAgent, PriorityTaskQueue
+
+class CountingAgent(BaseAgent):
+    """Agent de test: compte les exécutions de process_task et leur parallélisme"""
+
+    def __init__(self, config=None):
+        super().__init__("test_agent", "Agent de test", config or {})
+        self.calls = 0
+        self.order = []
+        self.running = 0
+        self.max_running = 0
+
+    async def process_task(self, task):
+        self.calls += 1
+        self.order.append(task.data.get("i"))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(task.data.get("delay", 0.01))
+        finally:
+            self.running -= 1
+        if task.data.get("fail"):
+            return {"success": False, "error": "échec simulé"}
+        return {"success": True, "call": self.calls}
+
+    def get_capabilities(self):
+        return []
+
+@contextmanager
+def isolated_data_dir():
+    """Les agents écrivent dans data/<agent_id>: un répertoire temporaire par test"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield
+        finally:
+            os.chdir(previous)
+
+def make_task(priority: int, i: int) -> AgentTask:
+    return AgentTask(id=f"t{i}", type="post", priority=priority, data={"i": i}, created_at=datetime.now())
+
+def test_queue_orders_by_priority_then_fifo():
+    """La priorité la plus haute sort d'abord, l'ordre d'insertion départage les égalités"""
+    queue = PriorityTaskQueue()
+    for i, priority in enumerate([1, 5, 3, 5, 1, 10]):
+        queue.push(make_task(priority, i))
+    assert queue.peek().id == "t5"
+    assert [task.data["i"] for task in queue] == [5, 1, 3, 2, 0, 4]
+    assert [queue.pop().data["i"] for _ in range(len(queue))] == [5, 1, 3, 2, 0, 4]
+    assert not queue
+
+def test_add_tasks_runs_batch_in_priority_order():
+    """add_tasks ajoute le lot en une fois; un worker unique le traite par priorité"""
+    async def scenario():
+        agent = CountingAgent()
+        tasks = [agent.create_task("post", priority, {"i": i}) for i, priority in enumerate([2, 9, 2, 5])]
+        assert await agent.add_tasks(tasks) == 4
+        assert len(agent.task_queue) == 4
+        await agent.execute_tasks()
+        assert agent.order == [1, 3, 0, 2]
+        assert all(task.status == "completed" for task in tasks)
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_worker_pool_runs_tasks_in_parallel():
+    """max_workers workers consomment la queue en parallèle, sans dépasser la limite"""
+    async def scenario():
+        agent = CountingAgent({"max_workers": 4})
+        await agent.add_tasks([agent.create_task("post", 5, {"i": i, "delay": 0.1}) for i in range(8)])
+        start = time.perf_counter()
+        await agent.execute_tasks()
+        elapsed = time.perf_counter() - start
+        assert agent.calls == 8
+        assert agent.max_running == 4
+        assert elapsed < 0.4
+        assert not agent.is_active
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_agent_built_outside_event_loop():
+    """Un agent construit dans un autre thread fonctionne ensuite dans la boucle principale"""
+    with isolated_data_dir():
+        agents = []
+        builder = threading.Thread(target=lambda: agents.append(CountingAgent({"queue_high_watermark": 10})))
+        builder.start()
+        builder.join()
+        agent = agents[0]
+        assert agent._space_event is None and agent._wakeup_event is None
+
+        async def scenario():
+            future = await agent.submit(agent.create_task("post", 5, {"i": 0}))
+            assert (await future)["success"]
+
+        asyncio.run(scenario())
+
+def test_idempotent_results_are_cached():
+    """Deux soumissions équivalentes successives: une seule exécution"""
+    async def scenario():
+        agent = CountingAgent()
+        first = await agent.submit(agent.create_task("report", 5, {"campaign_id": "c1"}, deduplicate=True))
+        first_result = await first
+        second = await agent.submit(agent.create_task("report", 5, {"campaign_id": "c1"}, deduplicate=True))
+        assert await second == first_result
+        assert agent.calls == 1
+        assert agent.metrics.cache_hits == 1
+        await agent.stop()
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_concurrent_duplicates_share_one_execution():
+    """Des doublons soumis en même temps se rattachent à l'exécution en cours"""
+    async def scenario():
+        agent = CountingAgent({"max_workers": 3})
+        futures = [
+            await agent.submit(agent.create_task("report", 5, {"campaign_id": "c1"}, deduplicate=True))
+            for _ in range(3)
+        ]
+        results = await asyncio.gather(*futures)
+        assert agent.calls == 1
+        assert all(result == results[0] for result in results)
+        assert agent.metrics.deduplicated_tasks == 2
+        await agent.stop()
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_uncached_and_failed_results_are_recomputed():
+    """cache_result=False et les échecs "soft" ne sont jamais servis depuis le cache"""
+    async def scenario():
+        agent = CountingAgent()
+        for _ in range(2):
+            future = await agent.submit(agent.create_task("collect", 5, {"campaign_id": "c1"},
+                                                          deduplicate=True, cache_result=False))
+            await future
+        for _ in range(2):
+            future = await agent.submit(agent.create_task("collect", 5, {"fail": True}, deduplicate=True))
+            await future
+        assert agent.calls == 4
+        assert agent.metrics.cache_hits == 0
+        await agent.stop()
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_reject_policy_refuses_when_saturated():
+    """Au-delà du seuil haut, la politique reject refuse jusqu'au seuil bas"""
+    async def scenario():
+        agent = CountingAgent({"queue_high_watermark": 3, "queue_low_watermark": 1, "admission_policy": "reject"})
+        statuses = [await agent.admit_task(agent.create_task("post", 5, {"i": i})) for i in range(5)]
+        assert statuses == [AdmissionStatus.ACCEPTED] * 3 + [AdmissionStatus.REJECTED] * 2
+        assert agent.metrics.tasks_rejected == 2
+
+        # Hystérésis: toujours saturée à 2 tâches, de nouveau ouverte à 1
+        agent.task_queue.pop()
+        assert await agent.admit_task(agent.create_task("post", 5, {})) is AdmissionStatus.REJECTED
+        agent.task_queue.pop()
+        assert await agent.admit_task(agent.create_task("post", 5, {})) is AdmissionStatus.ACCEPTED
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_shed_policy_drops_low_priority_only():
+    """La politique shed abandonne les tâches peu prioritaires et admet les autres jusqu'au maximum"""
+    async def scenario():
+        agent = CountingAgent({"max_queue_size": 4, "queue_high_watermark": 2, "queue_low_watermark": 1,
+                               "admission_policy": "shed"})
+        for i in range(2):
+            await agent.admit_task(agent.create_task("post", 5, {"i": i}))
+
+        low = agent.create_task("post", 1, {})
+        assert await agent.admit_task(low) is AdmissionStatus.SHED
+        assert low.status == "shed"
+        assert await agent.admit_task(agent.create_task("post", 8, {})) is AdmissionStatus.ACCEPTED
+        assert await agent.admit_task(agent.create_task("post", 8, {})) is AdmissionStatus.ACCEPTED
+        assert await agent.admit_task(agent.create_task("post", 8, {})) is AdmissionStatus.REJECTED
+        assert agent.metrics.tasks_shed == 1
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_wait_policy_times_out_and_rejected_future_fails():
+    """La politique wait refuse après son délai; submit() retourne alors une Future en échec"""
+    async def scenario():
+        agent = CountingAgent({"queue_high_watermark": 1, "queue_low_watermark": 0,
+                               "admission_policy": "wait", "admission_timeout": 0.05})
+        await agent.admit_task(agent.create_task("post", 5, {}))
+        future = await agent.submit(agent.create_task("post", 5, {}))
+        try:
+            await future
+            raise AssertionError("La tâche aurait dû être refusée")
+        except RuntimeError as e:
+            assert "rejected" in str(e)
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+def test_wait_policy_timeout_is_finite_by_default():
+    """Sans configuration, la politique wait n'attend pas indéfiniment"""
+    with isolated_data_dir():
+        assert CountingAgent().admission_timeout == 30.0
+        assert CountingAgent({"admission_timeout": None}).admission_timeout is None
+
+def test_add_tasks_starts_fast_lane_tasks():
+    """add_tasks lance les tâches de crise en voie rapide au lieu de les mettre en queue"""
+    async def scenario():
+        agent = CountingAgent({"fast_lane_task_types": ["crisis_management"],
+                               "queue_high_watermark": 1, "admission_policy": "reject"})
+        crisis = agent.create_task("crisis_management", 10, {"i": 0})
+        added = await agent.add_tasks([agent.create_task("post", 5, {"i": 1}), crisis,
+                                       agent.create_task("post", 5, {"i": 2})])
+        assert added == 2
+        assert len(agent.task_queue) == 1
+        await asyncio.sleep(0.05)
+        assert crisis.status == "completed"
+        assert agent.metrics.fast_lane_tasks == 1
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests de l'optimiseur de budget multi-campagnes - répartition, minimums et limite de campagnes
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+import utils.scheduler as scheduler_module
+from utils.budget_optimizer import BudgetOptimizer, NUMPY_AVAILABLE
+from utils.scheduler import JobScheduler
+
+PERFORMANCE = {
+    "c1": {"email": {"cost": 100.0, "conversions": 20.0}, "social_media": {"cost": 100.0, "conversions": 5.0}},
+    "c2": {"email": {"cost": 200.0, "conversions": 10.0}, "social_media": {"cost": 50.0, "conversions": 8.0}},
+    "c3": {"email": {"cost": 100.0, "conversions": 1.0}},
+}
+
+@contextmanager
+def isolated_data_dir():
+    """Agents dans un répertoire temporaire, planificateur en mémoire"""
+    previous_dir, previous_scheduler = os.getcwd(), scheduler_module._shared_scheduler
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        scheduler_module._shared_scheduler = JobScheduler()
+        try:
+            yield Path(tmp)
+        finally:
+            scheduler_module._shared_scheduler = previous_scheduler
+            os.chdir(previous_dir)
+
+def total(allocations):
+    return sum(amount for channels in allocations.values() for amount in channels.values())
+
+def test_allocation_spends_total_budget():
+    """Tout le budget est réparti, davantage sur le canal au meilleur rendement"""
+    result = BudgetOptimizer().optimize(PERFORMANCE, 1000.0, use_numpy=False)
+    assert abs(total(result.allocations) - 1000.0) < 0.1
+    assert result.allocations["c1"]["email"] > result.allocations["c1"]["social_media"]
+    assert result.unfunded_campaigns == []
+    assert result.method == "python"
+
+def test_channel_minimums_respected():
+    """Chaque canal reçoit au moins son minimum, même sans historique"""
+    result = BudgetOptimizer(channel_minimums={"email": 50.0}).optimize(PERFORMANCE, 1000.0, use_numpy=False)
+    assert all(channels["email"] >= 50.0 - 0.01 for channels in result.allocations.values())
+
+def test_max_concurrent_campaigns_leaves_others_unfunded():
+    """Au-delà de la limite, les campagnes au plus faible potentiel ne sont pas financées"""
+    result = BudgetOptimizer(max_concurrent_campaigns=2).optimize(PERFORMANCE, 1000.0, use_numpy=False)
+    assert set(result.allocations) == {"c1", "c2"}
+    assert result.unfunded_campaigns == ["c3"]
+    assert abs(total(result.allocations) - 1000.0) < 0.1
+
+def test_channel_without_history_uses_median_prior():
+    """Un canal sans conversions reçoit le coefficient médian du canal"""
+    performance = dict(PERFORMANCE, c4={"email": {"cost": 0.0, "conversions": 0.0}})
+    result = BudgetOptimizer().optimize(performance, 1000.0, use_numpy=False)
+    assert result.allocations["c4"]["email"] > result.allocations["c3"]["email"]
+    assert result.allocations["c4"]["email"] < result.allocations["c1"]["email"]
+
+def test_numpy_matches_python():
+    """Les deux solveurs donnent la même répartition"""
+    if not NUMPY_AVAILABLE:
+        return
+    performance = dict(PERFORMANCE, c4={"email": {"cost": 0.0, "conversions": 0.0}})
+    optimizer = BudgetOptimizer(channel_minimums={"social_media": 20.0}, max_concurrent_campaigns=3)
+    vectorized = optimizer.optimize(performance, 1000.0, use_numpy=True)
+    pure = optimizer.optimize(performance, 1000.0, use_numpy=False)
+    assert vectorized.method == "numpy"
+    assert vectorized.unfunded_campaigns == pure.unfunded_campaigns
+    for campaign_id, channels in pure.allocations.items():
+        for channel, amount in channels.items():
+            assert abs(vectorized.allocations[campaign_id][channel] - amount) < 0.5
+
+def test_portfolio_pauses_unfunded_campaigns():
+    """Une campagne écartée par max_concurrent_campaigns est mise en pause, budget inchangé"""
+    from agents.orchestrator_agent import CampaignStatus, MarketingOrchestrator
+
+    async def scenario():
+        orchestrator = MarketingOrchestrator()
+        orchestrator.budget_optimizer.max_concurrent_campaigns = 1
+        ids = []
+        for name, conversions in (("Forte", 40), ("Faible", 1)):
+            created = await orchestrator._create_campaign({
+                "name": name, "type": "product_launch", "budget": 500, "channels": ["email"], "duration_days": 10
+            })
+            campaign = orchestrator.campaigns[created["campaign_id"]]
+            campaign.status = CampaignStatus.RUNNING
+            orchestrator.active_campaigns[campaign.id] = campaign
+            orchestrator._record_performance(campaign, {"channels": {"email": {"cost": 100, "conversions": conversions}}})
+            ids.append(campaign.id)
+
+        weak = orchestrator.campaigns[ids[1]]
+        previous_budget = weak.budget
+        result = await orchestrator._optimize_portfolio_budget({})
+        assert result["unfunded_campaigns"] == [ids[1]]
+        assert result["paused_campaigns"] == [ids[1]]
+        assert weak.status == CampaignStatus.PAUSED
+        assert weak.budget == previous_budget
+        assert orchestrator.campaigns[ids[0]].budget == 1000.0
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests de l'état persistant des campagnes - rejeu du journal et checkpoints
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.campaign_state import CampaignStateStore
+
+def make_store(db_path: Path, **kwargs) -> CampaignStateStore:
+    return CampaignStateStore(db_path, serialize=dict, deserialize=dict, **kwargs)
+
+def wal_rows(store: CampaignStateStore):
+    return store._conn.execute("SELECT campaign_id, op FROM campaign_wal ORDER BY seq").fetchall()
+
+def test_replay_without_checkpoint():
+    """Sans checkpoint, les campagnes sont reconstruites à partir du journal"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(Path(tmp) / "state.db")
+        store.log("c1", "create", {"id": "c1", "budget": 100, "active": True})
+        store.log("c1", "update", {"budget": 250})
+        store.log("c2", "create", {"id": "c2", "budget": 50, "active": False})
+        store.log("c2", "delete", {})
+        store.close()
+
+        campaigns, active_ids, replayed = make_store(Path(tmp) / "state.db").load()
+        assert campaigns == {"c1": {"id": "c1", "budget": 250}}
+        assert active_ids == {"c1"}
+        assert replayed == 4
+
+def test_reload_after_checkpoint():
+    """Le checkpoint écrit l'instantané et vide le journal des campagnes écrites"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(Path(tmp) / "state.db")
+        store.log("c1", "create", {"id": "c1", "budget": 100})
+        campaigns = {"c1": {"id": "c1", "budget": 100, "performance_data": {"ctr": 0.02}}}
+        assert store.checkpoint(campaigns, {"c1"}) == 1
+        assert wal_rows(store) == []
+        store.log("c1", "update", {"budget": 300})
+        store.close()
+
+        campaigns, active_ids, replayed = make_store(Path(tmp) / "state.db").load()
+        assert campaigns["c1"] == {"id": "c1", "budget": 300, "performance_data": {"ctr": 0.02}}
+        assert active_ids == {"c1"}
+        assert replayed == 1
+
+def test_checkpoint_keeps_other_process_entries():
+    """Le checkpoint d'un processus ne retire pas le journal des campagnes d'un autre"""
+    with tempfile.TemporaryDirectory() as tmp:
+        first = make_store(Path(tmp) / "state.db")
+        second = make_store(Path(tmp) / "state.db")
+        first.log("a", "create", {"id": "a"})
+        second.log("b", "create", {"id": "b"})
+        first.checkpoint({"a": {"id": "a"}}, {"a"})
+        assert wal_rows(first) == [("b", "create")]
+        first.close()
+        second.close()
+
+        campaigns, _, _ = make_store(Path(tmp) / "state.db").load()
+        assert set(campaigns) == {"a", "b"}
+
+def test_orphan_update_is_ignored():
+    """Une mise à jour sans instantané ni création ne produit pas de campagne partielle"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(Path(tmp) / "state.db")
+        store.log("ghost", "update", {"budget": 10})
+        campaigns, active_ids, replayed = store.load()
+        assert campaigns == {}
+        assert active_ids == set()
+        assert replayed == 1
+        store.close()
+
+def test_log_is_batched_inside_event_loop():
+    """Dans la boucle, les mutations sont écrites par lot après flush_delay"""
+    async def scenario(store: CampaignStateStore):
+        for i in range(3):
+            store.log("c1", "update", {"step": i})
+        assert wal_rows(store) == []
+        assert store.wal_size == 3
+        await asyncio.sleep(0.2)
+        assert len(wal_rows(store)) == 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(Path(tmp) / "state.db", flush_delay=0.05)
+        asyncio.run(scenario(store))
+        store.close()
+
+def test_log_flushes_when_batch_full():
+    """Un lot complet est écrit sans attendre le délai"""
+    async def scenario(store: CampaignStateStore):
+        store.log("c1", "create", {"id": "c1"})
+        store.log("c1", "update", {"budget": 1})
+        await asyncio.sleep(0.2)
+        assert len(wal_rows(store)) == 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(Path(tmp) / "state.db", log_batch_size=2, flush_delay=60)
+        asyncio.run(scenario(store))
+        store.close()
+
+def test_close_flushes_pending_entries():
+    """close() écrit les mutations encore en attente"""
+    async def scenario(store: CampaignStateStore):
+        store.log("c1", "create", {"id": "c1"})
+        store.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(make_store(Path(tmp) / "state.db", flush_delay=60)))
+        campaigns, _, _ = make_store(Path(tmp) / "state.db").load()
+        assert set(campaigns) == {"c1"}
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests de la vue dashboard - écritures regroupées et écriture finale à l'arrêt
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+import utils.scheduler as scheduler_module
+from utils.dashboard import DashboardView
+from utils.scheduler import JobScheduler
+
+@contextmanager
+def isolated_data_dir():
+    """Agents dans un répertoire temporaire, planificateur en mémoire"""
+    previous_dir, previous_scheduler = os.getcwd(), scheduler_module._shared_scheduler
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        scheduler_module._shared_scheduler = JobScheduler()
+        try:
+            yield Path(tmp)
+        finally:
+            scheduler_module._shared_scheduler = previous_scheduler
+            os.chdir(previous_dir)
+
+def test_requests_within_window_are_coalesced():
+    """Plusieurs demandes dans la fenêtre donnent une seule écriture différée"""
+    async def scenario(path: Path):
+        view = DashboardView(path, flush_interval=0.05)
+        view.update({"a": 1})
+        view.request_flush()
+        await asyncio.sleep(0.01)
+        view.update({"a": 2})
+        view.request_flush()
+        view.update_campaign("c1", {"status": "running"})
+        view.request_flush()
+        await asyncio.sleep(0.1)
+        assert view.flush_count == 2
+        assert json.loads(path.read_text()) == {"campaigns": {"c1": {"status": "running"}}, "a": 2}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(Path(tmp) / "dashboard.json"))
+
+def test_close_writes_pending_updates():
+    """close() annule l'écriture différée et écrit aussitôt la vue"""
+    async def scenario(path: Path):
+        view = DashboardView(path, flush_interval=60)
+        view.update({"a": 1})
+        await view.flush()
+        view.update({"a": 2})
+        view.request_flush()  # Différée de 60 s
+        await view.close()
+        assert view.flush_count == 2
+        assert json.loads(path.read_text())["a"] == 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(Path(tmp) / "dashboard.json"))
+
+def test_orchestrator_stop_flushes_dashboard():
+    """L'arrêt de l'orchestrateur écrit le dashboard encore en attente"""
+    from agents.orchestrator_agent import MarketingOrchestrator
+
+    async def scenario():
+        orchestrator = MarketingOrchestrator()
+        orchestrator.dashboard.update({"system_health": {"overall": "healthy"}})
+        await orchestrator.dashboard.flush()
+        orchestrator.dashboard.update({"system_health": {"overall": "degraded"}})
+        orchestrator.dashboard.request_flush()
+        await orchestrator.stop()
+        saved = json.loads(orchestrator.dashboard.path.read_text())
+        assert saved["system_health"] == {"overall": "degraded"}
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
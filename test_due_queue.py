@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests de la file à échéance - ordre, annulation paresseuse et reconstruction du tas
+"""
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.due_queue import DueQueue
+
+@dataclass
+class Post:
+    id: str
+
+def test_pop_due_in_order_with_limit():
+    """Les éléments échus sortent par échéance puis ordre d'insertion, au plus limit"""
+    queue = DueQueue()
+    for post_id, due in (("c", 30), ("a", 10), ("b", 20), ("a2", 10), ("late", 100)):
+        queue.push(Post(post_id), due)
+    assert [post.id for post in queue.pop_due(now=50, limit=2)] == ["a", "a2"]
+    assert [post.id for post in queue.pop_due(now=50)] == ["b", "c"]
+    assert queue.pop_due(now=50) == []
+    assert queue.next_due() == 100
+    assert len(queue) == 1
+
+def test_datetime_and_epoch_due_dates():
+    """Échéances datetime et epoch sont comparables"""
+    queue = DueQueue()
+    queue.push(Post("dt"), datetime.fromtimestamp(1_000))
+    queue.push(Post("epoch"), 500.0)
+    assert [post.id for post in queue.pop_due(now=datetime.fromtimestamp(2_000))] == ["epoch", "dt"]
+
+def test_reschedule_and_discard_are_lazy():
+    """Replanifier ou retirer un élément laisse une entrée périmée ignorée à l'extraction"""
+    queue = DueQueue()
+    queue.push(Post("p1"), 10)
+    queue.push(Post("p2"), 20)
+    queue.push(Post("p1"), 30)  # Replanifié plus tard
+    assert queue.discard("p2").id == "p2"
+    assert queue.discard("p2") is None
+    assert "p2" not in queue and "p1" in queue
+    assert queue.next_due() == 30
+    assert queue.pop_due(now=25) == []
+    assert [post.id for post in queue.pop_due(now=30)] == ["p1"]
+    assert not queue
+
+def test_heap_rebuilt_when_mostly_stale():
+    """Le tas reste borné malgré de nombreuses replanifications et annulations"""
+    queue = DueQueue()
+    for round_number in range(50):
+        for i in range(20):
+            queue.push(Post(f"p{i}"), 1_000 + round_number + i)
+    assert len(queue) == 20
+    assert len(queue._heap) <= 2 * len(queue) + 64 + 1
+
+    for i in range(15):
+        queue.discard(f"p{i}")
+    assert len(queue._heap) <= 2 * len(queue) + 64 + 1
+    assert [post.id for post in queue] == [f"p{i}" for i in range(15, 20)]
+    assert [post.id for post in queue.pop_due(now=10_000)] == [f"p{i}" for i in range(15, 20)]
+
+def test_custom_key():
+    """La clé d'identité est configurable"""
+    queue = DueQueue(key=lambda item: item["id"])
+    queue.push({"id": "x", "text": "v1"}, 10)
+    queue.push({"id": "x", "text": "v2"}, 5)
+    assert queue.get("x")["text"] == "v2"
+    assert [item["text"] for item in queue.pop_due(now=20)] == ["v2"]
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests de la queue de tâches persistante - baux, récupération au démarrage et préchargement
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.base_agent import AgentTask, BaseAgent
+from utils.durable_queue import DurableTaskQueue
+
+class SlowAgent(BaseAgent):
+    """Agent de test à queue persistante: chaque tâche dure plus qu'un bail"""
+
+    def __init__(self, visibility_timeout: float):
+        super().__init__("durable_agent", "Agent persistant", {
+            "durable_queue": True,
+            "durable_queue_options": {"visibility_timeout": visibility_timeout}
+        })
+        self.calls = 0
+
+    async def process_task(self, task):
+        self.calls += 1
+        await asyncio.sleep(task.data["duration"])
+        return {"success": True}
+
+    def get_capabilities(self):
+        return []
+
+def _task(task_id: str, priority: int = 5) -> AgentTask:
+    return AgentTask(id=task_id, type="publish_post", priority=priority, data={}, created_at=datetime.now())
+
+def test_start_keeps_live_leases():
+    """Un nouveau processus ne reprend pas les tâches louées par un processus actif"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "queue.db"
+        worker = DurableTaskQueue(db_path, visibility_timeout=300)
+        worker.push(_task("t1"))
+        assert worker.pop().id == "t1"
+
+        other = DurableTaskQueue(db_path)
+        assert other.reclaimed_on_start == 0
+        assert not other
+        assert other.stats() == {"processing": 1}
+        other.close()
+        worker.close()
+
+def test_start_reclaims_expired_leases():
+    """Les tâches d'un worker planté redeviennent disponibles à l'expiration du bail"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "queue.db"
+        crashed = DurableTaskQueue(db_path, visibility_timeout=0.05)
+        crashed.push(_task("t1"))
+        crashed.pop()
+        time.sleep(0.1)
+
+        restarted = DurableTaskQueue(db_path)
+        assert restarted.reclaimed_on_start == 1
+        assert restarted.pop().id == "t1"
+        restarted.ack(_task("t1"))
+        assert restarted.stats() == {}
+        restarted.close()
+        crashed.close()
+
+def test_higher_priority_push_releases_prefetch():
+    """Une tâche prioritaire ajoutée après un préchargement passe devant"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = DurableTaskQueue(Path(tmp) / "queue.db", prefetch=4)
+        queue.push_many([_task(f"low{i}", priority=2) for i in range(4)])
+        assert queue.pop().id == "low0"
+
+        queue.push(_task("urgent", priority=9))
+        assert queue.peek().id == "urgent"
+        assert queue.pop().id == "urgent"
+        assert [queue.pop().id for _ in range(3)] == ["low1", "low2", "low3"]
+        queue.close()
+
+def test_pops_one_task_at_a_time_by_default():
+    """Sans préchargement, les tâches non distribuées restent visibles des autres processus"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = DurableTaskQueue(Path(tmp) / "queue.db")
+        queue.push_many([_task("a", priority=5), _task("b", priority=7)])
+        assert queue.pop().id == "b"
+        assert queue.stats() == {"pending": 1, "processing": 1}
+        queue.close()
+
+def test_running_task_lease_is_renewed():
+    """Une tâche plus longue que son bail n'est pas récupérée par un autre processus"""
+    async def scenario(db_path: Path):
+        agent = SlowAgent(visibility_timeout=0.15)
+        other = DurableTaskQueue(db_path, reclaim_on_start=False)
+        future = await agent.submit(agent.create_task("report", 5, {"duration": 0.6}))
+        for _ in range(5):
+            await asyncio.sleep(0.1)
+            other._last_reclaim = 0.0  # Forcer la récupération des baux expirés
+            assert not other
+        await future
+        assert agent.calls == 1
+        assert other.stats() == {}
+        other.close()
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            asyncio.run(scenario(Path(tmp) / "data" / "durable_agent" / "task_queue.db"))
+        finally:
+            os.chdir(previous)
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests du moteur d'expérimentation A/B - décisions bayésiennes, allocation et archivage (NumPy et repli)
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+import utils.experimentation as experimentation
+from utils.experimentation import COMPLETED, INCONCLUSIVE, RUNNING, ExperimentEngine
+
+def make_engines(**kwargs):
+    """Un moteur par implémentation disponible: NumPy (si installé) puis Python pur"""
+    engines = []
+    if experimentation.NUMPY_AVAILABLE:
+        engines.append(ExperimentEngine(seed=7, **kwargs))
+    previous = experimentation.NUMPY_AVAILABLE
+    experimentation.NUMPY_AVAILABLE = False
+    try:
+        engines.append(ExperimentEngine(seed=7, **kwargs))
+    finally:
+        experimentation.NUMPY_AVAILABLE = previous
+    return engines
+
+def test_fallback_engine_uses_python_lists():
+    """Sans NumPy, les compteurs sont des listes Python"""
+    fallback = make_engines()[-1]
+    assert fallback._np is None
+    assert isinstance(fallback._trials, list)
+
+def test_clear_winner_is_declared():
+    """Une variante nettement meilleure gagne dès min_samples atteint"""
+    for engine in make_engines():
+        engine.create("subject", ["A", "B"], min_samples=100)
+        engine.record_events([("subject", "A", 1000, 100), ("subject", "B", 1000, 200)])
+        summary = engine.summary("subject")
+        assert summary["status"] == COMPLETED
+        assert summary["winner"] == "B"
+        assert summary["variants"]["B"]["probability_best"] > 0.95
+        assert engine.allocation("subject") == {"A": 0.0, "B": 1.0}
+
+def test_no_decision_before_min_samples():
+    """Avant min_samples, aucune décision et la répartition initiale est conservée"""
+    for engine in make_engines():
+        engine.create("t", ["A", "B"], traffic_split=[0.8, 0.2], min_samples=500)
+        engine.record_events([("t", "A", 100, 1), ("t", "B", 100, 50)])
+        assert engine.experiments["t"].status == RUNNING
+        assert engine.allocation("t") == {"A": 0.8, "B": 0.2}
+        assert engine.assign("t", 11) == {"A": 9, "B": 2}
+
+def test_equal_variants_are_inconclusive_at_max_samples():
+    """Sans écart, l'expérience conclut "inconclusive" au budget d'essais"""
+    for engine in make_engines():
+        engine.create("t", ["A", "B"], min_samples=50, max_samples=2000)
+        engine.record_events([("t", "A", 1000, 100), ("t", "B", 1000, 100)])
+        assert engine.experiments["t"].status == INCONCLUSIVE
+
+def test_single_events_and_stopped_variants():
+    """Événements unitaires (succès booléen); une variante arrêtée ne reçoit plus rien"""
+    for engine in make_engines():
+        engine.create("t", ["A", "B", "C"], min_samples=200, win_probability=0.999)
+        engine.record_events(
+            [("t", "A", True)] * 40 + [("t", "A", False)] * 160
+            + [("t", "B", True)] * 42 + [("t", "B", False)] * 158
+            + [("t", "C", False)] * 200
+        )
+        experiment = engine.experiments["t"]
+        assert engine.counts("t")["A"] == (200, 40)
+        assert "C" in experiment.stopped
+        engine.record_events([("t", "C", 100, 100)])
+        assert engine.counts("t")["C"] == (200, 0)
+
+def test_archiving_reuses_counter_slots():
+    """Une expérience terminée expirée est archivée et ses compteurs réutilisés à zéro"""
+    for engine in make_engines(concluded_ttl=60):
+        engine.create("old", ["A", "B"], min_samples=10)
+        engine.record_events([("old", "A", 100, 5), ("old", "B", 100, 60)])
+        slots = list(engine.experiments["old"].slots)
+        assert engine.evict_concluded(now=datetime.now() + timedelta(seconds=120)) == 1
+        assert engine.exists("old") and "old" not in engine.experiments
+        assert engine.summary("old")["winner"] == "B"
+
+        engine.create("new", ["X", "Y"])
+        assert sorted(engine.experiments["new"].slots) == sorted(slots)
+        assert engine.counts("new") == {"X": (0, 0), "Y": (0, 0)}
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
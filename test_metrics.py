@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests de l'export Prometheus - échappement des labels et démarrage du serveur avec l'orchestrateur
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).parent))
+
+import utils.scheduler as scheduler_module
+from utils.metrics import AgentLatencyMetrics, render_prometheus
+from utils.scheduler import JobScheduler
+
+@contextmanager
+def isolated_data_dir():
+    """Agents dans un répertoire temporaire, planificateur en mémoire"""
+    previous_dir, previous_scheduler = os.getcwd(), scheduler_module._shared_scheduler
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        scheduler_module._shared_scheduler = JobScheduler()
+        try:
+            yield Path(tmp)
+        finally:
+            scheduler_module._shared_scheduler = previous_scheduler
+            os.chdir(previous_dir)
+
+def test_label_values_are_escaped():
+    """Antislash, guillemet et saut de ligne sont échappés dans les labels"""
+    latency = AgentLatencyMetrics()
+    latency.record('type "spécial"\nC:\\temp', 0.01, 0.02, True)
+    agent = SimpleNamespace(agent_id='agent"x', task_queue=[], latency_metrics=latency)
+    text = render_prometheus([agent])
+    assert 'ifiveme_tasks_in_queue{agent="agent\\"x"} 0' in text
+    assert 'task_type="type \\"spécial\\"\\nC:\\\\temp",status="completed"} 1' in text
+    # Aucun saut de ligne brut ne coupe une série
+    assert all(line.startswith(("#", "ifiveme_")) for line in text.splitlines())
+
+def test_orchestrator_factory_starts_metrics_export():
+    """create_marketing_orchestrator démarre /metrics et stop() le ferme"""
+    from agents.orchestrator_agent import create_marketing_orchestrator
+
+    async def fetch(port: int) -> str:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode("utf-8")
+        writer.close()
+        return response
+
+    async def scenario():
+        orchestrator = await create_marketing_orchestrator()
+        server = orchestrator.metrics_server
+        if server is None:  # Port par défaut déjà occupé sur cette machine
+            server = await orchestrator.start_metrics_export(port=0)
+        assert await orchestrator.start_metrics_export() is server
+        response = await fetch(server.port)
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert 'ifiveme_tasks_in_queue{agent="marketing_orchestrator"} 0' in response
+
+        await orchestrator.stop()
+        assert orchestrator.metrics_server is None
+        try:
+            await fetch(server.port)
+            raise AssertionError("Serveur encore ouvert après stop()")
+        except OSError:
+            pass
+
+    with isolated_data_dir():
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
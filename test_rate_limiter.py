@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests du limiteur de débit - calcul des jetons, attente et partage SQLite entre instances
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.rate_limiter import MemoryRateLimiter, RateLimit, RateLimitExceeded, RateLimiter, SQLiteRateLimiter
+
+def test_limit_from_config():
+    """per_second/per_minute/per_hour sont convertis en jetons par seconde"""
+    assert RateLimit.from_config({"per_minute": 120, "burst": 5}) == RateLimit(rate=2.0, burst=5.0)
+    assert RateLimit.from_config({"per_hour": 3600}) == RateLimit(rate=1.0, burst=1.0)
+    for invalid in ({"burst": 3}, {"per_second": 0}):
+        try:
+            RateLimit.from_config(invalid)
+            raise AssertionError(f"Limite acceptée: {invalid}")
+        except ValueError:
+            pass
+
+def test_token_math():
+    """Remplissage plafonné à la rafale; attente = déficit / débit"""
+    limit = RateLimit(rate=2.0, burst=4.0)
+    assert RateLimiter._refill(limit, 1.0, 100.0, 101.0) == 3.0
+    assert RateLimiter._refill(limit, 1.0, 100.0, 110.0) == 4.0
+    assert RateLimiter._plan(limit, 3.0, 1.0, None) == 0.0
+    assert RateLimiter._plan(limit, -1.0, 1.0, None) == 1.0
+    assert RateLimiter._plan(limit, -1.0, 1.0, 0.5) is None
+
+def test_memory_burst_then_wait():
+    """Les jetons de la rafale passent sans attente, le suivant attend son renouvellement"""
+    async def scenario():
+        limiter = MemoryRateLimiter({"linkedin": {"post": {"per_second": 20, "burst": 2}}})
+        assert await limiter.acquire("LinkedIn", "post") == 0.0
+        assert await limiter.acquire("linkedin", "post") == 0.0
+        start = time.perf_counter()
+        wait = await limiter.acquire("linkedin", "post")
+        assert 0.04 <= wait <= 0.06
+        assert time.perf_counter() - start >= 0.04
+        assert limiter.acquired == 3
+
+    asyncio.run(scenario())
+
+def test_timeout_raises_without_consuming():
+    """Une attente trop longue lève RateLimitExceeded et ne réserve rien"""
+    async def scenario():
+        limiter = MemoryRateLimiter({"facebook": {"default": {"per_second": 1, "burst": 1}}})
+        assert await limiter.try_acquire("facebook", "feed")  # Endpoint inconnu: limite "default"
+        assert not await limiter.try_acquire("facebook", "feed")
+        try:
+            await limiter.acquire("facebook", "feed", timeout=0.1)
+            raise AssertionError("RateLimitExceeded attendue")
+        except RateLimitExceeded as e:
+            assert e.key == "facebook:feed"
+            assert 0.8 < e.wait <= 1.0
+        # Le refus n'a rien consommé: le prochain jeton arrive toujours dans moins d'une seconde
+        assert limiter._time_until("facebook:feed", limiter.limit_for("facebook"), 1.0) <= 1.0
+        assert await limiter.acquire("twitter") == 0.0  # Sans limite configurée
+
+    asyncio.run(scenario())
+
+def test_sqlite_buckets_shared_between_instances():
+    """Deux limiteurs sur la même base consomment le même seau"""
+    async def scenario(db_path: Path):
+        limits = {"instagram": {"default": {"per_hour": 3600, "burst": 2}}}
+        first, second = SQLiteRateLimiter(db_path, limits), SQLiteRateLimiter(db_path, limits)
+        assert await first.try_acquire("instagram")
+        assert await second.try_acquire("instagram")
+        assert not await first.try_acquire("instagram")
+        assert not await second.try_acquire("instagram")
+        first.close()
+        second.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(Path(tmp) / "rate_limits.db"))
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
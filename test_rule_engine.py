@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests du moteur de règles compilées - validation des conditions et évaluation par lot
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.rule_engine import RuleCompileError, RuleEngine, compile_condition
+
+UNSAFE_CONDITIONS = [
+    "__import__('os').system('true')",  # Appel
+    "roi.__class__",  # Attribut
+    "metrics['roi'] > 1",  # Indexation
+    "(lambda: 1)()",  # Lambda
+    "'abc' == 'abc'",  # Constante non numérique
+    "[x for x in roi]",  # Compréhension
+    "roi if clicks else ctr",  # Expression conditionnelle
+    "(roi := 1)",  # Affectation
+]
+
+def test_unsafe_conditions_are_rejected():
+    """Appels, attributs, indexation et autres constructions sont refusés à la compilation"""
+    for condition in UNSAFE_CONDITIONS:
+        try:
+            compile_condition(condition)
+            raise AssertionError(f"Condition acceptée: {condition}")
+        except RuleCompileError:
+            pass
+
+def test_syntax_error_is_a_compile_error():
+    """Une condition mal formée lève RuleCompileError (sous-classe de ValueError)"""
+    try:
+        compile_condition("roi >")
+        raise AssertionError("Condition acceptée")
+    except ValueError as e:
+        assert isinstance(e, RuleCompileError)
+
+def test_parameters_are_bound_and_metrics_collected():
+    """Les paramètres deviennent des constantes, les autres noms sont des métriques"""
+    variables, predicate, _ = compile_condition(
+        "roi > scaling_threshold and clicks >= 100 and roi < 2 * scaling_threshold",
+        {"scaling_threshold": 1.5}
+    )
+    assert variables == ("roi", "clicks")
+    assert predicate(2.0, 150) is True
+    assert predicate(1.0, 150) is False
+    assert predicate(3.5, 150) is False
+
+def test_evaluate_uses_default_for_missing_metrics():
+    """Une métrique absente vaut default_value"""
+    engine = RuleEngine([{"name": "low_ctr", "condition": "ctr < 0.01", "action": "alert"}])
+    assert [rule.name for rule in engine.evaluate({})] == ["low_ctr"]
+    assert engine.evaluate({"ctr": 0.05}) == []
+
+def test_batch_matches_single_evaluation():
+    """L'évaluation par lot donne les mêmes règles que l'évaluation campagne par campagne"""
+    engine = RuleEngine([
+        {"name": "scale", "condition": "roi > threshold", "parameters": {"threshold": 2}},
+        {"name": "budget", "condition": "budget_spent >= 0.9 and roi < 1"},
+        {"name": "always", "condition": "1 > 0"},
+    ])
+    campaigns = {
+        "c1": {"roi": 3.0, "budget_spent": 0.5},
+        "c2": {"roi": 0.5, "budget_spent": 0.95},
+        "c3": {},
+    }
+    batch = engine.evaluate_batch(campaigns)
+    for campaign_id, metrics in campaigns.items():
+        assert [r.name for r in batch[campaign_id]] == [r.name for r in engine.evaluate(metrics)]
+    assert [r.name for r in batch["c1"]] == ["scale", "always"]
+    assert [r.name for r in batch["c2"]] == ["budget", "always"]
+
+def test_batch_falls_back_on_invalid_values():
+    """Une division par zéro sur une campagne n'empêche pas l'évaluation des autres"""
+    engine = RuleEngine([{"name": "cpc", "condition": "cost / clicks > 2"}])
+    batch = engine.evaluate_batch({"ok": {"cost": 30, "clicks": 10}, "zero": {"cost": 5, "clicks": 0}})
+    assert [r.name for r in batch["ok"]] == ["cpc"]
+    assert batch["zero"] == []
+
+def test_add_rule_replaces_same_name():
+    """Redéfinir une règle remplace l'ancienne version"""
+    engine = RuleEngine([{"name": "r", "condition": "roi > 1"}])
+    engine.add_rule({"name": "r", "condition": "roi > 5"})
+    assert len(engine.rules) == 1
+    assert engine.evaluate({"roi": 3}) == []
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests du planificateur partagé - rechargement après redémarrage et bail entre processus
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.scheduler import JobScheduler
+
+def _counter(runs: list):
+    async def callback(payload):
+        runs.append(payload)
+    return callback
+
+def test_reloaded_jobs_fire_after_restart():
+    """Un job rechargé de la base est exécuté, même planifié à nouveau avec replace=False"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "scheduler.db"
+
+        async def first_process():
+            runs = []
+            scheduler = JobScheduler(db_path)
+            scheduler.register("tick", _counter(runs))
+            scheduler.schedule_every("monitoring", "tick", 0.05, start_in=0.0)
+            await asyncio.sleep(0.12)
+            await scheduler.stop()
+            scheduler.close()
+            return runs
+
+        async def second_process():
+            runs = []
+            scheduler = JobScheduler(db_path)
+            assert scheduler.get_job("monitoring") is not None
+            scheduler.register("tick", _counter(runs))
+            scheduler.schedule_every("monitoring", "tick", 0.05, replace=False)
+            await asyncio.sleep(0.2)
+            assert scheduler._driver is not None
+            await scheduler.stop()
+            scheduler.close()
+            return runs
+
+        assert len(asyncio.run(first_process())) >= 2
+        assert len(asyncio.run(second_process())) >= 2
+
+def test_register_starts_driver_for_reloaded_jobs():
+    """register() suffit à relancer les jobs rechargés (aucun nouveau schedule_*)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "scheduler.db"
+        seed = JobScheduler(db_path)
+        seed.schedule_in("reminder", "remind", 0.0, {"post_id": "p1"})
+        seed.close()
+
+        async def restarted():
+            runs = []
+            scheduler = JobScheduler(db_path)
+            scheduler.register("remind", _counter(runs))
+            await asyncio.sleep(0.05)
+            await scheduler.stop()
+            scheduler.close()
+            return runs
+
+        assert asyncio.run(restarted()) == [{"post_id": "p1"}]
+
+def test_exclusive_jobs_run_in_one_process():
+    """Deux planificateurs sur la même base: un seul exécute les jobs exclusifs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "scheduler.db"
+
+        async def workers():
+            runs_a, runs_b, local_a, local_b = [], [], [], []
+            worker_a, worker_b = JobScheduler(db_path), JobScheduler(db_path)
+            for scheduler, runs, local in ((worker_a, runs_a, local_a), (worker_b, runs_b, local_b)):
+                scheduler.register("sweep", _counter(runs))
+                scheduler.register("local", _counter(local))
+                scheduler.schedule_every("sweep", "sweep", 0.05, start_in=0.0)
+                scheduler.schedule_every("local_dispatch", "local", 0.05, start_in=0.0, exclusive=False)
+            await asyncio.sleep(0.2)
+            for scheduler in (worker_a, worker_b):
+                await scheduler.stop()
+                scheduler.close()
+            return runs_a, runs_b, local_a, local_b
+
+        runs_a, runs_b, local_a, local_b = asyncio.run(workers())
+        assert (len(runs_a) == 0) != (len(runs_b) == 0)
+        assert local_a and local_b
+
+def test_jobs_without_callback_stay_persisted():
+    """Un job échu sans callback dans ce processus n'est ni supprimé ni exécuté à vide"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "scheduler.db"
+        seed = JobScheduler(db_path)
+        seed.schedule_in("approval_expiry_p1", "approval.expire", 0.0, {"post_id": "p1"})
+        seed.close()
+
+        async def web_process():
+            scheduler = JobScheduler(db_path)
+            scheduler.register("unrelated", _counter([]))
+            await asyncio.sleep(0.05)
+            await scheduler.stop()
+            scheduler.close()
+
+        async def approval_process():
+            runs = []
+            scheduler = JobScheduler(db_path)
+            scheduler.register("approval.expire", _counter(runs))
+            await asyncio.sleep(0.05)
+            await scheduler.stop()
+            scheduler.close()
+            return runs
+
+        asyncio.run(web_process())
+        assert asyncio.run(approval_process()) == [{"post_id": "p1"}]
+
+def test_process_without_callback_does_not_hold_lease():
+    """Le processus sans callback ne prend pas le bail d'un job exclusif"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "scheduler.db"
+
+        async def workers():
+            runs = []
+            web, worker = JobScheduler(db_path), JobScheduler(db_path)
+            web.register("unrelated", _counter([]))
+            web.schedule_every("sweep", "sweep", 0.05, start_in=0.0)
+            await asyncio.sleep(0.06)
+            worker.register("sweep", _counter(runs))
+            worker.schedule_every("sweep", "sweep", 0.05, start_in=0.0, replace=False)
+            await asyncio.sleep(0.15)
+            for scheduler in (web, worker):
+                await scheduler.stop()
+                scheduler.close()
+            return runs
+
+        assert len(asyncio.run(workers())) >= 2
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests de la récupération des résultats de tâches - store SQLite par défaut et fonctions utilitaires
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+import utils.scheduler as scheduler_module
+from utils.scheduler import JobScheduler
+
+@contextmanager
+def isolated_data_dir():
+    """Agents dans un répertoire temporaire, planificateur en mémoire"""
+    previous_dir, previous_scheduler = os.getcwd(), scheduler_module._shared_scheduler
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        scheduler_module._shared_scheduler = JobScheduler()
+        try:
+            yield Path(tmp)
+        finally:
+            scheduler_module._shared_scheduler = previous_scheduler
+            os.chdir(previous_dir)
+
+def test_submit_post_for_approval_reads_result_store():
+    """submit_post_for_approval lit le résultat de sa tâche dans le store (aucun fichier JSON)"""
+    from agents.approval_workflow_agent import submit_post_for_approval
+
+    with isolated_data_dir() as data_root:
+        result = asyncio.run(submit_post_for_approval(
+            "Nouveau post", "Contenu iFiveMe", "linkedin", "test@ifiveme.com"
+        ))
+        assert "error" not in result
+        assert result["post_id"]
+        assert result["status"] == "submitted_for_approval"
+        assert not list((data_root / "data" / "approval_workflow").glob("task_*_result.json"))
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests du stockage de séries temporelles - plages, agrégats et rétention
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from utils.timeseries import TimeSeriesStore
+
+DAY = 86400.0
+T0 = 1_700_006_400.0  # Début de journée UTC
+
+def test_range_and_latest_with_out_of_order_points():
+    """Les points arrivés en retard sont insérés à leur place"""
+    store = TimeSeriesStore()
+    for offset, value in ((0, 1.0), (120, 3.0), (60, 2.0)):
+        store.record("c1", "email", "clicks", value, T0 + offset)
+    assert store.range("c1", "email", "clicks") == [(T0, 1.0), (T0 + 60, 2.0), (T0 + 120, 3.0)]
+    assert store.range("c1", "email", "clicks", start=T0 + 30, end=T0 + 90) == [(T0 + 60, 2.0)]
+    assert store.latest("c1", "email", "clicks") == 3.0
+    assert store.latest("c1", "email", "unknown") is None
+
+def test_hourly_rollup_buckets():
+    """Les agrégats horaires cumulent nombre, somme, min, max et dernière valeur"""
+    store = TimeSeriesStore()
+    for offset, value in ((0, 4.0), (600, 2.0), (1200, 6.0), (3600, 10.0)):
+        store.record("c1", "email", "cost", value, T0 + offset)
+    buckets = store.rollup("c1", "email", "cost", "hour")
+    assert [bucket["start"] for bucket in buckets] == [T0, T0 + 3600]
+    first = buckets[0]
+    assert (first["count"], first["sum"], first["min"], first["max"], first["last"]) == (3, 12.0, 2.0, 6.0, 6.0)
+    assert first["avg"] == 4.0
+    assert store.rollup("c1", "email", "cost", "hour", start=T0 + 3600) == buckets[1:]
+
+def test_summarize_trend_over_days():
+    """summarize calcule moyenne et tendance entre le premier et le dernier jour"""
+    store = TimeSeriesStore()
+    store.record("c1", "social_media", "ctr", 0.02, T0)
+    store.record("c1", "social_media", "ctr", 0.04, T0 + 3600)
+    store.record("c1", "social_media", "ctr", 0.06, T0 + DAY)
+    stats = store.summarize("c1", "social_media", "ctr")
+    assert stats["count"] == 3
+    assert abs(stats["avg"] - 0.04) < 1e-12
+    assert stats["last"] == 0.06
+    assert abs(stats["trend"] - 1.0) < 1e-9  # 0.03 -> 0.06
+    assert store.summarize("c1", "social_media", "ctr", start=T0 + 2 * DAY) is None
+
+def test_aggregate_across_campaigns():
+    """aggregate moyenne les statistiques par canal sur toutes les campagnes"""
+    store = TimeSeriesStore()
+    store.record_channels("c1", {"email": {"roi": 2.0, "label": "x"}}, T0)
+    store.record_channels("c2", {"email": {"roi": 4.0}, "social_media": {"roi": 1.0}}, datetime.fromtimestamp(T0))
+    result = store.aggregate("roi")
+    assert result["email"] == {"campaigns": 2, "avg": 3.0, "last": 3.0, "trend": 0.0}
+    assert result["social_media"]["campaigns"] == 1
+    assert set(store.aggregate("roi", channel="email")) == {"email"}
+    assert store.series_keys("c1") == [("c1", "email", "roi")]  # Valeur non numérique ignorée
+
+def test_raw_points_bounded_but_rollups_kept():
+    """Au-delà de max_raw_points, les points bruts anciens sont évincés, pas les agrégats"""
+    store = TimeSeriesStore(max_raw_points=100)
+    for i in range(250):
+        store.record("c1", "email", "opens", 1.0, T0 + i * 60)
+    assert len(store.range("c1", "email", "opens")) <= 100
+    assert store.summarize("c1", "email", "opens", "day")["count"] == 250
+
+def test_rollup_retention_drops_oldest_buckets():
+    """La rétention d'une résolution borne le nombre de buckets"""
+    store = TimeSeriesStore(rollup_retention={"minute": 5})
+    for i in range(10):
+        store.record("c1", "email", "sent", 1.0, T0 + i * 60)
+    store.record("c1", "email", "sent", 1.0, T0)  # Plus ancien que la rétention: ignoré par l'agrégat minute
+    buckets = store.rollup("c1", "email", "sent", "minute")
+    assert [bucket["start"] for bucket in buckets] == [T0 + i * 60 for i in range(5, 10)]
+    assert sum(bucket["count"] for bucket in buckets) == 5
+
+def test_drop_campaign():
+    """drop_campaign retire toutes les séries d'une campagne"""
+    store = TimeSeriesStore()
+    store.record("c1", "email", "sent", 1.0, T0)
+    store.record("c2", "email", "sent", 1.0, T0)
+    store.drop_campaign("c1")
+    assert not store.has_campaign("c1")
+    assert len(store) == 1
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,103 @@
+"""
+iFiveMe Marketing MVP - Registre d'agents paresseux
+Importe et construit chaque agent uniquement lors de sa première utilisation
+"""
+
+import importlib
+import logging
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+class LazyAgentRegistry:
+    """Registre d'agents à chargement différé
+
+    Chaque agent est déclaré par son module et sa classe; le module n'est
+    importé et l'agent construit qu'au premier accès (get ou []). Un agent
+    dont l'import échoue est marqué indisponible, comme le mode dégradé
+    historique de l'orchestrateur. "in" ne charge rien: il indique qu'un
+    agent est déclaré et pas encore connu comme indisponible; pour utiliser
+    l'agent, get() retourne None s'il ne peut pas être construit.
+
+    L'itération (keys, values, items, len) ne couvre que les agents déjà
+    construits: le monitoring et les health checks ne forcent aucun chargement.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger("agent_registry")
+        self._specs: Dict[str, Tuple[str, str, Dict[str, Any]]] = {}
+        self._agents: Dict[str, Any] = {}
+        self._unavailable: Dict[str, str] = {}
+
+    def register(self, name: str, module_path: str, class_name: str, **kwargs):
+        """Déclare un agent sans l'importer"""
+        self._specs[name] = (module_path, class_name, kwargs)
+        self._unavailable.pop(name, None)
+
+    def register_instance(self, name: str, agent: Any):
+        """Enregistre un agent déjà construit"""
+        self._agents[name] = agent
+        self._unavailable.pop(name, None)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Retourne l'agent, en le construisant au premier accès"""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+
+        spec = self._specs.get(name)
+        if spec is None or name in self._unavailable:
+            return None
+
+        module_path, class_name, kwargs = spec
+        try:
+            module = importlib.import_module(module_path)
+            agent = getattr(module, class_name)(**kwargs)
+        except Exception as e:
+            # Mode dégradé si l'agent ou ses dépendances ne sont pas disponibles
+            self._unavailable[name] = str(e)
+            self.logger.warning(f"Agent {name} indisponible: {str(e)}")
+            return None
+
+        self._agents[name] = agent
+        self.logger.info(f"Agent {name} chargé à la demande ({class_name})")
+        return agent
+
+    def is_registered(self, name: str) -> bool:
+        """Indique si un agent est déclaré, sans le charger"""
+        return name in self._specs or name in self._agents
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._agents
+
+    def registered_names(self) -> List[str]:
+        return list(dict.fromkeys([*self._specs, *self._agents]))
+
+    def unavailable(self) -> Dict[str, str]:
+        """Agents dont le chargement a échoué, avec la raison"""
+        return dict(self._unavailable)
+
+    def __contains__(self, name: str) -> bool:
+        return self.is_registered(name) and name not in self._unavailable
+
+    def __getitem__(self, name: str) -> Any:
+        agent = self.get(name)
+        if agent is None:
+            raise KeyError(name)
+        return agent
+
+    def __setitem__(self, name: str, agent: Any):
+        self.register_instance(name, agent)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._agents))
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def keys(self):
+        return list(self._agents.keys())
+
+    def values(self):
+        return list(self._agents.values())
+
+    def items(self):
+        return list(self._agents.items())
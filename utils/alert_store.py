@@ -0,0 +1,156 @@
+"""
+iFiveMe Marketing MVP - Stockage borné des alertes
+Déduplication par empreinte, compteur de répétitions, tampon circulaire et index par campagne, type et sévérité
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+# Champs qui identifient une alerte: la même règle sur la même campagne = même alerte
+DEFAULT_FINGERPRINT_FIELDS = ("type", "campaign_id", "rule", "crisis_id")
+
+class AlertStore:
+    """Alertes récentes, sans doublons et en nombre borné
+
+    Une alerte dont l'empreinte est déjà présente (et vue il y a moins de
+    dedup_window secondes) incrémente son compteur "count" au lieu d'être
+    ajoutée; elle redevient la plus récente. Au-delà de max_alerts, les plus
+    anciennes sont évincées. Les requêtes par campagne, type ou sévérité ne
+    parcourent que les alertes correspondantes.
+    """
+
+    INDEXED_FIELDS = ("campaign_id", "type", "severity")
+
+    def __init__(self, max_alerts: int = 1000, dedup_window: Optional[float] = 3600.0,
+                 fingerprint_fields: Tuple[str, ...] = DEFAULT_FINGERPRINT_FIELDS):
+        self.max_alerts = max_alerts
+        self.dedup_window = dedup_window
+        self.fingerprint_fields = fingerprint_fields
+        self._alerts: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()  # Du plus ancien au plus récent
+        self._last_seen: Dict[tuple, float] = {}
+        self._indexes: Dict[str, Dict[Any, Dict[tuple, None]]] = {name: {} for name in self.INDEXED_FIELDS}
+        self.total_received = 0
+        self.deduplicated = 0
+        self.evicted = 0
+
+    def fingerprint(self, alert: Dict[str, Any]) -> tuple:
+        return tuple(alert.get(name) for name in self.fingerprint_fields)
+
+    def add(self, alert: Dict[str, Any]) -> Dict[str, Any]:
+        """Enregistre une alerte; retourne l'entrée stockée (nouvelle ou dédupliquée)"""
+        self.total_received += 1
+        key = self.fingerprint(alert)
+        now = time.time()
+        existing = self._alerts.get(key)
+
+        if existing is not None and (self.dedup_window is None or now - self._last_seen[key] <= self.dedup_window):
+            # Répétition: on rafraîchit le contenu et la position; un champ indexé
+            # hors empreinte (la sévérité) peut changer, d'où la réindexation
+            self._unindex(key, existing)
+            existing.update(alert, timestamp=existing["timestamp"], count=existing["count"] + 1,
+                            last_seen=datetime.now().isoformat())
+            self._last_seen[key] = now
+            self._alerts.move_to_end(key)
+            self._touch_indexes(key, existing)
+            self.deduplicated += 1
+            return existing
+
+        if existing is not None:
+            self._remove(key)
+
+        entry = dict(alert)
+        entry.setdefault("timestamp", datetime.now().isoformat())
+        entry["count"] = 1
+        entry["last_seen"] = entry["timestamp"]
+        self._alerts[key] = entry
+        self._last_seen[key] = now
+        self._touch_indexes(key, entry)
+
+        while len(self._alerts) > self.max_alerts:
+            self._remove(next(iter(self._alerts)))
+            self.evicted += 1
+        return entry
+
+    # Compatibilité avec l'ancienne liste self.alerts
+    append = add
+
+    def extend(self, alerts: Iterable[Dict[str, Any]]):
+        for alert in alerts:
+            self.add(alert)
+
+    def _touch_indexes(self, key: tuple, alert: Dict[str, Any]):
+        for name in self.INDEXED_FIELDS:
+            bucket = self._indexes[name].setdefault(alert.get(name), {})
+            bucket.pop(key, None)
+            bucket[key] = None  # Dict ordonné: fin = plus récent
+
+    def _remove(self, key: tuple):
+        alert = self._alerts.pop(key)
+        del self._last_seen[key]
+        self._unindex(key, alert)
+
+    def _unindex(self, key: tuple, alert: Dict[str, Any]):
+        for name in self.INDEXED_FIELDS:
+            index = self._indexes[name]
+            bucket = index.get(alert.get(name))
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del index[alert.get(name)]
+
+    def query(self, campaign_id: Optional[str] = None, type: Optional[str] = None,
+              severity: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Alertes correspondant à tous les filtres donnés, de la plus récente à la plus ancienne"""
+        filters = [(name, value) for name, value in
+                   (("campaign_id", campaign_id), ("type", type), ("severity", severity)) if value is not None]
+        if not filters:
+            return self.recent(limit)
+
+        buckets = [self._indexes[name].get(value, {}) for name, value in filters]
+        smallest = min(buckets, key=len)
+        others = [bucket for bucket in buckets if bucket is not smallest]
+
+        results = []
+        for key in reversed(smallest):
+            if all(key in bucket for bucket in others):
+                results.append(self._alerts[key])
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Les limit alertes les plus récentes (toutes si limit vaut None)"""
+        results = []
+        for alert in reversed(self._alerts.values()):
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(alert)
+        return results
+
+    def count_by(self, field: str) -> Dict[Any, int]:
+        """Nombre d'alertes distinctes par valeur d'un champ indexé"""
+        return {value: len(keys) for value, keys in self._indexes[field].items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "stored": len(self._alerts),
+            "total_received": self.total_received,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+            "by_severity": self.count_by("severity"),
+            "by_type": self.count_by("type")
+        }
+
+    def clear(self):
+        self._alerts.clear()
+        self._last_seen.clear()
+        for index in self._indexes.values():
+            index.clear()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self._alerts.values()))
@@ -4,15 +4,24 @@ Classe de base pour tous les agents marketing
 """
 
 import logging
-import json
 import asyncio
+import heapq
+import itertools
 from abc import ABC, abstractmethod
-from datetime import datetime
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Callable, Optional, Iterator
 
-@dataclass
+from utils.metrics import AgentLatencyMetrics, LatencyHistogram
+from utils.records import record, record_to_dict
+from utils.process_pool import TaskEnvelope, execute_task_envelope, run_in_process_pool
+from utils.result_cache import TTLResultCache, make_idempotency_key
+from utils.result_store import TaskResultStore, create_result_store
+from utils.scheduler import JobScheduler, get_scheduler
+
+@record
 class AgentTask:
     """Structure pour définir une tâche d'agent"""
     id: str
@@ -23,8 +32,14 @@ class AgentTask:
     status: str = "pending"
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
-
-@dataclass
+    queued_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    idempotency_key: Optional[str] = None
+    cache_result: bool = True  # False: dédupliquée seulement pendant son exécution
+    deadline: Optional[datetime] = None
+
+@record
 class AgentMetrics:
     """Métriques de performance des agents"""
     tasks_completed: int = 0
@@ -32,6 +47,76 @@ class AgentMetrics:
     average_response_time: float = 0.0
     last_activity: Optional[datetime] = None
     success_rate: float = 0.0
+    tasks_timed_out: int = 0
+    tasks_cancelled: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    deduplicated_tasks: int = 0
+    tasks_offloaded: int = 0
+    offloaded_cpu_seconds: float = 0.0
+    tasks_shed: int = 0
+    tasks_rejected: int = 0
+    fast_lane_tasks: int = 0
+
+class AdmissionStatus(Enum):
+    """Décision du contrôle d'admission lors de l'ajout d'une tâche"""
+    ACCEPTED = "accepted"
+    SHED = "shed"            # Tâche peu prioritaire abandonnée sous charge
+    REJECTED = "rejected"    # Queue saturée (ou attente expirée)
+
+_task_sequence = itertools.count()
+
+# Échéance de la tâche en cours d'exécution, héritée par les tâches enfants
+_current_deadline: ContextVar[Optional[datetime]] = ContextVar("current_task_deadline", default=None)
+
+class PriorityTaskQueue:
+    """Queue de priorité (tas binaire) pour les tâches d'agent
+
+    La priorité la plus élevée sort en premier; à priorité égale, l'ordre
+    d'insertion (FIFO) est conservé grâce à un compteur de séquence.
+    Insertion et extraction en O(log n).
+    """
+
+    blocking_io = False  # Opérations en mémoire: appelées directement depuis la boucle
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+
+    def push(self, task: AgentTask):
+        """Ajoute une tâche dans la queue"""
+        heapq.heappush(self._heap, (-task.priority, next(self._sequence), task))
+
+    def pop(self) -> AgentTask:
+        """Retire et retourne la tâche la plus prioritaire"""
+        return heapq.heappop(self._heap)[2]
+
+    def peek(self) -> Optional[AgentTask]:
+        """Retourne la tâche la plus prioritaire sans la retirer"""
+        return self._heap[0][2] if self._heap else None
+
+    def ack(self, task: AgentTask):
+        """Confirme le traitement d'une tâche (sans effet en mémoire)"""
+        pass
+
+    def nack(self, task: AgentTask):
+        """Remet une tâche interrompue dans la queue"""
+        task.status = "pending"
+        self.push(task)
+
+    def clear(self):
+        """Vide la queue"""
+        self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __iter__(self) -> Iterator[AgentTask]:
+        """Parcourt les tâches dans l'ordre d'exécution (copie triée)"""
+        return (entry[2] for entry in sorted(self._heap))
 
 class BaseAgent(ABC):
     """Classe de base pour tous les agents marketing iFiveMe"""
@@ -42,15 +127,119 @@ class BaseAgent(ABC):
         self.config = config
         self.logger = logging.getLogger(f"agent.{agent_id}")
         self.metrics = AgentMetrics()
-        self.task_queue: List[AgentTask] = []
+        self.latency_metrics = AgentLatencyMetrics()
         self.is_active = False
 
         # Initialiser les répertoires de données
         self.data_dir = Path("data") / agent_id
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
+        # Queue en mémoire, ou persistante (SQLite) pour reprendre après un redémarrage
+        if config.get("durable_queue", False):
+            from utils.durable_queue import DurableTaskQueue
+            self.task_queue = DurableTaskQueue(
+                self.data_dir / "task_queue.db",
+                **config.get("durable_queue_options", {})
+            )
+            if self.task_queue.reclaimed_on_start:
+                self.logger.warning(
+                    f"{self.task_queue.reclaimed_on_start} tâches interrompues récupérées au démarrage"
+                )
+        else:
+            self.task_queue = PriorityTaskQueue()
+
+        # Nombre de workers asynchrones qui consomment la queue en parallèle
+        self.max_workers = max(1, int(config.get("max_workers", 1)))
+
+        # Store des résultats de tâches ("sqlite" par défaut, "json" = un fichier par tâche)
+        self.result_store: TaskResultStore = create_result_store(
+            config.get("result_store", "sqlite"),
+            self.data_dir,
+            **config.get("result_store_options", {})
+        )
+
+        # Cache des résultats et exécutions en cours, indexés par clé d'idempotence
+        self.result_cache = TTLResultCache(
+            max_entries=config.get("result_cache_size", 1024),
+            ttl=config.get("result_cache_ttl", 300)
+        )
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Délai maximal par défaut (secondes) pour les tâches sans échéance explicite
+        self.task_timeout: Optional[float] = config.get("task_timeout")
+        self._running_workers: set = set()
+
+        # Types de tâches CPU exécutés dans le pool de processus partagé
+        self.process_pool_task_types = set(config.get("process_pool_task_types", []))
+
+        # Contrôle d'admission: au-delà du seuil haut, la queue est saturée jusqu'à
+        # redescendre sous le seuil bas (hystérésis). Sans max_queue_size, pas de limite.
+        self.max_queue_size: Optional[int] = config.get("max_queue_size")
+        self.queue_high_watermark: Optional[int] = config.get("queue_high_watermark", self.max_queue_size)
+        self.queue_low_watermark: int = config.get(
+            "queue_low_watermark", int((self.queue_high_watermark or 0) * 0.8)
+        )
+        self.admission_policy: str = config.get("admission_policy", "wait")  # wait | shed | reject
+        # Attente bornée par défaut: un producteur n'est jamais bloqué indéfiniment (None = sans limite)
+        self.admission_timeout: Optional[float] = config.get("admission_timeout", 30.0)
+        self.shed_priority_threshold: int = config.get("shed_priority_threshold", 3)
+        self._queue_saturated = False
+
+        # Voie rapide (crises): ces tâches contournent la queue et le contrôle d'admission
+        # et s'exécutent immédiatement sur reserved_workers créneaux réservés
+        self.fast_lane_task_types = set(config.get("fast_lane_task_types", []))
+        self.fast_lane_min_priority: Optional[int] = config.get("fast_lane_min_priority")
+        self.reserved_workers = max(1, int(config.get("reserved_workers", 1)))
+        self._fast_lane_running: set = set()
+
+        # Pause des tâches peu prioritaires (ex: publications pendant une crise):
+        # les workers ne démarrent plus les tâches de priorité < seuil
+        self._low_priority_threshold: Optional[int] = None
+        self._low_priority_reason = ""
+        self._low_priority_resume_handle: Optional[asyncio.TimerHandle] = None
+        self.crisis_response_latency = LatencyHistogram()
+
+        # Primitives asyncio créées au premier usage, depuis la boucle de l'agent:
+        # l'agent peut être construit hors boucle ou dans un autre thread
+        self._space_event: Optional[asyncio.Event] = None
+        self._wakeup_event: Optional[asyncio.Event] = None
+        self._fast_lane_semaphore: Optional[asyncio.Semaphore] = None
+
+        # Futures des tâches soumises via submit(), résolues à la fin de la tâche
+        self._result_futures: Dict[str, asyncio.Future] = {}
+        self._drain_task: Optional[asyncio.Task] = None
+        self._worker_tasks: set = set()
+
         self.logger.info(f"Agent {self.name} initialisé")
 
+    @property
+    def _space_available(self) -> asyncio.Event:
+        """Levé quand la queue n'est pas saturée"""
+        if self._space_event is None:
+            self._space_event = asyncio.Event()
+            if not self._queue_saturated:
+                self._space_event.set()
+        return self._space_event
+
+    @property
+    def _queue_wakeup(self) -> asyncio.Event:
+        """Réveille les workers en attente (nouvelle tâche, fin de pause)"""
+        if self._wakeup_event is None:
+            self._wakeup_event = asyncio.Event()
+        return self._wakeup_event
+
+    @property
+    def _fast_lane_slots(self) -> asyncio.Semaphore:
+        """Créneaux réservés à la voie rapide"""
+        if self._fast_lane_semaphore is None:
+            self._fast_lane_semaphore = asyncio.Semaphore(self.reserved_workers)
+        return self._fast_lane_semaphore
+
+    @property
+    def scheduler(self) -> JobScheduler:
+        """Planificateur partagé (jobs récurrents et différés) du processus"""
+        return get_scheduler()
+
     @abstractmethod
     async def process_task(self, task: AgentTask) -> Dict[str, Any]:
         """Traite une tâche spécifique - à implémenter par chaque agent"""
@@ -61,39 +250,341 @@ class BaseAgent(ABC):
         """Retourne la liste des capacités de l'agent"""
         pass
 
-    async def add_task(self, task: AgentTask) -> bool:
-        """Ajoute une tâche à la queue"""
+    async def add_task(self, task: AgentTask, policy: Optional[str] = None,
+                       timeout: Optional[float] = None) -> bool:
+        """Ajoute une tâche à la queue (False si refusée par le contrôle d'admission)"""
+        return await self.admit_task(task, policy, timeout) is AdmissionStatus.ACCEPTED
+
+    async def admit_task(self, task: AgentTask, policy: Optional[str] = None,
+                         timeout: Optional[float] = None) -> AdmissionStatus:
+        """Ajoute une tâche en appliquant le contrôle d'admission
+
+        Quand la queue est saturée, la politique décide:
+        - "wait": attend que la queue redescende sous le seuil bas (au plus timeout secondes)
+        - "shed": abandonne les tâches de priorité <= shed_priority_threshold,
+          admet les autres jusqu'à max_queue_size
+        - "reject": refuse immédiatement
+        Une tâche non admise reçoit le statut "shed" ou "rejected" avec la raison dans error.
+        """
+        if self.is_fast_lane(task):
+            self._start_fast_lane(task)
+            return AdmissionStatus.ACCEPTED
+
+        policy = policy or self.admission_policy
+        timeout = timeout if timeout is not None else self.admission_timeout
+
         try:
-            self.task_queue.append(task)
-            self.task_queue.sort(key=lambda x: x.priority, reverse=True)
+            while self._is_saturated():
+                if policy == "shed":
+                    if task.priority <= self.shed_priority_threshold:
+                        return self._refuse_task(task, AdmissionStatus.SHED, "Tâche peu prioritaire abandonnée (queue saturée)")
+                    if self.max_queue_size is None or len(self.task_queue) < self.max_queue_size:
+                        break
+                    return self._refuse_task(task, AdmissionStatus.REJECTED, "Queue pleine")
+
+                if policy == "reject":
+                    return self._refuse_task(task, AdmissionStatus.REJECTED, "Queue saturée")
+
+                try:
+                    await asyncio.wait_for(self._space_available.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return self._refuse_task(task, AdmissionStatus.REJECTED, f"Queue saturée après {timeout}s d'attente")
+
+            task.queued_at = datetime.now()
+            await self._queue_io(self.task_queue.push, task)
+            self._queue_wakeup.set()
             self.logger.info(f"Tâche {task.id} ajoutée à la queue")
-            return True
+            return AdmissionStatus.ACCEPTED
         except Exception as e:
             self.logger.error(f"Erreur lors de l'ajout de la tâche {task.id}: {str(e)}")
+            return self._refuse_task(task, AdmissionStatus.REJECTED, str(e))
+
+    async def submit(self, task: AgentTask, policy: Optional[str] = None,
+                     timeout: Optional[float] = None) -> asyncio.Future:
+        """Soumet une tâche et retourne une Future résolue avec son résultat
+
+        Les workers sont démarrés si l'agent ne traite pas déjà sa queue. La
+        Future échoue (RuntimeError) si la tâche est refusée par le contrôle
+        d'admission, échoue ou expire.
+        """
+        future = asyncio.get_running_loop().create_future()
+        status = await self.admit_task(task, policy, timeout)
+        if status is not AdmissionStatus.ACCEPTED:
+            future.set_exception(RuntimeError(f"Tâche {task.id} non admise ({status.value}): {task.error}"))
+            return future
+
+        self._result_futures[task.id] = future
+        if self.is_fast_lane(task):
+            return future  # Déjà lancée sur un créneau réservé
+        if self.is_active:
+            # Les workers sortent quand la queue se vide: en relancer jusqu'à max_workers
+            if len(self._worker_tasks) < self.max_workers:
+                self._start_worker()
+        elif self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self.execute_tasks())
+        return future
+
+    def is_fast_lane(self, task: AgentTask) -> bool:
+        """Tâche de classe crise: type configuré ou priorité >= fast_lane_min_priority"""
+        if task.type in self.fast_lane_task_types:
+            return True
+        return self.fast_lane_min_priority is not None and task.priority >= self.fast_lane_min_priority
+
+    def _start_fast_lane(self, task: AgentTask):
+        task.queued_at = datetime.now()
+        runner = asyncio.create_task(self._run_fast_lane(task))
+        self._fast_lane_running.add(runner)
+        runner.add_done_callback(self._fast_lane_running.discard)
+        self.metrics.fast_lane_tasks += 1
+        self.logger.info(f"Tâche {task.id} ({task.type}) en voie rapide")
+
+    async def _run_fast_lane(self, task: AgentTask):
+        """Exécute une tâche de la voie rapide hors queue, sur un créneau réservé"""
+        async with self._fast_lane_slots:
+            await self._execute_single_task(task)
+        self._resolve_future(task)
+        await self.result_store.flush()
+
+    # Pause des tâches peu prioritaires
+
+    def pause_low_priority(self, below: int, duration: Optional[float] = None, reason: str = ""):
+        """Suspend le démarrage des tâches de priorité < below
+
+        Les tâches déjà en cours se terminent; les handlers longs peuvent
+        s'interrompre entre deux étapes via wait_if_paused(). Sans duration,
+        la pause dure jusqu'à resume_low_priority().
+        """
+        if self._low_priority_resume_handle is not None:
+            self._low_priority_resume_handle.cancel()
+            self._low_priority_resume_handle = None
+        self._low_priority_threshold = below
+        self._low_priority_reason = reason
+        if duration is not None:
+            self._low_priority_resume_handle = asyncio.get_running_loop().call_later(
+                duration, self.resume_low_priority
+            )
+        self.logger.warning(
+            f"Tâches de priorité < {below} suspendues"
+            + (f" pour {duration:g}s" if duration is not None else "")
+            + (f": {reason}" if reason else "")
+        )
+
+    def resume_low_priority(self):
+        """Lève la pause des tâches peu prioritaires"""
+        if self._low_priority_resume_handle is not None:
+            self._low_priority_resume_handle.cancel()
+            self._low_priority_resume_handle = None
+        if self._low_priority_threshold is None:
+            return
+        self._low_priority_threshold = None
+        self._low_priority_reason = ""
+        self._queue_wakeup.set()
+        self.logger.info("Tâches peu prioritaires reprises")
+
+    @property
+    def low_priority_paused(self) -> bool:
+        return self._low_priority_threshold is not None
+
+    def is_paused(self, priority: int) -> bool:
+        """True si une tâche de cette priorité est actuellement suspendue"""
+        return self._low_priority_threshold is not None and priority < self._low_priority_threshold
+
+    async def wait_if_paused(self, priority: int):
+        """Point de pause coopératif pour les traitements longs peu prioritaires"""
+        while self.is_paused(priority) and self.is_active:
+            self._queue_wakeup.clear()
+            await self._queue_wakeup.wait()
+
+    def record_crisis_response(self, detected_at: datetime) -> float:
+        """Enregistre le délai entre la détection d'une crise et la première action (secondes)"""
+        latency = max(0.0, (datetime.now(detected_at.tzinfo) - detected_at).total_seconds())
+        self.crisis_response_latency.observe(latency)
+        return latency
+
+    def _resolve_future(self, task: AgentTask):
+        """Transmet le résultat d'une tâche terminée à l'appelant de submit()"""
+        future = self._result_futures.pop(task.id, None)
+        if future is None or future.done():
+            return
+        if task.status == "completed":
+            future.set_result(task.result)
+        else:
+            future.set_exception(RuntimeError(f"Tâche {task.id} {task.status}: {task.error}"))
+
+    def _is_saturated(self) -> bool:
+        """Met à jour l'état de saturation de la queue (seuils haut/bas)"""
+        if self.queue_high_watermark is None:
             return False
 
+        queued = len(self.task_queue)
+        if not self._queue_saturated and queued >= self.queue_high_watermark:
+            self._queue_saturated = True
+            self._space_available.clear()
+            self.logger.warning(f"Queue saturée ({queued} tâches): contre-pression activée")
+        elif self._queue_saturated and queued <= self.queue_low_watermark:
+            self._queue_saturated = False
+            self._space_available.set()
+            self.logger.info(f"Queue redescendue à {queued} tâches: contre-pression levée")
+        return self._queue_saturated
+
+    def _refuse_task(self, task: AgentTask, status: AdmissionStatus, reason: str) -> AdmissionStatus:
+        task.status = status.value
+        task.error = reason
+        if status is AdmissionStatus.SHED:
+            self.metrics.tasks_shed += 1
+        else:
+            self.metrics.tasks_rejected += 1
+        self.logger.warning(f"Tâche {task.id} non admise ({status.value}): {reason}")
+        return status
+
+    async def add_tasks(self, tasks: List[AgentTask]) -> int:
+        """Ajoute plusieurs tâches à la queue en une seule opération
+
+        Les tâches de la voie rapide sont lancées immédiatement, comme avec
+        add_task(); avec une queue bornée, chaque tâche passe par le contrôle
+        d'admission.
+        """
+        fast_lane, queued = 0, []
+        for task in tasks:
+            if self.is_fast_lane(task):
+                self._start_fast_lane(task)
+                fast_lane += 1
+            else:
+                queued.append(task)
+        tasks = queued
+        if not tasks:
+            return fast_lane
+
+        if self.queue_high_watermark is not None:
+            statuses = [await self.admit_task(task) for task in tasks]
+            return fast_lane + statuses.count(AdmissionStatus.ACCEPTED)
+
+        try:
+            now = datetime.now()
+            for task in tasks:
+                task.queued_at = now
+            if hasattr(self.task_queue, "push_many"):
+                await self._queue_io(self.task_queue.push_many, tasks)
+            else:
+                for task in tasks:
+                    self.task_queue.push(task)
+            self._queue_wakeup.set()
+            self.logger.info(f"{len(tasks)} tâches ajoutées à la queue")
+            return fast_lane + len(tasks)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'ajout de {len(tasks)} tâches: {str(e)}")
+            return fast_lane
+
     async def execute_tasks(self):
-        """Execute toutes les tâches en queue"""
+        """Execute toutes les tâches en queue avec un pool de workers"""
         self.is_active = True
-        self.logger.info(f"Début d'exécution des tâches pour {self.name}")
+        self.logger.info(
+            f"Début d'exécution des tâches pour {self.name} ({self.max_workers} worker(s))"
+        )
 
-        while self.task_queue and self.is_active:
-            task = self.task_queue.pop(0)
-            await self._execute_single_task(task)
+        while True:
+            for _ in range(self.max_workers - len(self._worker_tasks)):
+                self._start_worker()
+            try:
+                # Des workers peuvent être ajoutés par submit() pendant l'attente
+                while self._worker_tasks:
+                    done, _ = await asyncio.wait(set(self._worker_tasks))
+                    for worker in done:
+                        if not worker.cancelled() and worker.exception() is not None:
+                            raise worker.exception()
+            except BaseException:
+                for worker in list(self._worker_tasks):
+                    worker.cancel()
+                raise
+            await self.result_store.flush()
+            # Des tâches ont pu être soumises pendant le flush
+            if not (self.task_queue and self.is_active):
+                break
 
         self.is_active = False
         self.logger.info(f"Fin d'exécution des tâches pour {self.name}")
 
+    def _start_worker(self):
+        worker = asyncio.create_task(self._worker_loop())
+        self._worker_tasks.add(worker)
+        worker.add_done_callback(self._worker_tasks.discard)
+
+    async def _worker_loop(self):
+        """Boucle d'un worker: consomme la queue jusqu'à ce qu'elle soit vide"""
+        while self.task_queue and self.is_active:
+            if self.is_paused(self.task_queue.peek().priority):
+                # Tête de queue suspendue: attendre la reprise ou une tâche plus prioritaire
+                self._queue_wakeup.clear()
+                await self._queue_wakeup.wait()
+                continue
+            try:
+                task = await self._queue_io(self.task_queue.pop)
+            except IndexError:
+                continue  # Dernière tâche prise par un autre worker pendant l'appel
+            if self._queue_saturated:
+                # Réveille les producteurs en attente dès le passage sous le seuil bas
+                self._is_saturated()
+            lease_renewal = self._start_lease_renewal(task)
+            try:
+                await self._execute_single_task(task)
+            finally:
+                if lease_renewal is not None:
+                    lease_renewal.cancel()
+                # Une tâche interrompue par stop() sera reprise au prochain démarrage
+                if task.status == "cancelled":
+                    self.task_queue.nack(task)
+                else:
+                    try:
+                        await self._queue_io(self.task_queue.ack, task)
+                    finally:
+                        self._resolve_future(task)
+
+    async def _queue_io(self, operation: Callable, *args):
+        """Appelle une opération de queue, dans le pool de threads si elle fait des I/O (queue persistante)"""
+        if not getattr(self.task_queue, "blocking_io", False):
+            return operation(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, operation, *args)
+
+    def _start_lease_renewal(self, task: AgentTask) -> Optional[asyncio.Task]:
+        """Renouvelle le bail d'une tâche persistante tant qu'elle s'exécute
+
+        Sans renouvellement, une tâche plus longue que visibility_timeout
+        serait récupérée par un autre worker et exécutée deux fois.
+        """
+        if not hasattr(self.task_queue, "extend_lease"):
+            return None
+        return asyncio.create_task(self._renew_lease(task))
+
+    async def _renew_lease(self, task: AgentTask):
+        interval = self.task_queue.visibility_timeout / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._queue_io(self.task_queue.extend_lease, task)
+            except Exception as e:
+                self.logger.warning(f"Renouvellement du bail de la tâche {task.id} impossible: {str(e)}")
+
     async def _execute_single_task(self, task: AgentTask):
-        """Exécute une tâche unique avec gestion des erreurs et métriques"""
+        """Exécute une tâche unique avec gestion des erreurs, échéances et métriques"""
         start_time = datetime.now()
+        task.started_at = start_time
+
+        # Tâche expirée pendant son attente en queue: inutile de l'exécuter
+        if task.deadline and start_time >= task.deadline:
+            await self._finish_unsuccessful_task(task, "timed_out", "Échéance dépassée avant l'exécution")
+            return
+
+        timeout = self._remaining_time(task, start_time)
+        worker = asyncio.current_task()
+        self._running_workers.add(worker)
+        deadline_token = _current_deadline.set(task.deadline)
 
         try:
             self.logger.info(f"Début traitement tâche {task.id} de type {task.type}")
             task.status = "processing"
 
-            # Traiter la tâche
-            result = await self.process_task(task)
+            # Traiter la tâche (ou réutiliser un résultat équivalent)
+            result = await asyncio.wait_for(self._run_task(task), timeout)
 
             # Mettre à jour le résultat
             task.result = result
@@ -102,17 +593,120 @@ class BaseAgent(ABC):
             # Mettre à jour les métriques
             self.metrics.tasks_completed += 1
             self._update_metrics(start_time)
+            self._record_latency(task, success=True)
 
             self.logger.info(f"Tâche {task.id} complétée avec succès")
 
             # Sauvegarder le résultat
             await self._save_task_result(task)
 
+        except asyncio.TimeoutError:
+            await self._finish_unsuccessful_task(task, "timed_out", f"Délai de {timeout:.1f}s dépassé")
+
+        except asyncio.CancelledError:
+            await self._finish_unsuccessful_task(task, "cancelled", "Tâche annulée")
+            # Annulation demandée par stop(): le worker s'arrête proprement
+            if self.is_active:
+                raise
+
+        except Exception as e:
+            await self._finish_unsuccessful_task(task, "failed", str(e))
+
+        finally:
+            _current_deadline.reset(deadline_token)
+            self._running_workers.discard(worker)
+
+    def _remaining_time(self, task: AgentTask, now: datetime) -> Optional[float]:
+        """Temps restant avant l'échéance de la tâche (ou délai par défaut de l'agent)"""
+        if task.deadline:
+            remaining = (task.deadline - now).total_seconds()
+            return min(remaining, self.task_timeout) if self.task_timeout else remaining
+        return self.task_timeout
+
+    async def _finish_unsuccessful_task(self, task: AgentTask, status: str, error: str):
+        """Enregistre une tâche en échec, expirée ou annulée"""
+        task.error = error
+        task.status = status
+        if status == "timed_out":
+            self.metrics.tasks_timed_out += 1
+        elif status == "cancelled":
+            self.metrics.tasks_cancelled += 1
+        self.metrics.tasks_failed += 1
+        self._record_latency(task, success=False)
+
+        if status == "failed":
+            self.logger.error(f"Erreur lors du traitement de la tâche {task.id}: {error}")
+        else:
+            self.logger.warning(f"Tâche {task.id} {status}: {error}")
+
+        await self._save_task_result(task)
+
+    async def _run_task(self, task: AgentTask) -> Dict[str, Any]:
+        """Exécute process_task en dédupliquant les tâches avec la même clé d'idempotence"""
+        key = task.idempotency_key
+        if not key:
+            return await self._dispatch_task(task)
+
+        cached = self.result_cache.get(key) if task.cache_result else None
+        if cached is not None:
+            self.metrics.cache_hits += 1
+            self.logger.info(f"Tâche {task.id} servie depuis le cache")
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.metrics.deduplicated_tasks += 1
+            self.logger.info(f"Tâche {task.id} rattachée à une exécution en cours")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if inflight.cancelled():
+                    raise RuntimeError("L'exécution partagée a été annulée")
+                raise
+
+        self.metrics.cache_misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._dispatch_task(task)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
         except Exception as e:
-            task.error = str(e)
-            task.status = "failed"
-            self.metrics.tasks_failed += 1
-            self.logger.error(f"Erreur lors du traitement de la tâche {task.id}: {str(e)}")
+            future.set_exception(e)
+            # Évite l'avertissement "exception never retrieved" sans doublon en attente
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            # Les échecs "soft" ({"success": False}) ne sont pas mis en cache
+            if task.cache_result and not (isinstance(result, dict) and result.get("success") is False):
+                self.result_cache.put(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _dispatch_task(self, task: AgentTask) -> Dict[str, Any]:
+        """Appelle process_task sur la boucle, ou dans le pool de processus pour les tâches CPU"""
+        if task.type not in self.process_pool_task_types:
+            return await self.process_task(task)
+
+        # L'agent est reconstruit dans le worker: seuls les handlers sans état partagé s'y prêtent
+        envelope = TaskEnvelope(
+            agent_module=type(self).__module__,
+            agent_class=type(self).__qualname__,
+            task=record_to_dict(task),
+            agent_kwargs=self.config.get("process_pool_agent_kwargs", {})
+        )
+        offloaded = await run_in_process_pool(execute_task_envelope, envelope)
+
+        self.metrics.tasks_offloaded += 1
+        self.metrics.offloaded_cpu_seconds += offloaded.cpu_seconds
+        self.logger.info(
+            f"Tâche {task.id} exécutée dans le processus {offloaded.worker_pid} "
+            f"({offloaded.cpu_seconds:.3f}s CPU)"
+        )
+        return offloaded.result
 
     def _update_metrics(self, start_time: datetime):
         """Met à jour les métriques de performance"""
@@ -134,15 +728,40 @@ class BaseAgent(ABC):
 
         self.metrics.last_activity = datetime.now()
 
+    def _record_latency(self, task: AgentTask, success: bool):
+        """Enregistre l'attente en queue et le temps d'exécution d'une tâche"""
+        task.completed_at = datetime.now()
+        queue_wait = (
+            (task.started_at - task.queued_at).total_seconds()
+            if task.queued_at and task.started_at else 0.0
+        )
+        execution_time = (task.completed_at - task.started_at).total_seconds() if task.started_at else 0.0
+        self.latency_metrics.record(task.type, queue_wait, execution_time, success)
+
     async def _save_task_result(self, task: AgentTask):
         """Sauvegarde le résultat d'une tâche"""
         try:
-            result_file = self.data_dir / f"task_{task.id}_result.json"
-            with open(result_file, 'w', encoding='utf-8') as f:
-                json.dump(asdict(task), f, indent=2, default=str, ensure_ascii=False)
+            await self.result_store.save(record_to_dict(task))
         except Exception as e:
             self.logger.error(f"Erreur lors de la sauvegarde du résultat: {str(e)}")
 
+    async def get_task_result(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne le résultat sauvegardé d'une tâche"""
+        return await self.result_store.get(task_id)
+
+    async def query_task_results(self, task_type: Optional[str] = None, status: Optional[str] = None,
+                                 limit: int = 100) -> List[Dict[str, Any]]:
+        """Recherche les résultats sauvegardés par type et/ou statut"""
+        return await self.result_store.query(task_type=task_type, status=status, limit=limit)
+
+    async def cleanup_task_results(self, max_age_days: Optional[int] = None) -> int:
+        """Applique la rétention sur les résultats puis compacte le store"""
+        max_age_days = max_age_days or self.config.get("data_retention_days", 90)
+        removed = await self.result_store.apply_retention(max_age_days)
+        await self.result_store.compact()
+        self.logger.info(f"{removed} résultats de plus de {max_age_days} jours supprimés")
+        return removed
+
     def get_status(self) -> Dict[str, Any]:
         """Retourne le statut actuel de l'agent"""
         return {
@@ -150,24 +769,60 @@ class BaseAgent(ABC):
             "name": self.name,
             "is_active": self.is_active,
             "tasks_in_queue": len(self.task_queue),
-            "metrics": asdict(self.metrics),
+            "queue_saturated": self._queue_saturated,
+            "metrics": record_to_dict(self.metrics),
+            "latency": self.latency_metrics.snapshot(),
+            "fast_lane_running": len(self._fast_lane_running),
+            "low_priority_paused_below": self._low_priority_threshold,
+            "crisis_response_latency": self.crisis_response_latency.snapshot(),
             "capabilities": self.get_capabilities()
         }
 
     async def stop(self):
-        """Arrête l'agent proprement"""
+        """Arrête l'agent proprement en annulant les tâches en cours"""
         self.is_active = False
+        for worker in list(self._running_workers):
+            if worker is not asyncio.current_task():
+                worker.cancel()
+        # Réveille les workers en attente d'une reprise pour qu'ils s'arrêtent
+        self._queue_wakeup.set()
+        await self.result_store.flush()
         self.logger.info(f"Agent {self.name} arrêté")
 
-    def create_task(self, task_type: str, priority: int, data: Dict[str, Any]) -> AgentTask:
-        """Crée une nouvelle tâche"""
-        task_id = f"{self.agent_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    def create_task(self, task_type: str, priority: int, data: Dict[str, Any],
+                    idempotency_key: Optional[str] = None, deduplicate: bool = False,
+                    deadline: Optional[datetime] = None, timeout: Optional[float] = None,
+                    cache_result: bool = True) -> AgentTask:
+        """Crée une nouvelle tâche
+
+        deduplicate=True dérive la clé d'idempotence du type et des données, de sorte
+        que les soumissions équivalentes partagent une seule exécution.
+        cache_result=False limite ce partage aux exécutions en cours (lectures
+        qui doivent rester fraîches): le résultat n'est pas gardé dans le cache.
+        L'échéance (deadline, ou maintenant + timeout secondes) est plafonnée par
+        celle de la tâche en cours d'exécution: les tâches enfants en héritent.
+        """
+        # Le compteur garantit l'unicité quand plusieurs tâches sont créées dans la même microseconde
+        task_id = f"{self.agent_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{next(_task_sequence)}"
+        if idempotency_key is None and deduplicate:
+            idempotency_key = make_idempotency_key(task_type, data)
+
+        if timeout is not None:
+            timeout_deadline = datetime.now() + timedelta(seconds=timeout)
+            deadline = min(deadline, timeout_deadline) if deadline else timeout_deadline
+        parent_deadline = _current_deadline.get()
+        if parent_deadline:
+            deadline = min(deadline, parent_deadline) if deadline else parent_deadline
+
         return AgentTask(
             id=task_id,
             type=task_type,
             priority=priority,
             data=data,
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            idempotency_key=idempotency_key,
+            cache_result=cache_result,
+            deadline=deadline
         )
 
     async def health_check(self) -> bool:
@@ -0,0 +1,251 @@
+"""
+iFiveMe Marketing MVP - Optimiseur de budget multi-campagnes
+Répartit le budget de toutes les campagnes actives entre leurs canaux en un seul calcul vectorisé
+"""
+
+import logging
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Sequence
+
+# NumPy n'est importé qu'au premier calcul, pas au démarrage de l'orchestrateur
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+@dataclass
+class BudgetAllocation:
+    """Résultat d'une optimisation de portefeuille"""
+    allocations: Dict[str, Dict[str, float]]  # campaign_id -> canal -> montant
+    total_budget: float
+    expected_revenue: float
+    marginal_return: float  # Revenu marginal d'un dollar supplémentaire, identique sur les cellules non bornées
+    unfunded_campaigns: List[str] = field(default_factory=list)  # Hors limite max_concurrent_campaigns
+    solve_seconds: float = 0.0
+    method: str = "numpy"
+
+class BudgetOptimizer:
+    """Allocation gloutonne au ROI marginal, sur toutes les campagnes à la fois
+
+    Chaque couple (campagne, canal) suit une courbe de réponse à rendements
+    décroissants revenu(b) = a * b^elasticity, calée sur le coût et les
+    conversions observés. Donner chaque dollar à la cellule de meilleur ROI
+    marginal revient à égaliser ces ROI marginaux: on cherche par bissection
+    le seuil lambda tel que sum(max(minimum, b(lambda))) = budget, chaque
+    itération étant une opération vectorielle sur la matrice campagnes x canaux.
+    Sans NumPy, le même calcul est fait en Python pur (plus lent).
+    """
+
+    def __init__(self, channel_minimums: Optional[Dict[str, float]] = None,
+                 max_concurrent_campaigns: Optional[int] = None, elasticity: float = 0.5,
+                 value_per_conversion: float = 25.0, iterations: int = 60):
+        if not 0 < elasticity < 1:
+            raise ValueError("elasticity doit être dans ]0, 1[")
+        self.channel_minimums = channel_minimums or {}
+        self.max_concurrent_campaigns = max_concurrent_campaigns
+        self.elasticity = elasticity
+        self.value_per_conversion = value_per_conversion
+        self.iterations = iterations
+        self.logger = logging.getLogger("budget_optimizer")
+
+    def optimize(self, performance: Dict[str, Dict[str, Dict[str, float]]], total_budget: float,
+                 campaign_channels: Optional[Dict[str, Sequence[str]]] = None,
+                 use_numpy: Optional[bool] = None) -> BudgetAllocation:
+        """Répartit total_budget entre les campagnes et canaux
+
+        performance: {campaign_id: {canal: {"cost": ..., "conversions": ...}}}
+        campaign_channels: canaux autorisés par campagne (par défaut ceux de performance)
+        """
+        start = time.perf_counter()
+        campaign_channels = campaign_channels or {cid: list(channels) for cid, channels in performance.items()}
+        campaign_ids = list(campaign_channels)
+        channels = list(dict.fromkeys(channel for cid in campaign_ids for channel in campaign_channels[cid]))
+
+        use_numpy = NUMPY_AVAILABLE if use_numpy is None else (use_numpy and NUMPY_AVAILABLE)
+        solve = self._solve_numpy if use_numpy else self._solve_python
+        funded, allocation, revenue, marginal = solve(performance, campaign_ids, channels, campaign_channels, total_budget)
+
+        allocations = {
+            campaign_ids[i]: {
+                channel: round(allocation[i][j], 2)
+                for j, channel in enumerate(channels) if channel in campaign_channels[campaign_ids[i]]
+            }
+            for i in funded
+        }
+        funded_ids = set(allocations)
+        return BudgetAllocation(
+            allocations=allocations,
+            total_budget=total_budget,
+            expected_revenue=round(revenue, 2),
+            marginal_return=marginal,
+            unfunded_campaigns=[cid for cid in campaign_ids if cid not in funded_ids],
+            solve_seconds=time.perf_counter() - start,
+            method="numpy" if use_numpy else "python"
+        )
+
+    # Modèle commun
+
+    def _coefficient(self, metrics: Dict[str, float], prior: float) -> float:
+        """Coefficient a de la courbe passant par le point observé (coût, revenu)"""
+        cost = metrics.get("cost", 0.0) or 0.0
+        revenue = (metrics.get("conversions", 0.0) or 0.0) * self.value_per_conversion
+        if cost <= 0 or revenue <= 0:
+            return prior
+        return revenue / cost ** self.elasticity
+
+    def _max_campaigns(self, count: int) -> int:
+        if self.max_concurrent_campaigns is None:
+            return count
+        return min(count, self.max_concurrent_campaigns)
+
+    def _upper_bound(self, total_scale: float, total_budget: float) -> float:
+        """Lambda pour lequel la dépense hors minimums est négligeable devant le budget"""
+        return (total_scale / max(total_budget * 1e-6, 1e-12)) ** (1.0 - self.elasticity) + 1.0
+
+    # Version NumPy
+
+    def _solve_numpy(self, performance, campaign_ids, channels, campaign_channels, total_budget):
+        n, m = len(campaign_ids), len(channels)
+        if n == 0 or m == 0:
+            return [], [], 0.0, 0.0
+
+        import numpy as np
+
+        mask = np.zeros((n, m), dtype=bool)
+        cost = np.zeros((n, m))
+        conversions = np.zeros((n, m))
+        channel_index = {channel: j for j, channel in enumerate(channels)}
+        for i, cid in enumerate(campaign_ids):
+            campaign_perf = performance.get(cid, {})
+            for channel in campaign_channels[cid]:
+                j = channel_index[channel]
+                mask[i, j] = True
+                metrics = campaign_perf.get(channel, {})
+                cost[i, j] = metrics.get("cost", 0.0) or 0.0
+                conversions[i, j] = metrics.get("conversions", 0.0) or 0.0
+
+        alpha = self.elasticity
+        revenue = conversions * self.value_per_conversion
+        observed = (cost > 0) & (revenue > 0)
+        coef = np.zeros((n, m))
+        coef[observed] = revenue[observed] / cost[observed] ** alpha
+
+        # Canal sans historique: coefficient médian du canal (ou global)
+        global_prior = float(np.median(coef[observed])) if observed.any() else 1.0
+        for j in range(m):
+            column = coef[observed[:, j], j]
+            prior = float(np.median(column)) if column.size else global_prior
+            missing = mask[:, j] & ~observed[:, j]
+            coef[missing, j] = prior
+        coef[~mask] = 0.0
+
+        # max_concurrent_campaigns: garder les campagnes au meilleur potentiel
+        # (le ROI marginal d'une campagne à budget égal est proportionnel à ||a||)
+        keep = self._max_campaigns(n)
+        potential = np.linalg.norm(coef, axis=1)
+        funded = np.sort(np.argsort(-potential, kind="stable")[:keep])
+        coef, mask = coef[funded], mask[funded]
+
+        minimums = np.array([self.channel_minimums.get(channel, 0.0) for channel in channels])
+        floor = np.where(mask, minimums[None, :], 0.0)
+        floor_total = float(floor.sum())
+        if floor_total > total_budget > 0:
+            self.logger.warning(f"Minimums par canal ({floor_total:.2f}) supérieurs au budget: réduits proportionnellement")
+            floor *= total_budget / floor_total
+
+        # b(lambda) = (a * alpha / lambda)^(1 / (1 - alpha)), borné par le minimum du canal
+        exponent = 1.0 / (1.0 - alpha)
+        scale = (coef * alpha) ** exponent
+
+        def spend(lam: float):
+            return np.maximum(floor, np.where(mask, scale / lam ** exponent, 0.0))
+
+        low, high = 1e-12, self._upper_bound(float(scale.sum()), total_budget)
+        for _ in range(self.iterations):
+            lam = math.sqrt(low * high)  # Bissection géométrique: lambda couvre plusieurs ordres de grandeur
+            if spend(lam).sum() > total_budget:
+                low = lam
+            else:
+                high = lam
+        allocation = spend(high)
+
+        # Répartir le reliquat d'arrondi de la bissection proportionnellement
+        total = allocation.sum()
+        if total > 0:
+            allocation *= total_budget / total
+
+        expected_revenue = float((coef * np.power(allocation, alpha, where=mask, out=np.zeros_like(allocation))).sum())
+        full = np.zeros((n, m))
+        full[funded] = allocation
+        return funded.tolist(), full.tolist(), expected_revenue, high
+
+    # Version Python pur (repli sans NumPy)
+
+    def _solve_python(self, performance, campaign_ids, channels, campaign_channels, total_budget):
+        n, m = len(campaign_ids), len(channels)
+        if n == 0 or m == 0:
+            return [], [], 0.0, 0.0
+
+        alpha = self.elasticity
+        observed = [
+            self._coefficient(metrics, 0.0)
+            for cid in campaign_ids for channel, metrics in performance.get(cid, {}).items()
+            if channel in campaign_channels[cid]
+        ]
+        positive = [value for value in observed if value > 0]
+        global_prior = statistics.median(positive) if positive else 1.0
+
+        channel_priors = {}
+        for channel in channels:
+            values = [
+                self._coefficient(performance.get(cid, {}).get(channel, {}), 0.0)
+                for cid in campaign_ids if channel in campaign_channels[cid]
+            ]
+            values = [value for value in values if value > 0]
+            # Même médiane que np.median (moyenne des deux valeurs centrales)
+            channel_priors[channel] = statistics.median(values) if values else global_prior
+
+        coef = [
+            [self._coefficient(performance.get(cid, {}).get(channel, {}), channel_priors[channel])
+             if channel in campaign_channels[cid] else 0.0 for channel in channels]
+            for cid in campaign_ids
+        ]
+
+        keep = self._max_campaigns(n)
+        potential = [math.sqrt(sum(value * value for value in row)) for row in coef]
+        funded = sorted(sorted(range(n), key=lambda i: -potential[i])[:keep])
+
+        floor = {
+            (i, j): self.channel_minimums.get(channel, 0.0)
+            for i in funded for j, channel in enumerate(channels) if coef[i][j] > 0
+        }
+        floor_total = sum(floor.values())
+        if floor_total > total_budget > 0:
+            self.logger.warning(f"Minimums par canal ({floor_total:.2f}) supérieurs au budget: réduits proportionnellement")
+            floor = {cell: value * total_budget / floor_total for cell, value in floor.items()}
+
+        exponent = 1.0 / (1.0 - alpha)
+        scale = {cell: (coef[cell[0]][cell[1]] * alpha) ** exponent for cell in floor}
+
+        def spend(lam: float) -> Dict[tuple, float]:
+            factor = lam ** exponent
+            return {cell: max(floor[cell], scale[cell] / factor) for cell in floor}
+
+        low, high = 1e-12, self._upper_bound(sum(scale.values()), total_budget)
+        for _ in range(self.iterations):
+            lam = math.sqrt(low * high)
+            if sum(spend(lam).values()) > total_budget:
+                low = lam
+            else:
+                high = lam
+        cells = spend(high)
+
+        total = sum(cells.values())
+        ratio = total_budget / total if total > 0 else 0.0
+        allocation = [[0.0] * m for _ in range(n)]
+        expected_revenue = 0.0
+        for (i, j), amount in cells.items():
+            allocation[i][j] = amount * ratio
+            expected_revenue += coef[i][j] * allocation[i][j] ** alpha
+        return funded, allocation, expected_revenue, high
@@ -0,0 +1,233 @@
+"""
+iFiveMe Marketing MVP - État des campagnes persistant
+Instantanés incrémentaux + journal des mutations (WAL) dans SQLite pour un redémarrage à chaud
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Iterable, Mapping, Optional, Set, Tuple
+
+class CampaignStateStore:
+    """Instantanés par campagne et journal des mutations
+
+    Chaque mutation (création, pause, reprise, changement de budget...) est
+    ajoutée au journal: une ligne courte, sans réécrire la campagne. Les
+    lignes sont écrites par lots hors de la boucle d'événements (au plus
+    flush_delay secondes après la mutation, ou dès log_batch_size lignes).
+    Un checkpoint réécrit l'instantané des seules campagnes modifiées depuis
+    le précédent, puis retire du journal les lignes de ces campagnes: les
+    mutations des autres processus partageant la base sont conservées. Au
+    redémarrage, on charge les instantanés et on rejoue le journal restant.
+
+    serialize/deserialize convertissent une campagne en dict JSON et inversement;
+    l'appartenance aux campagnes actives est stockée dans la clé "active".
+    """
+
+    def __init__(self, db_path: Path, serialize: Callable[[Any], Dict[str, Any]],
+                 deserialize: Callable[[Dict[str, Any]], Any], wal_max_entries: int = 1000,
+                 log_batch_size: int = 50, flush_delay: float = 0.5):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.wal_max_entries = wal_max_entries
+        self.log_batch_size = log_batch_size
+        self.flush_delay = flush_delay
+        self.logger = logging.getLogger("campaign_state")
+
+        self._dirty: Set[str] = set()
+        self._wal_size = 0
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, str, float]] = []  # Lignes du journal pas encore écrites
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+        self.last_checkpoint: Optional[float] = None
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS campaign_snapshots (
+                campaign_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS campaign_wal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                campaign_id TEXT NOT NULL,
+                op TEXT NOT NULL,
+                changes TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        self._wal_size = self._conn.execute("SELECT COUNT(*) FROM campaign_wal").fetchone()[0]
+        # Ne pas perdre le dernier lot si le processus s'arrête sans close()
+        atexit.register(self.close)
+
+    # Écriture
+
+    def log(self, campaign_id: str, op: str, changes: Dict[str, Any]):
+        """Ajoute une mutation au journal ("create" porte l'état complet, "delete" retire la campagne)"""
+        payload = json.dumps(changes, default=str, ensure_ascii=False)
+        with self._lock:
+            self._pending.append((campaign_id, op, payload, time.time()))
+            self._wal_size += 1
+            self._dirty.add(campaign_id)
+            pending = len(self._pending)
+        self._schedule_flush(immediate=pending >= self.log_batch_size)
+
+    def _schedule_flush(self, immediate: bool):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()  # Hors boucle (scripts, tests): écriture directe
+            return
+        if self._flush_handle is not None:
+            if not immediate:
+                return
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(0 if immediate else self.flush_delay, self._flush_in_background, loop)
+
+    def _flush_in_background(self, loop: asyncio.AbstractEventLoop):
+        self._flush_handle = None
+        loop.run_in_executor(None, self.flush).add_done_callback(self._on_flush_done)
+
+    def _on_flush_done(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception():
+            self.logger.error(f"Écriture du journal des campagnes impossible: {future.exception()}")
+
+    def flush(self):
+        """Écrit les mutations en attente (une transaction)"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT INTO campaign_wal (campaign_id, op, changes, created_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.execute("COMMIT")
+        except sqlite3.Error:
+            self._conn.execute("ROLLBACK")
+            self._pending[:0] = rows
+            raise
+
+    def mark_dirty(self, campaign_id: str):
+        """Campagne modifiée en place, à inclure dans le prochain instantané
+
+        Sans ligne de journal, la modification est perdue si le processus
+        s'arrête avant le checkpoint: préférer log() pour les changements à garder.
+        """
+        self._dirty.add(campaign_id)
+
+    @property
+    def wal_size(self) -> int:
+        return self._wal_size
+
+    @property
+    def needs_checkpoint(self) -> bool:
+        return self._wal_size >= self.wal_max_entries
+
+    def checkpoint(self, campaigns: Mapping[str, Any], active_ids: Iterable[str]) -> int:
+        """Écrit l'instantané des campagnes modifiées et retire leurs lignes du journal; retourne leur nombre"""
+        active_ids = set(active_ids)
+        with self._lock:
+            self._flush_locked()
+            dirty, self._dirty = self._dirty, set()
+            rows, deleted = [], []
+            for campaign_id in dirty:
+                campaign = campaigns.get(campaign_id)
+                if campaign is None:
+                    deleted.append((campaign_id,))
+                    continue
+                state = self.serialize(campaign)
+                state["active"] = campaign_id in active_ids
+                rows.append((campaign_id, json.dumps(state, default=str, ensure_ascii=False)))
+
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM campaign_wal").fetchone()[0]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO campaign_snapshots (campaign_id, payload) VALUES (?, ?)", rows
+                )
+                self._conn.executemany("DELETE FROM campaign_snapshots WHERE campaign_id = ?", deleted)
+                # Seules les lignes des campagnes écrites sont couvertes par l'instantané
+                self._conn.executemany(
+                    "DELETE FROM campaign_wal WHERE campaign_id = ? AND seq <= ?",
+                    [(campaign_id, last_seq) for campaign_id in dirty]
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                self._dirty |= dirty
+                raise
+
+            self._wal_size = 0
+            self.last_checkpoint = time.time()
+        return len(rows) + len(deleted)
+
+    # Lecture
+
+    def load(self) -> Tuple[Dict[str, Any], Set[str], int]:
+        """Recharge les campagnes: (campagnes, ids actifs, mutations rejouées)"""
+        with self._lock:
+            self._flush_locked()
+            snapshots = self._conn.execute("SELECT campaign_id, payload FROM campaign_snapshots").fetchall()
+            wal = self._conn.execute("SELECT campaign_id, op, changes FROM campaign_wal ORDER BY seq").fetchall()
+
+        # Un seul décodage JSON pour tous les instantanés
+        payloads = json.loads("[" + ",".join(payload for _, payload in snapshots) + "]")
+        states: Dict[str, Dict[str, Any]] = {
+            campaign_id: state for (campaign_id, _), state in zip(snapshots, payloads)
+        }
+        orphans = 0
+        for campaign_id, op, changes in wal:
+            if op == "delete":
+                states.pop(campaign_id, None)
+            elif op == "create":
+                states[campaign_id] = json.loads(changes)
+            elif campaign_id in states:
+                states[campaign_id].update(json.loads(changes))
+            else:
+                # Mise à jour partielle sans état de base (création perdue): inutilisable
+                orphans += 1
+        if orphans:
+            self.logger.warning(f"{orphans} mutations ignorées: campagnes sans instantané ni création")
+
+        campaigns: Dict[str, Any] = {}
+        active_ids: Set[str] = set()
+        for campaign_id, state in states.items():
+            try:
+                if state.pop("active", False):
+                    active_ids.add(campaign_id)
+                campaigns[campaign_id] = self.deserialize(state)
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.error(f"État de la campagne {campaign_id} illisible: {str(e)}")
+                active_ids.discard(campaign_id)
+
+        # Les mutations rejouées seront intégrées au prochain checkpoint
+        self._dirty |= {campaign_id for campaign_id, _, _ in wal}
+        return campaigns, active_ids, len(wal)
+
+    def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._closed = True
+        atexit.unregister(self.close)
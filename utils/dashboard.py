@@ -0,0 +1,129 @@
+"""
+iFiveMe Marketing MVP - Vue dashboard incrémentale
+Vue en mémoire mise à jour par morceaux, écrite sur disque de façon atomique et au plus toutes les N secondes
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Mapping, Optional
+
+class DashboardView:
+    """Dashboard maintenu en mémoire et sauvegardé avec anti-rebond
+
+    Les mises à jour modifient la vue en place et la marquent "sale";
+    request_flush() programme au plus une écriture par flush_interval. L'écriture
+    passe par un fichier temporaire renommé (os.replace): un lecteur ne voit
+    jamais de fichier à moitié écrit.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 10.0, indent: Optional[int] = None,
+                 campaigns_key: str = "campaigns"):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.indent = indent
+        self.campaigns_key = campaigns_key
+        self.data: Dict[str, Any] = {campaigns_key: {}}
+        self.logger = logging.getLogger("dashboard")
+        self._dirty = False
+        self._last_flush = 0.0
+        self._pending_flush: Optional[asyncio.Task] = None
+        self.flush_count = 0
+
+    def update(self, values: Mapping[str, Any]):
+        """Met à jour des sections de premier niveau"""
+        self.data.update(values)
+        self._dirty = True
+
+    def update_campaign(self, campaign_id: str, status: Dict[str, Any]):
+        self.data[self.campaigns_key][campaign_id] = status
+        self._dirty = True
+
+    def remove_campaign(self, campaign_id: str):
+        if self.data[self.campaigns_key].pop(campaign_id, None) is not None:
+            self._dirty = True
+
+    def retain_campaigns(self, campaign_ids):
+        """Retire les campagnes absentes de campaign_ids"""
+        for campaign_id in set(self.data[self.campaigns_key]) - set(campaign_ids):
+            self.remove_campaign(campaign_id)
+
+    def request_flush(self):
+        """Programme une écriture, regroupée avec les autres demandes de la fenêtre"""
+        if not self._dirty or (self._pending_flush is not None and not self._pending_flush.done()):
+            return
+        delay = max(0.0, self._last_flush + self.flush_interval - time.monotonic())
+        self._pending_flush = asyncio.get_running_loop().create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self):
+        """Écrit la vue immédiatement (écriture atomique hors de la boucle)"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        content = json.dumps(self.data, indent=self.indent, default=str, ensure_ascii=False)
+        try:
+            await asyncio.to_thread(self._write_atomic, content)
+            self.flush_count += 1
+        except OSError as e:
+            self._dirty = True
+            self.logger.error(f"Erreur sauvegarde dashboard: {str(e)}")
+
+    async def close(self):
+        """Annule l'écriture différée et écrit immédiatement les mises à jour en attente"""
+        if self._pending_flush is not None and not self._pending_flush.done():
+            self._pending_flush.cancel()
+        self._pending_flush = None
+        await self.flush()
+
+    def _write_atomic(self, content: str):
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+class HealthProbeCache:
+    """Health checks des agents exécutés en parallèle et mis en cache ttl secondes"""
+
+    def __init__(self, ttl: float = 60.0, timeout: float = 5.0):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.logger = logging.getLogger("health_probes")
+        self._results: Dict[str, tuple] = {}  # agent_id -> (healthy, checked_at)
+
+    async def probe_all(self, agents: Mapping[str, Any], force: bool = False) -> Dict[str, bool]:
+        """Retourne l'état de santé de chaque agent, en ne sondant que les entrées expirées"""
+        now = time.monotonic()
+        stale = [
+            agent_id for agent_id in agents
+            if force or agent_id not in self._results or now - self._results[agent_id][1] > self.ttl
+        ]
+
+        if stale:
+            results = await asyncio.gather(*(self._probe(agents[agent_id]) for agent_id in stale))
+            checked_at = time.monotonic()
+            for agent_id, healthy in zip(stale, results):
+                self._results[agent_id] = (healthy, checked_at)
+
+        return {agent_id: self._results[agent_id][0] for agent_id in agents}
+
+    async def _probe(self, agent: Any) -> bool:
+        try:
+            return bool(await asyncio.wait_for(agent.health_check(), self.timeout))
+        except Exception as e:
+            self.logger.error(f"Health check failed for {getattr(agent, 'agent_id', agent)}: {str(e)}")
+            return False
+
+    def invalidate(self, agent_id: Optional[str] = None):
+        if agent_id is None:
+            self._results.clear()
+        else:
+            self._results.pop(agent_id, None)
@@ -0,0 +1,101 @@
+"""
+iFiveMe Marketing MVP - File d'éléments à échéance
+Tas min sur l'échéance: insertion et extraction en O(log n), annulation paresseuse
+"""
+
+import heapq
+import itertools
+from datetime import datetime
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+Due = Union[datetime, float]
+
+def _to_epoch(due: Due) -> float:
+    return due.timestamp() if isinstance(due, datetime) else float(due)
+
+class DueQueue(Generic[T]):
+    """Éléments identifiés par une clé, extraits par ordre d'échéance
+
+    Remplacer (push d'une clé existante) ou retirer un élément ne touche pas
+    au tas: l'ancienne entrée est ignorée quand elle arrive en tête, et le tas
+    est reconstruit quand les entrées périmées deviennent majoritaires.
+    """
+
+    def __init__(self, key: Callable[[T], str] = lambda item: item.id):
+        self.key = key
+        self._heap: List[Tuple[float, int, str]] = []  # (échéance, séquence, clé)
+        self._items: Dict[str, Tuple[int, float, T]] = {}  # clé -> (séquence, échéance, élément)
+        self._sequence = itertools.count()
+
+    def push(self, item: T, due: Due):
+        """Ajoute (ou replanifie) un élément"""
+        item_id = self.key(item)
+        timestamp = _to_epoch(due)
+        sequence = next(self._sequence)
+        replaced = item_id in self._items
+        self._items[item_id] = (sequence, timestamp, item)
+        heapq.heappush(self._heap, (timestamp, sequence, item_id))
+        if replaced:
+            self._rebuild_if_stale()
+
+    def discard(self, item_id: str) -> Optional[T]:
+        """Retire un élément par sa clé; retourne l'élément ou None"""
+        entry = self._items.pop(item_id, None)
+        if entry is None:
+            return None
+        self._rebuild_if_stale()
+        return entry[2]
+
+    def _rebuild_if_stale(self):
+        """Reconstruit le tas quand les entrées périmées deviennent majoritaires"""
+        if len(self._heap) > 2 * len(self._items) + 64:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(timestamp, sequence, item_id) for item_id, (sequence, timestamp, _) in self._items.items()]
+        heapq.heapify(self._heap)
+
+    def _prune(self):
+        """Retire les entrées périmées de la tête du tas"""
+        heap, items = self._heap, self._items
+        while heap:
+            _, sequence, item_id = heap[0]
+            entry = items.get(item_id)
+            if entry is not None and entry[0] == sequence:
+                return
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[float]:
+        """Échéance (epoch) du prochain élément, None si la file est vide"""
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[Due] = None, limit: Optional[int] = None) -> List[T]:
+        """Retire les éléments échus (échéance <= now), dans l'ordre, au plus limit"""
+        now = datetime.now().timestamp() if now is None else _to_epoch(now)
+        due: List[T] = []
+        while limit is None or len(due) < limit:
+            self._prune()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, item_id = heapq.heappop(self._heap)
+            due.append(self._items.pop(item_id)[2])
+        return due
+
+    def get(self, item_id: str) -> Optional[T]:
+        entry = self._items.get(item_id)
+        return entry[2] if entry else None
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        """Parcourt les éléments par échéance (copie triée)"""
+        return (entry[2] for entry in sorted(self._items.values(), key=lambda entry: (entry[1], entry[0])))
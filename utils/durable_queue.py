@@ -0,0 +1,258 @@
+"""
+iFiveMe Marketing MVP - Queue de tâches persistante
+Queue SQLite (mode WAL) avec baux et délais de visibilité pour survivre aux redémarrages
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+from utils.base_agent import AgentTask
+from utils.records import record_to_dict
+
+_DATETIME_FIELDS = ("created_at", "queued_at", "started_at", "completed_at", "deadline")
+
+def _serialize_task(task: AgentTask) -> str:
+    return json.dumps(record_to_dict(task), default=str, ensure_ascii=False)
+
+def _deserialize_task(payload: str) -> AgentTask:
+    data = json.loads(payload)
+    for field_name in _DATETIME_FIELDS:
+        if data.get(field_name):
+            data[field_name] = datetime.fromisoformat(data[field_name])
+    return AgentTask(**{k: v for k, v in data.items() if k in AgentTask.__dataclass_fields__})
+
+class DurableTaskQueue:
+    """Queue de priorité persistante, compatible avec PriorityTaskQueue
+
+    Une tâche retirée de la queue est "louée" (status processing) pendant
+    visibility_timeout secondes. Elle est supprimée par ack(); si le bail
+    expire sans ack (worker planté), elle redevient disponible. Au démarrage,
+    seules les tâches dont le bail a expiré sont récupérées: la base peut être
+    partagée avec d'autres processus encore actifs.
+
+    Par défaut les tâches sont louées une à une. Avec prefetch > 1, les tâches
+    préchargées sont rendues dès qu'une tâche plus prioritaire est ajoutée.
+
+    Les opérations sont protégées par un verrou: BaseAgent appelle les
+    écritures (push, pop, ack, extend_lease) depuis le pool de threads pour
+    ne pas bloquer la boucle d'événements.
+    """
+
+    blocking_io = True
+
+    def __init__(self, db_path: Path, visibility_timeout: float = 300.0,
+                 prefetch: int = 1, reclaim_on_start: bool = True):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.visibility_timeout = visibility_timeout
+        self.prefetch = max(1, prefetch)
+
+        # Tâches déjà louées en attente d'être distribuées aux workers
+        self._buffer: deque = deque()
+        self._last_reclaim = 0.0
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS task_queue (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL UNIQUE,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                payload TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_queue_pending ON task_queue(status, priority DESC, seq)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_lease ON task_queue(status, lease_expires)")
+
+        self.reclaimed_on_start = self.reclaim_expired() if reclaim_on_start else 0
+
+    # Interface commune avec PriorityTaskQueue
+
+    def push(self, task: AgentTask):
+        """Ajoute une tâche dans la queue persistante"""
+        self.push_many([task])
+
+    def pop(self) -> AgentTask:
+        """Loue et retourne la tâche la plus prioritaire"""
+        with self._lock:
+            if not self._buffer:
+                self._buffer.extend(self.pop_many(self.prefetch))
+            if not self._buffer:
+                raise IndexError("pop from an empty queue")
+            return self._buffer.popleft()
+
+    def peek(self) -> Optional[AgentTask]:
+        """Retourne la prochaine tâche sans la louer"""
+        with self._lock:
+            if self._buffer:
+                return self._buffer[0]
+            row = self._conn.execute(
+                "SELECT payload FROM task_queue WHERE status = 'pending' "
+                "ORDER BY priority DESC, seq LIMIT 1"
+            ).fetchone()
+        return _deserialize_task(row[0]) if row else None
+
+    def ack(self, task: AgentTask):
+        """Confirme le traitement d'une tâche et la retire définitivement"""
+        self.ack_many([task.id])
+
+    def clear(self):
+        """Vide la queue (tâches en attente et louées)"""
+        with self._lock:
+            self._buffer.clear()
+            self._conn.execute("DELETE FROM task_queue")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (pending,) = self._conn.execute(
+                "SELECT COUNT(*) FROM task_queue WHERE status = 'pending'"
+            ).fetchone()
+            return pending + len(self._buffer)
+
+    def __bool__(self) -> bool:
+        with self._lock:
+            if self._buffer:
+                return True
+            # Récupérer les baux expirés au plus une fois par seconde
+            if time.monotonic() - self._last_reclaim > 1.0:
+                self.reclaim_expired()
+                self._last_reclaim = time.monotonic()
+            return self._conn.execute(
+                "SELECT 1 FROM task_queue WHERE status = 'pending' LIMIT 1"
+            ).fetchone() is not None
+
+    def __iter__(self) -> Iterator[AgentTask]:
+        """Parcourt les tâches dans l'ordre d'exécution (sans les louer)"""
+        with self._lock:
+            buffered = list(self._buffer)
+            rows = self._conn.execute(
+                "SELECT payload FROM task_queue WHERE status = 'pending' ORDER BY priority DESC, seq"
+            ).fetchall()
+        yield from buffered
+        for (payload,) in rows:
+            yield _deserialize_task(payload)
+
+    # Opérations en lot
+
+    def push_many(self, tasks: Iterable[AgentTask]) -> int:
+        """Ajoute plusieurs tâches en une seule transaction"""
+        rows = [(task.id, task.priority, _serialize_task(task)) for task in tasks]
+        with self._lock:
+            # Une tâche plus prioritaire que les tâches préchargées ne doit pas attendre derrière elles
+            if self._buffer and rows and max(priority for _, priority, _ in rows) > self._buffer[-1].priority:
+                self._release_buffer()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO task_queue (task_id, priority, payload) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def pop_many(self, limit: int) -> List[AgentTask]:
+        """Loue jusqu'à limit tâches, par priorité puis ordre d'arrivée"""
+        lease_expires = time.time() + self.visibility_timeout
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT seq, payload FROM task_queue WHERE status = 'pending' "
+                    "ORDER BY priority DESC, seq LIMIT ?", (limit,)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE task_queue SET status = 'processing', lease_expires = ?, "
+                    "attempts = attempts + 1 WHERE seq = ?",
+                    [(lease_expires, seq) for seq, _ in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [_deserialize_task(payload) for _, payload in rows]
+
+    def ack_many(self, task_ids: Iterable[str]):
+        """Confirme le traitement de plusieurs tâches"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM task_queue WHERE task_id = ?", [(task_id,) for task_id in task_ids]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # Baux et récupération
+
+    def nack(self, task: AgentTask):
+        """Remet immédiatement une tâche louée à disposition des workers"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE task_queue SET status = 'pending', lease_expires = NULL WHERE task_id = ?",
+                (task.id,)
+            )
+
+    def extend_lease(self, task: AgentTask, seconds: Optional[float] = None):
+        """Prolonge le bail d'une tâche longue"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE task_queue SET lease_expires = ? WHERE task_id = ? AND status = 'processing'",
+                (time.time() + (seconds or self.visibility_timeout), task.id)
+            )
+
+    def reclaim_expired(self) -> int:
+        """Remet en attente les tâches dont le bail a expiré"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE task_queue SET status = 'pending', lease_expires = NULL "
+                "WHERE status = 'processing' AND lease_expires < ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def reclaim_all(self) -> int:
+        """Remet en attente toutes les tâches louées (reprise après redémarrage)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE task_queue SET status = 'pending', lease_expires = NULL WHERE status = 'processing'"
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Nombre de tâches par statut"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM task_queue GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def _release_buffer(self):
+        """Rend les tâches préchargées (non distribuées) à la queue"""
+        with self._lock:
+            if self._buffer:
+                self._conn.executemany(
+                    "UPDATE task_queue SET status = 'pending', lease_expires = NULL, "
+                    "attempts = attempts - 1 WHERE task_id = ?",
+                    [(task.id,) for task in self._buffer]
+                )
+                self._buffer.clear()
+
+    def close(self):
+        """Rend les tâches préchargées et ferme la connexion"""
+        with self._lock:
+            self._release_buffer()
+            self._conn.close()
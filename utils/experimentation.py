@@ -0,0 +1,357 @@
+"""
+iFiveMe Marketing MVP - Moteur d'expérimentation A/B
+Tests bayésiens séquentiels (Beta-Bernoulli) avec arrêt anticipé, partagés par l'orchestrateur et les agents
+"""
+
+import logging
+import math
+import random
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Tuple
+
+# NumPy n'est importé qu'à la création du premier moteur, pas au démarrage des agents
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+# Statuts d'une expérience et d'une variante
+RUNNING = "running"
+COMPLETED = "completed"  # Gagnant trouvé
+INCONCLUSIVE = "inconclusive"  # Budget d'échantillons épuisé sans gagnant
+STOPPED = "stopped"  # Variante arrêtée: ne reçoit plus d'envois
+
+@dataclass
+class Experiment:
+    """Expérience en cours: une variante = un emplacement dans les compteurs du moteur"""
+    id: str
+    variants: List[str]
+    metric: str = "conversion_rate"
+    win_probability: float = 0.95  # P(meilleure) requise pour déclarer un gagnant
+    drop_probability: float = 0.01  # En dessous, la variante est arrêtée
+    min_samples: int = 100  # Essais par variante avant toute décision
+    max_samples: Optional[int] = None  # Total d'essais au-delà duquel on conclut
+    prior: Tuple[float, float] = (1.0, 1.0)  # Beta(alpha, beta)
+    weights: Dict[str, float] = field(default_factory=dict)  # Répartition initiale du trafic
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    slots: List[int] = field(default_factory=list)
+    stopped: List[str] = field(default_factory=list)
+    status: str = RUNNING
+    winner: Optional[str] = None
+    probabilities: Dict[str, float] = field(default_factory=dict)  # P(meilleure) par variante
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    completed_at: Optional[str] = None
+
+    @property
+    def active_variants(self) -> List[str]:
+        return [variant for variant in self.variants if variant not in self.stopped]
+
+class ExperimentEngine:
+    """Expériences A/B/n concurrentes, mises à jour par flux d'événements
+
+    Les compteurs (essais, succès) de toutes les variantes de toutes les
+    expériences sont stockés dans deux vecteurs; un lot d'événements est
+    agrégé en une passe (np.add.at), puis seules les expériences touchées
+    sont réévaluées. L'évaluation tire des échantillons des postérieures Beta
+    pour estimer P(meilleure) par variante: les variantes perdantes sont
+    arrêtées dès que c'est probable, et l'allocation du trafic suit ces
+    probabilités (échantillonnage de Thompson).
+
+    Les expériences terminées restent consultables concluded_ttl secondes
+    (au plus max_concluded à la fois), puis sont archivées: leur résumé est
+    gardé dans archived (borné à max_archived) et leurs emplacements de
+    compteurs sont réutilisés.
+    """
+
+    def __init__(self, draws: int = 4000, seed: Optional[int] = None, max_concluded: int = 200,
+                 concluded_ttl: float = 7 * 86400, max_archived: int = 1000):
+        self.draws = draws
+        self.max_concluded = max_concluded
+        self.concluded_ttl = concluded_ttl
+        self.max_archived = max_archived
+        self.logger = logging.getLogger("experimentation")
+        self.experiments: Dict[str, Experiment] = {}
+        self.archived: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # Résumés, du plus ancien au plus récent
+        self._concluded: "OrderedDict[str, None]" = OrderedDict()  # Expériences terminées, par date de fin
+        self._free_slots: List[int] = []
+        self._slot_index: Dict[Tuple[str, str], int] = {}
+        self._np = import_module("numpy") if NUMPY_AVAILABLE else None
+        self._rng = self._np.random.default_rng(seed) if self._np else None
+        self._random = random.Random(seed)
+        self._trials = self._np.zeros(0) if self._np else []
+        self._successes = self._np.zeros(0) if self._np else []
+
+    # Création
+
+    def create(self, experiment_id: str, variants: Sequence[str], traffic_split: Optional[Sequence[float]] = None,
+               **options) -> Experiment:
+        """Crée (ou retourne si elle existe) une expérience
+
+        L'appelant qui doit distinguer une expérience existante vérifie
+        exists() avant: create() ne signale pas la réutilisation.
+        """
+        if experiment_id in self.experiments:
+            return self.experiments[experiment_id]
+        if len(variants) < 2:
+            raise ValueError("Une expérience demande au moins deux variantes")
+        self.evict_concluded()
+
+        split = list(traffic_split) if traffic_split else [1.0] * len(variants)
+        total = sum(split)
+        experiment = Experiment(
+            id=experiment_id,
+            variants=list(variants),
+            weights={variant: share / total for variant, share in zip(variants, split)},
+            **options
+        )
+
+        experiment.slots = self._allocate_slots(len(variants))
+        for variant, slot in zip(variants, experiment.slots):
+            self._slot_index[(experiment_id, variant)] = slot
+
+        self.experiments[experiment_id] = experiment
+        return experiment
+
+    def exists(self, experiment_id: str) -> bool:
+        """Expérience connue (en cours, terminée ou archivée)"""
+        return experiment_id in self.experiments or experiment_id in self.archived
+
+    def _allocate_slots(self, count: int) -> List[int]:
+        """Emplacements de compteurs: d'abord ceux des expériences archivées, puis à la suite"""
+        reused = [self._free_slots.pop() for _ in range(min(count, len(self._free_slots)))]
+        first_new = len(self._slot_index) + len(self._free_slots) + len(reused)
+        slots = reused + list(range(first_new, first_new + count - len(reused)))
+        self._grow(first_new + count - len(reused))
+        return slots
+
+    def _grow(self, size: int):
+        np = self._np
+        if np:
+            if size > len(self._trials):
+                capacity = max(size, 2 * len(self._trials), 64)
+                self._trials = np.concatenate([self._trials, np.zeros(capacity - len(self._trials))])
+                self._successes = np.concatenate([self._successes, np.zeros(capacity - len(self._successes))])
+        else:
+            self._trials.extend([0.0] * (size - len(self._trials)))
+            self._successes.extend([0.0] * (size - len(self._successes)))
+
+    # Mise à jour
+
+    def record(self, experiment_id: str, variant: str, trials: int = 1, successes: int = 0) -> Experiment:
+        """Ajoute des résultats agrégés pour une variante et réévalue l'expérience"""
+        self.record_events([(experiment_id, variant, trials, successes)])
+        return self.experiments[experiment_id]
+
+    def record_events(self, events: Iterable[Tuple]) -> Dict[str, Experiment]:
+        """Ajoute un lot d'événements (experiment_id, variante, essais[, succès])
+
+        Un événement (experiment_id, variante, succès_bool) compte pour un essai.
+        Les événements d'expériences terminées ou de variantes arrêtées sont ignorés.
+        """
+        slots, trials, successes = [], [], []
+        touched: Dict[str, Experiment] = {}
+        for event in events:
+            experiment_id, variant = event[0], event[1]
+            experiment = self.experiments.get(experiment_id)
+            slot = self._slot_index.get((experiment_id, variant))
+            if experiment is None or slot is None:
+                raise KeyError(f"Variante inconnue: {experiment_id}/{variant}")
+            if experiment.status != RUNNING or variant in experiment.stopped:
+                continue
+            if len(event) == 3:
+                event_trials, event_successes = 1, int(bool(event[2]))
+            else:
+                event_trials, event_successes = event[2], event[3]
+            slots.append(slot)
+            trials.append(event_trials)
+            successes.append(event_successes)
+            touched[experiment_id] = experiment
+
+        if slots:
+            np = self._np
+            if np:
+                index = np.asarray(slots)
+                np.add.at(self._trials, index, np.asarray(trials, dtype=float))
+                np.add.at(self._successes, index, np.asarray(successes, dtype=float))
+            else:
+                for slot, event_trials, event_successes in zip(slots, trials, successes):
+                    self._trials[slot] += event_trials
+                    self._successes[slot] += event_successes
+
+        for experiment in touched.values():
+            self.evaluate(experiment.id)
+        return touched
+
+    # Décision
+
+    def counts(self, experiment_id: str) -> Dict[str, Tuple[int, int]]:
+        """(essais, succès) par variante"""
+        experiment = self.experiments[experiment_id]
+        return {
+            variant: (int(self._trials[slot]), int(self._successes[slot]))
+            for variant, slot in zip(experiment.variants, experiment.slots)
+        }
+
+    def evaluate(self, experiment_id: str) -> Experiment:
+        """Met à jour P(meilleure), arrête les perdantes et conclut si possible"""
+        experiment = self.experiments[experiment_id]
+        if experiment.status != RUNNING:
+            return experiment
+
+        active = experiment.active_variants
+        counts = self.counts(experiment_id)
+        probabilities = self._probability_best([counts[variant] for variant in active], experiment.prior)
+        experiment.probabilities = {variant: 0.0 for variant in experiment.variants}
+        experiment.probabilities.update(zip(active, probabilities))
+
+        if min(counts[variant][0] for variant in active) < experiment.min_samples:
+            return experiment
+
+        # Arrêt anticipé des variantes presque certainement moins bonnes
+        for variant, probability in zip(active, probabilities):
+            if probability < experiment.drop_probability and len(experiment.active_variants) > 1:
+                experiment.stopped.append(variant)
+                self.logger.info(f"Expérience {experiment_id}: variante {variant} arrêtée (P(meilleure)={probability:.3f})")
+
+        best = max(experiment.active_variants, key=lambda variant: experiment.probabilities[variant])
+        total_trials = sum(trials for trials, _ in counts.values())
+        if experiment.probabilities[best] >= experiment.win_probability or len(experiment.active_variants) == 1:
+            self._conclude(experiment, best, COMPLETED)
+        elif experiment.max_samples is not None and total_trials >= experiment.max_samples:
+            self._conclude(experiment, best, INCONCLUSIVE)
+        return experiment
+
+    def _conclude(self, experiment: Experiment, best: str, status: str):
+        experiment.status = status
+        experiment.winner = best
+        experiment.completed_at = datetime.now().isoformat()
+        self._concluded[experiment.id] = None
+        self.logger.info(f"Expérience {experiment.id} terminée ({status}): variante {best}")
+
+    # Éviction
+
+    def evict_concluded(self, now: Optional[datetime] = None) -> int:
+        """Archive les expériences terminées expirées ou en surnombre; retourne leur nombre"""
+        cutoff = ((now or datetime.now()) - timedelta(seconds=self.concluded_ttl)).isoformat()
+        evicted = 0
+        while self._concluded:
+            oldest = next(iter(self._concluded))
+            if len(self._concluded) <= self.max_concluded and self.experiments[oldest].completed_at >= cutoff:
+                break
+            self._archive(oldest)
+            evicted += 1
+        return evicted
+
+    def _archive(self, experiment_id: str):
+        summary = self.summary(experiment_id)
+        experiment = self.experiments.pop(experiment_id)
+        self._concluded.pop(experiment_id, None)
+        summary["metadata"] = experiment.metadata
+        self.archived[experiment_id] = summary
+        while len(self.archived) > self.max_archived:
+            self.archived.popitem(last=False)
+
+        # Compteurs remis à zéro pour la prochaine expérience
+        for variant, slot in zip(experiment.variants, experiment.slots):
+            del self._slot_index[(experiment_id, variant)]
+            self._trials[slot] = 0
+            self._successes[slot] = 0
+            self._free_slots.append(slot)
+
+    def _probability_best(self, counts: List[Tuple[int, int]], prior: Tuple[float, float]) -> List[float]:
+        """P(variante meilleure) par tirages des postérieures Beta(alpha + succès, beta + échecs)"""
+        alpha = [prior[0] + successes for _, successes in counts]
+        beta = [prior[1] + trials - successes for trials, successes in counts]
+
+        np = self._np
+        if np:
+            samples = self._rng.beta(np.asarray(alpha)[:, None], np.asarray(beta)[:, None], (len(counts), self.draws))
+            wins = np.bincount(samples.argmax(axis=0), minlength=len(counts))
+            return (wins / self.draws).tolist()
+
+        draws = max(500, self.draws // 4)  # Repli Python pur: moins de tirages
+        wins = [0] * len(counts)
+        for _ in range(draws):
+            sample = [self._random.betavariate(a, b) for a, b in zip(alpha, beta)]
+            wins[sample.index(max(sample))] += 1
+        return [count / draws for count in wins]
+
+    # Allocation du trafic
+
+    def allocation(self, experiment_id: str) -> Dict[str, float]:
+        """Part du trafic par variante: répartition initiale tant que les données manquent, puis P(meilleure)"""
+        experiment = self.experiments[experiment_id]
+        if experiment.status != RUNNING:
+            return {variant: float(variant == experiment.winner) for variant in experiment.variants}
+
+        active = experiment.active_variants
+        counts = self.counts(experiment_id)
+        if min(counts[variant][0] for variant in active) < experiment.min_samples or not experiment.probabilities:
+            weights = {variant: experiment.weights.get(variant, 0.0) for variant in active}
+        else:
+            # Plancher de 5% pour continuer à apprendre sur les variantes encore en lice
+            weights = {variant: max(experiment.probabilities[variant], 0.05) for variant in active}
+
+        total = sum(weights.values()) or 1.0
+        return {variant: weights.get(variant, 0.0) / total for variant in experiment.variants}
+
+    def assign(self, experiment_id: str, count: int) -> Dict[str, int]:
+        """Répartit count envois entre les variantes selon l'allocation courante"""
+        shares = self.allocation(experiment_id)
+        assigned = {variant: int(math.floor(count * share)) for variant, share in shares.items()}
+        remainder = count - sum(assigned.values())
+        for variant in sorted(shares, key=lambda v: count * shares[v] - assigned[v], reverse=True)[:remainder]:
+            assigned[variant] += 1
+        return assigned
+
+    # Lecture
+
+    def summary(self, experiment_id: str) -> Dict[str, Any]:
+        """Résumé d'une expérience (archivée: résumé figé à l'archivage)"""
+        if experiment_id not in self.experiments and experiment_id in self.archived:
+            return self.archived[experiment_id]
+        experiment = self.experiments[experiment_id]
+        counts = self.counts(experiment_id)
+        rates = {
+            variant: (successes + experiment.prior[0]) / (trials + sum(experiment.prior))
+            for variant, (trials, successes) in counts.items()
+        }
+        best = experiment.winner or max(experiment.variants, key=lambda variant: rates[variant])
+        others = [rates[variant] for variant in experiment.variants if variant != best]
+        baseline = max(others) if others else 0.0
+        return {
+            "experiment_id": experiment.id,
+            "metric": experiment.metric,
+            "status": experiment.status,
+            "winner": experiment.winner,
+            "leader": best,
+            "is_significant": experiment.status == COMPLETED,
+            "variants": {
+                variant: {
+                    "trials": counts[variant][0],
+                    "successes": counts[variant][1],
+                    "rate": rates[variant],
+                    "probability_best": experiment.probabilities.get(variant, 1.0 / len(experiment.variants)),
+                    "status": STOPPED if variant in experiment.stopped else experiment.status
+                }
+                for variant in experiment.variants
+            },
+            "improvement": (rates[best] - baseline) / baseline if baseline else 0.0,
+            "total_trials": sum(trials for trials, _ in counts.values()),
+            "allocation": self.allocation(experiment_id),
+            "created_at": experiment.created_at,
+            "completed_at": experiment.completed_at
+        }
+
+    def list_experiments(self, status: Optional[str] = None) -> List[Experiment]:
+        return [experiment for experiment in self.experiments.values() if status is None or experiment.status == status]
+
+_shared_engine: Optional[ExperimentEngine] = None
+
+def get_experiment_engine() -> ExperimentEngine:
+    """Moteur d'expérimentation partagé par les agents du processus"""
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = ExperimentEngine()
+    return _shared_engine
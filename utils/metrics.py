@@ -0,0 +1,243 @@
+"""
+iFiveMe Marketing MVP - Métriques de latence des agents
+Histogrammes par type de tâche, débit et export au format Prometheus
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from typing import Dict, List, Any, Iterable, Optional
+
+# Bornes des buckets en secondes (style Prometheus)
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+class LatencyHistogram:
+    """Histogramme à buckets fixes avec estimation des percentiles"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # dernier bucket = +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Enregistre une observation (en secondes)"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Estime le percentile q (0-1) par interpolation linéaire dans le bucket"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count > 0:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                fraction = (rank - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Résumé sérialisable de l'histogramme"""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50": round(self.percentile(0.50), 6),
+            "p95": round(self.percentile(0.95), 6),
+            "p99": round(self.percentile(0.99), 6),
+            "max": round(self.max, 6)
+        }
+
+class ThroughputCounter:
+    """Compteur de débit sur une fenêtre glissante (buckets d'une seconde)"""
+
+    def __init__(self, window_seconds: int = 60):
+        self.window_seconds = window_seconds
+        self._slots = [0] * window_seconds
+        self._slot_seconds = [0] * window_seconds
+        self.total = 0
+        self.started_at = time.monotonic()
+
+    def increment(self, now: Optional[float] = None):
+        second = int(now if now is not None else time.monotonic())
+        index = second % self.window_seconds
+        if self._slot_seconds[index] != second:
+            self._slot_seconds[index] = second
+            self._slots[index] = 0
+        self._slots[index] += 1
+        self.total += 1
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Tâches par seconde sur la fenêtre glissante"""
+        now = now if now is not None else time.monotonic()
+        current = int(now)
+        recent = sum(
+            count for count, second in zip(self._slots, self._slot_seconds)
+            if current - second < self.window_seconds
+        )
+        window = min(self.window_seconds, max(1.0, now - self.started_at))
+        return recent / window
+
+class TaskTypeMetrics:
+    """Métriques d'un type de tâche: attente en queue, exécution, compteurs"""
+
+    def __init__(self):
+        self.queue_wait = LatencyHistogram()
+        self.execution_time = LatencyHistogram()
+        self.completed = 0
+        self.failed = 0
+        self.throughput = ThroughputCounter()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "throughput_per_second": round(self.throughput.rate(), 4),
+            "queue_wait": self.queue_wait.snapshot(),
+            "execution_time": self.execution_time.snapshot()
+        }
+
+class AgentLatencyMetrics:
+    """Métriques de latence d'un agent, ventilées par type de tâche"""
+
+    def __init__(self):
+        self.overall = TaskTypeMetrics()
+        self.by_task_type: Dict[str, TaskTypeMetrics] = {}
+
+    def record(self, task_type: str, queue_wait: float, execution_time: float, success: bool):
+        """Enregistre la fin d'une tâche"""
+        type_metrics = self.by_task_type.get(task_type)
+        if type_metrics is None:
+            type_metrics = self.by_task_type[task_type] = TaskTypeMetrics()
+
+        for metrics in (self.overall, type_metrics):
+            metrics.queue_wait.observe(max(0.0, queue_wait))
+            metrics.execution_time.observe(max(0.0, execution_time))
+            metrics.throughput.increment()
+            if success:
+                metrics.completed += 1
+            else:
+                metrics.failed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "overall": self.overall.snapshot(),
+            "by_task_type": {
+                task_type: metrics.snapshot()
+                for task_type, metrics in self.by_task_type.items()
+            }
+        }
+
+def _label_value(value: Any) -> str:
+    """Échappe une valeur de label Prometheus (antislash, guillemet, saut de ligne)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _prometheus_histogram(lines: List[str], name: str, histogram: LatencyHistogram, labels: str):
+    cumulative = 0
+    for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+def render_prometheus(agents: Iterable[Any]) -> str:
+    """Génère le texte d'exposition Prometheus pour une liste d'agents"""
+    # Prometheus exige que chaque famille de métriques soit regroupée
+    queue_depth = [
+        "# HELP ifiveme_tasks_in_queue Tâches en attente",
+        "# TYPE ifiveme_tasks_in_queue gauge"
+    ]
+    queue_wait = [
+        "# HELP ifiveme_task_queue_wait_seconds Temps d'attente des tâches en queue",
+        "# TYPE ifiveme_task_queue_wait_seconds histogram"
+    ]
+    execution = [
+        "# HELP ifiveme_task_execution_seconds Temps d'exécution des tâches",
+        "# TYPE ifiveme_task_execution_seconds histogram"
+    ]
+    totals = [
+        "# HELP ifiveme_tasks_total Tâches terminées par statut",
+        "# TYPE ifiveme_tasks_total counter"
+    ]
+
+    for agent in agents:
+        agent_label = f'agent="{_label_value(agent.agent_id)}"'
+        queue_depth.append(f"ifiveme_tasks_in_queue{{{agent_label}}} {len(agent.task_queue)}")
+
+        for task_type, metrics in agent.latency_metrics.by_task_type.items():
+            labels = f'{agent_label},task_type="{_label_value(task_type)}"'
+            _prometheus_histogram(queue_wait, "ifiveme_task_queue_wait_seconds", metrics.queue_wait, labels)
+            _prometheus_histogram(execution, "ifiveme_task_execution_seconds", metrics.execution_time, labels)
+            totals.append(f'ifiveme_tasks_total{{{labels},status="completed"}} {metrics.completed}')
+            totals.append(f'ifiveme_tasks_total{{{labels},status="failed"}} {metrics.failed}')
+
+    return "\n".join(queue_depth + queue_wait + execution + totals) + "\n"
+
+class MetricsHTTPServer:
+    """Serveur HTTP local minimal exposant /metrics au format Prometheus"""
+
+    def __init__(self, agents_provider, host: str = "127.0.0.1", port: int = 9108):
+        # agents_provider: callable retournant les agents à exporter
+        self.agents_provider = agents_provider
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger("metrics.http")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(f"Export Prometheus disponible sur http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # Ignorer les en-têtes de la requête
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                body = render_prometheus(self.agents_provider()).encode("utf-8")
+                status = "200 OK"
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                body = b"Not Found\n"
+                status = "404 Not Found"
+                content_type = "text/plain; charset=utf-8"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except Exception as e:
+            self.logger.error(f"Erreur export métriques: {str(e)}")
+        finally:
+            writer.close()
+
+async def start_metrics_server(agents_provider, host: str = "127.0.0.1", port: int = 9108) -> MetricsHTTPServer:
+    """Démarre l'export Prometheus local pour les agents fournis"""
+    server = MetricsHTTPServer(agents_provider, host, port)
+    await server.start()
+    return server
@@ -0,0 +1,78 @@
+"""
+iFiveMe Marketing MVP - Exécution des tâches CPU dans un pool de processus
+Évite que les calculs lourds (attribution, cohortes, scoring qualité) bloquent la boucle d'événements
+"""
+
+import asyncio
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Optional, Tuple
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Agents construits une seule fois par processus worker
+_worker_agents: Dict[Tuple[str, str], Any] = {}
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Retourne le pool de processus partagé (créé au premier appel)"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=max_workers or int(os.getenv("IFIVEME_PROCESS_POOL_SIZE", os.cpu_count() or 2))
+        )
+    return _process_pool
+
+def shutdown_process_pool():
+    """Arrête le pool de processus partagé"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+async def run_in_process_pool(func: Callable, *args) -> Any:
+    """Exécute une fonction picklable dans le pool partagé sans bloquer la boucle"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+@dataclass
+class TaskEnvelope:
+    """Enveloppe picklable d'une tâche à exécuter dans un autre processus"""
+    agent_module: str
+    agent_class: str
+    task: Dict[str, Any]
+    agent_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class OffloadedResult:
+    """Résultat d'une tâche exécutée dans le pool, avec ses mesures"""
+    result: Dict[str, Any]
+    cpu_seconds: float
+    wall_seconds: float
+    worker_pid: int
+
+def execute_task_envelope(envelope: TaskEnvelope) -> OffloadedResult:
+    """Point d'entrée côté worker: reconstruit l'agent et la tâche puis appelle process_task"""
+    from utils.base_agent import AgentTask
+
+    agent_key = (envelope.agent_module, envelope.agent_class)
+    agent = _worker_agents.get(agent_key)
+    if agent is None:
+        module = importlib.import_module(envelope.agent_module)
+        agent = getattr(module, envelope.agent_class)(**envelope.agent_kwargs)
+        _worker_agents[agent_key] = agent
+
+    task = AgentTask(**envelope.task)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = asyncio.run(agent.process_task(task))
+
+    return OffloadedResult(
+        result=result,
+        cpu_seconds=time.process_time() - cpu_start,
+        wall_seconds=time.perf_counter() - wall_start,
+        worker_pid=os.getpid()
+    )
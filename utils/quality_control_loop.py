@@ -8,10 +8,12 @@ import json
 import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
+from utils.records import record, record_to_dict
+
 class QualityStatus(Enum):
     PENDING = "pending"
     IN_REVIEW = "in_review"
@@ -39,7 +41,7 @@ class QualityAssessment:
     suggestions: List[str]
     passed: bool
 
-@dataclass
+@record
 class ProductionItem:
     """Item de production en cours de validation"""
     id: str
@@ -229,7 +231,7 @@ class QualityControlLoop:
                 "quality_score": production_item.quality_score,
                 "status": production_item.status.value,
                 "iterations": production_item.iteration,
-                "assessments": [asdict(a) for a in production_item.assessments],
+                "assessments": [record_to_dict(a) for a in production_item.assessments],
                 "final_feedback": self._generate_final_report(production_item)
             }
         else:
@@ -238,7 +240,7 @@ class QualityControlLoop:
                 "reason": "Impossible d'atteindre le standard qualité requis",
                 "quality_score": production_item.quality_score,
                 "iterations": production_item.iteration,
-                "final_assessments": [asdict(a) for a in production_item.assessments],
+                "final_assessments": [record_to_dict(a) for a in production_item.assessments],
                 "recommendations": self._generate_improvement_recommendations(production_item)
             }
 
@@ -0,0 +1,235 @@
+"""
+iFiveMe Marketing MVP - Limiteur de débit des APIs
+Seaux à jetons par plateforme et endpoint: les appelants attendent un jeton au lieu d'échouer
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+class RateLimitExceeded(Exception):
+    """Le jeton ne serait pas disponible avant l'expiration du délai d'attente"""
+
+    def __init__(self, key: str, wait: float):
+        super().__init__(f"Limite de débit {key}: prochain jeton dans {wait:.1f}s")
+        self.key = key
+        self.wait = wait
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Débit soutenu (jetons/seconde) et rafale (capacité du seau)"""
+    rate: float
+    burst: float
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RateLimit":
+        """{"per_second"|"per_minute"|"per_hour": n, "burst": n}"""
+        if "per_second" in config:
+            rate = float(config["per_second"])
+        elif "per_minute" in config:
+            rate = config["per_minute"] / 60.0
+        elif "per_hour" in config:
+            rate = config["per_hour"] / 3600.0
+        else:
+            raise ValueError(f"Limite de débit sans per_second/per_minute/per_hour: {config}")
+        if rate <= 0:
+            raise ValueError("Le débit d'une limite doit être positif")
+        return cls(rate=rate, burst=float(config.get("burst", 1)))
+
+class RateLimiter(ABC):
+    """Seaux à jetons par (plateforme, endpoint)
+
+    acquire() réserve le jeton immédiatement et attend le temps nécessaire à
+    son renouvellement: le seau peut devenir négatif, ce qui ordonne les
+    appelants sans boucle de réessai. Une plateforme sans endpoint configuré
+    utilise sa limite "default"; sans limite du tout, l'appel passe.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        self.logger = logging.getLogger("rate_limiter")
+        self._limits: Dict[Tuple[str, str], RateLimit] = {}
+        for platform, endpoints in (limits or {}).items():
+            for endpoint, config in endpoints.items():
+                self.configure(platform, endpoint, **config)
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def configure(self, platform: str, endpoint: str = "default", **config):
+        """Définit (ou remplace) la limite d'un endpoint"""
+        self._limits[(platform.lower(), endpoint)] = RateLimit.from_config(config)
+
+    def limit_for(self, platform: str, endpoint: str = "default") -> Optional[RateLimit]:
+        platform = platform.lower()
+        return self._limits.get((platform, endpoint)) or self._limits.get((platform, "default"))
+
+    async def acquire(self, platform: str, endpoint: str = "default", tokens: float = 1.0,
+                      timeout: Optional[float] = None) -> float:
+        """Attend que tokens jetons soient disponibles; retourne l'attente (secondes)
+
+        Lève RateLimitExceeded, sans rien consommer, si l'attente dépasserait timeout.
+        """
+        limit = self.limit_for(platform, endpoint)
+        if limit is None:
+            return 0.0
+
+        key = f"{platform.lower()}:{endpoint}"
+        wait = await self._reserve(key, limit, tokens, timeout)
+        if wait is None:
+            raise RateLimitExceeded(key, self._time_until(key, limit, tokens))
+
+        self.acquired += 1
+        if wait > 0:
+            self.waited_seconds += wait
+            self.logger.debug(f"Limite de débit {key}: attente de {wait:.2f}s")
+            # Une annulation pendant l'attente ne rend pas le jeton (il est déjà réservé)
+            await asyncio.sleep(wait)
+        return wait
+
+    async def try_acquire(self, platform: str, endpoint: str = "default", tokens: float = 1.0) -> bool:
+        """Consomme un jeton seulement s'il est disponible immédiatement"""
+        try:
+            await self.acquire(platform, endpoint, tokens, timeout=0)
+            return True
+        except RateLimitExceeded:
+            return False
+
+    @staticmethod
+    def _refill(limit: RateLimit, level: float, updated_at: float, now: float) -> float:
+        return min(limit.burst, level + (now - updated_at) * limit.rate)
+
+    @staticmethod
+    def _plan(limit: RateLimit, available: float, tokens: float, max_wait: Optional[float]) -> Optional[float]:
+        """Attente nécessaire après réservation, ou None si elle dépasse max_wait"""
+        remaining = available - tokens
+        wait = -remaining / limit.rate if remaining < 0 else 0.0
+        if max_wait is not None and wait > max_wait:
+            return None
+        return wait
+
+    @abstractmethod
+    async def _reserve(self, key: str, limit: RateLimit, tokens: float, max_wait: Optional[float]) -> Optional[float]:
+        """Réserve les jetons; retourne l'attente, ou None (sans réserver) si > max_wait"""
+        pass
+
+    @abstractmethod
+    def _time_until(self, key: str, limit: RateLimit, tokens: float) -> float:
+        """Attente actuelle avant que tokens jetons soient disponibles"""
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited_seconds, 3),
+            "limits": {
+                f"{platform}:{endpoint}": {"per_second": limit.rate, "burst": limit.burst}
+                for (platform, endpoint), limit in self._limits.items()
+            }
+        }
+
+class MemoryRateLimiter(RateLimiter):
+    """Seaux en mémoire, propres au processus"""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        super().__init__(limits)
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # clé -> (niveau, horodatage)
+
+    def _available(self, key: str, limit: RateLimit, now: float) -> float:
+        level, updated_at = self._buckets.get(key, (limit.burst, now))
+        return self._refill(limit, level, updated_at, now)
+
+    async def _reserve(self, key, limit, tokens, max_wait):
+        now = time.monotonic()
+        available = self._available(key, limit, now)
+        wait = self._plan(limit, available, tokens, max_wait)
+        if wait is not None:
+            self._buckets[key] = (available - tokens, now)
+        return wait
+
+    def _time_until(self, key, limit, tokens):
+        available = self._available(key, limit, time.monotonic())
+        return max(0.0, (tokens - available) / limit.rate)
+
+class SQLiteRateLimiter(RateLimiter):
+    """Seaux stockés dans SQLite, partagés entre les processus (workers, pool)
+
+    Chaque réservation est une transaction BEGIN IMMEDIATE exécutée hors de
+    la boucle d'événements: deux processus ne peuvent pas consommer le même
+    jeton. Les horodatages sont en temps réel (time.time()), commun aux processus.
+    """
+
+    def __init__(self, db_path: Path, limits: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        super().__init__(limits)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                key TEXT PRIMARY KEY,
+                level REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+
+    def _reserve_sync(self, key: str, limit: RateLimit, tokens: float, max_wait: Optional[float]) -> Optional[float]:
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT level, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                available = self._refill(limit, *row, now) if row else limit.burst
+                wait = self._plan(limit, available, tokens, max_wait)
+                if wait is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO rate_buckets (key, level, updated_at) VALUES (?, ?, ?)",
+                        (key, available - tokens, now)
+                    )
+                self._conn.execute("COMMIT")
+                return wait
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def _reserve(self, key, limit, tokens, max_wait):
+        return await asyncio.to_thread(self._reserve_sync, key, limit, tokens, max_wait)
+
+    def _time_until(self, key, limit, tokens):
+        with self._db_lock:
+            row = self._conn.execute("SELECT level, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+        available = self._refill(limit, *row, time.time()) if row else limit.burst
+        return max(0.0, (tokens - available) / limit.rate)
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
+
+def create_rate_limiter(backend: str = "sqlite", limits: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+                        db_path: Path = Path("data") / "rate_limits.db") -> RateLimiter:
+    """Crée le limiteur configuré ("sqlite" = partagé entre processus, "memory" = local)"""
+    if backend == "memory":
+        return MemoryRateLimiter(limits)
+    if backend == "sqlite":
+        return SQLiteRateLimiter(db_path, limits)
+    raise ValueError(f"Backend de limitation non supporté: {backend}")
+
+_shared_limiter: Optional[RateLimiter] = None
+
+def get_rate_limiter() -> RateLimiter:
+    """Limiteur partagé par les agents du processus, configuré par RATE_LIMITS"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        from config.settings import RATE_LIMITS
+        _shared_limiter = create_rate_limiter(
+            RATE_LIMITS.get("backend", "sqlite"),
+            RATE_LIMITS.get("limits", {}),
+            Path(RATE_LIMITS.get("db_path", Path("data") / "rate_limits.db"))
+        )
+    return _shared_limiter
@@ -0,0 +1,46 @@
+"""
+iFiveMe Marketing MVP - Enregistrements compacts
+Dataclasses à __slots__ et sérialisation rapide pour les objets détenus en grand nombre
+"""
+
+import sys
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Dict, Any, Tuple
+
+# Les slots de dataclass n'existent qu'à partir de Python 3.10 (web_approval tourne en 3.9)
+_SLOTS_SUPPORTED = sys.version_info >= (3, 10)
+
+_field_names_cache: Dict[type, Tuple[str, ...]] = {}
+
+def record(cls=None, **kwargs):
+    """Décorateur @dataclass avec __slots__ (sans __dict__ par instance) quand c'est possible"""
+    if _SLOTS_SUPPORTED:
+        kwargs.setdefault("slots", True)
+
+    def wrap(klass):
+        return dataclass(klass, **kwargs)
+
+    return wrap if cls is None else wrap(cls)
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    names = _field_names_cache.get(cls)
+    if names is None:
+        names = tuple(f.name for f in fields(cls))
+        _field_names_cache[cls] = names
+    return names
+
+def _convert(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return record_to_dict(value)
+    if isinstance(value, list) and value and is_dataclass(value[0]):
+        return [_convert(item) for item in value]
+    return value
+
+def record_to_dict(obj: Any) -> Dict[str, Any]:
+    """Équivalent de dataclasses.asdict sans copie profonde
+
+    Les dataclasses imbriquées (y compris dans une liste) sont converties,
+    mais les dict et listes de valeurs simples sont partagés avec l'objet:
+    le résultat est destiné à la sérialisation (JSON, SQLite), pas à être modifié.
+    """
+    return {name: _convert(getattr(obj, name)) for name in _field_names(type(obj))}
@@ -0,0 +1,53 @@
+"""
+iFiveMe Marketing MVP - Cache des résultats de tâches
+Cache LRU borné avec expiration (TTL) et clés d'idempotence
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+def make_idempotency_key(task_type: str, data: Dict[str, Any]) -> str:
+    """Calcule une clé d'idempotence stable pour un type de tâche et ses données"""
+    payload = json.dumps({"type": task_type, "data": data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class TTLResultCache:
+    """Cache LRU borné dont les entrées expirent après ttl secondes"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne le résultat en cache ou None s'il est absent ou expiré"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Ajoute un résultat, en évinçant l'entrée la moins récemment utilisée"""
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
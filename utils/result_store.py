@@ -0,0 +1,221 @@
+"""
+iFiveMe Marketing MVP - Stockage des résultats de tâches
+Stores pluggables pour persister les résultats des agents hors de la boucle d'événements
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+class TaskResultStore(ABC):
+    """Interface commune des stores de résultats de tâches"""
+
+    @abstractmethod
+    async def save(self, record: Dict[str, Any]):
+        """Enregistre le résultat sérialisé d'une tâche"""
+        pass
+
+    @abstractmethod
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne le résultat d'une tâche par son ID"""
+        pass
+
+    @abstractmethod
+    async def query(self, task_type: Optional[str] = None, status: Optional[str] = None,
+                    limit: int = 100) -> List[Dict[str, Any]]:
+        """Recherche des résultats par type et/ou statut (plus récents d'abord)"""
+        pass
+
+    async def flush(self):
+        """Force l'écriture des résultats en attente"""
+        pass
+
+    async def apply_retention(self, max_age_days: int) -> int:
+        """Supprime les résultats plus vieux que max_age_days, retourne le nombre supprimé"""
+        return 0
+
+    async def compact(self):
+        """Récupère l'espace disque libéré par les suppressions"""
+        pass
+
+    async def close(self):
+        """Ferme le store proprement"""
+        await self.flush()
+
+class JsonFileResultStore(TaskResultStore):
+    """Store historique: un fichier task_<id>_result.json par tâche"""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, record: Dict[str, Any]):
+        result_file = self.data_dir / f"task_{record['id']}_result.json"
+        with open(result_file, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2, default=str, ensure_ascii=False)
+
+    async def save(self, record: Dict[str, Any]):
+        await asyncio.to_thread(self._write, record)
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        result_file = self.data_dir / f"task_{task_id}_result.json"
+        if not result_file.exists():
+            return None
+        return json.loads(await asyncio.to_thread(result_file.read_text, encoding='utf-8'))
+
+    async def query(self, task_type: Optional[str] = None, status: Optional[str] = None,
+                    limit: int = 100) -> List[Dict[str, Any]]:
+        def _scan() -> List[Dict[str, Any]]:
+            matches = []
+            files = sorted(self.data_dir.glob("task_*_result.json"), reverse=True)
+            for result_file in files:
+                record = json.loads(result_file.read_text(encoding='utf-8'))
+                if task_type and record.get("type") != task_type:
+                    continue
+                if status and record.get("status") != status:
+                    continue
+                matches.append(record)
+                if len(matches) >= limit:
+                    break
+            return matches
+
+        return await asyncio.to_thread(_scan)
+
+class SQLiteResultStore(TaskResultStore):
+    """Store append-only sur SQLite (mode WAL) avec écritures bufferisées par lots
+
+    Les résultats sont accumulés en mémoire puis écrits en une seule
+    transaction dans un thread dédié, soit quand le buffer atteint
+    batch_size, soit après flush_interval secondes.
+    """
+
+    def __init__(self, db_path: Path, batch_size: int = 100, flush_interval: float = 1.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(f"result_store.{self.db_path.parent.name}")
+
+        self._buffer: List[tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._db_lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS task_results (
+                task_id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                saved_at TEXT NOT NULL,
+                payload TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_type ON task_results(type, saved_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_status ON task_results(status, saved_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_saved_at ON task_results(saved_at)")
+        self._conn.commit()
+
+    async def save(self, record: Dict[str, Any]):
+        self._buffer.append((
+            str(record["id"]),
+            str(record.get("type", "")),
+            str(record.get("status", "")),
+            str(record.get("created_at", "")),
+            datetime.now().isoformat(),
+            json.dumps(record, default=str, ensure_ascii=False)
+        ))
+
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    def _write_batch(self, rows: List[tuple]):
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO task_results VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write_batch, rows)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'écriture de {len(rows)} résultats: {str(e)}")
+
+    def _fetch(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._db_lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        await self.flush()
+        rows = await asyncio.to_thread(
+            self._fetch, "SELECT payload FROM task_results WHERE task_id = ?", (task_id,)
+        )
+        return rows[0] if rows else None
+
+    async def query(self, task_type: Optional[str] = None, status: Optional[str] = None,
+                    limit: int = 100) -> List[Dict[str, Any]]:
+        await self.flush()
+        clauses, params = [], []
+        if task_type:
+            clauses.append("type = ?")
+            params.append(task_type)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT payload FROM task_results {where} ORDER BY saved_at DESC LIMIT ?"
+        return await asyncio.to_thread(self._fetch, sql, tuple(params) + (limit,))
+
+    async def apply_retention(self, max_age_days: int) -> int:
+        await self.flush()
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+
+        def _delete() -> int:
+            with self._db_lock:
+                cursor = self._conn.execute("DELETE FROM task_results WHERE saved_at < ?", (cutoff,))
+                self._conn.commit()
+                return cursor.rowcount
+
+        return await asyncio.to_thread(_delete)
+
+    async def compact(self):
+        await self.flush()
+
+        def _vacuum():
+            with self._db_lock:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._conn.execute("VACUUM")
+
+        await asyncio.to_thread(_vacuum)
+
+    async def close(self):
+        await self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+def create_result_store(kind: str, data_dir: Path, **options) -> TaskResultStore:
+    """Crée le store de résultats configuré pour un agent"""
+    if kind == "json":
+        return JsonFileResultStore(data_dir)
+    if kind == "sqlite":
+        return SQLiteResultStore(Path(data_dir) / "task_results.db", **options)
+    raise ValueError(f"Store de résultats non supporté: {kind}")
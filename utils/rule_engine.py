@@ -0,0 +1,154 @@
+"""
+iFiveMe Marketing MVP - Moteur de règles compilées
+Transforme les conditions texte des règles d'automatisation en prédicats évalués par lots
+"""
+
+import ast
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+# Seuls ces nœuds sont autorisés dans une condition (pas d'appel, d'attribut ni d'indexation)
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow,
+    ast.Compare, ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq,
+    ast.Name, ast.Load, ast.Constant
+)
+
+class RuleCompileError(ValueError):
+    """Condition de règle invalide"""
+
+@dataclass
+class CompiledRule:
+    """Règle d'automatisation dont la condition est compilée"""
+    name: str
+    condition: str
+    action: str
+    parameters: Dict[str, Any]
+    variables: Tuple[str, ...]  # Métriques lues par la condition, dans l'ordre des arguments
+    predicate: Callable[..., bool]  # Évaluation sur une campagne: predicate(*valeurs)
+    batch: Callable[[Dict[str, List[float]]], List[int]]  # Indices des campagnes qui matchent
+    definition: Dict[str, Any] = field(default_factory=dict)
+
+class _BindParameters(ast.NodeTransformer):
+    """Remplace les paramètres par leur valeur et renomme les métriques en arguments"""
+
+    def __init__(self, constants: Dict[str, Any]):
+        self.constants = constants
+        self.variables: List[str] = []
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.constants:
+            return ast.copy_location(ast.Constant(self.constants[node.id]), node)
+        if node.id not in self.variables:
+            self.variables.append(node.id)
+        return ast.copy_location(ast.Name(id=f"_v{self.variables.index(node.id)}", ctx=ast.Load()), node)
+
+def compile_condition(condition: str, constants: Optional[Dict[str, Any]] = None
+                      ) -> Tuple[Tuple[str, ...], Callable[..., bool], Callable[[Dict[str, List[float]]], List[int]]]:
+    """Compile une condition ("roi > scaling_threshold and clicks >= 100")
+
+    Les noms présents dans constants (paramètres de la règle) sont remplacés par
+    leur valeur; les autres sont des métriques de campagne. Retourne les
+    métriques lues, le prédicat unitaire et la fonction d'évaluation par lot.
+    """
+    try:
+        tree = ast.parse(condition, mode="eval")
+    except SyntaxError as e:
+        raise RuleCompileError(f"Condition invalide '{condition}': {e.msg}") from e
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise RuleCompileError(f"Élément non autorisé dans '{condition}': {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, bool)):
+            raise RuleCompileError(f"Constante non numérique dans '{condition}': {node.value!r}")
+
+    binder = _BindParameters(constants or {})
+    expression = ast.unparse(binder.visit(tree).body)
+    args = [f"_v{i}" for i in range(len(binder.variables))]
+
+    # Le lot parcourt les colonnes de métriques en une seule compréhension de liste
+    if args:
+        columns = ", ".join(f"_c[{name!r}]" for name in binder.variables)
+        batch_source = (
+            f"lambda _c: [_i for _i, ({', '.join(args)},) in enumerate(zip({columns})) if {expression}]"
+        )
+    else:
+        batch_source = f"lambda _c, _n=None: list(range(_n)) if {expression} else []"
+
+    namespace: Dict[str, Any] = {"__builtins__": {"bool": bool, "enumerate": enumerate, "zip": zip, "list": list, "range": range}}
+    predicate = eval(compile(f"lambda {', '.join(args)}: bool({expression})", "<rule>", "eval"), namespace)
+    batch = eval(compile(batch_source, "<rule>", "eval"), namespace)
+    return tuple(binder.variables), predicate, batch
+
+class RuleEngine:
+    """Évalue un ensemble de règles compilées sur une ou plusieurs campagnes
+
+    Les conditions sont compilées une seule fois; ajouter une règle ne demande
+    qu'une nouvelle définition (nom, condition, action, paramètres). Une
+    métrique absente pour une campagne vaut default_value.
+    """
+
+    def __init__(self, rules: Iterable[Dict[str, Any]] = (), constants: Optional[Dict[str, Any]] = None,
+                 default_value: float = 0.0):
+        self.logger = logging.getLogger("rule_engine")
+        self.constants = constants or {}
+        self.default_value = default_value
+        self.rules: List[CompiledRule] = []
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: Dict[str, Any]) -> CompiledRule:
+        """Compile et ajoute une règle (RuleCompileError si la condition est invalide)"""
+        parameters = rule.get("parameters", {})
+        variables, predicate, batch = compile_condition(rule["condition"], {**self.constants, **parameters})
+        compiled = CompiledRule(
+            name=rule["name"],
+            condition=rule["condition"],
+            action=rule.get("action", ""),
+            parameters=parameters,
+            variables=variables,
+            predicate=predicate,
+            batch=batch,
+            definition=rule
+        )
+        self.rules = [r for r in self.rules if r.name != compiled.name] + [compiled]
+        return compiled
+
+    def remove_rule(self, name: str):
+        self.rules = [r for r in self.rules if r.name != name]
+
+    @property
+    def metrics(self) -> List[str]:
+        """Métriques lues par l'ensemble des règles"""
+        return list(dict.fromkeys(v for rule in self.rules for v in rule.variables))
+
+    def evaluate(self, metrics: Dict[str, float]) -> List[CompiledRule]:
+        """Règles déclenchées pour une campagne"""
+        return [rule for rule in self.rules if self._matches(rule, metrics)]
+
+    def _matches(self, rule: CompiledRule, metrics: Dict[str, float]) -> bool:
+        try:
+            return rule.predicate(*(metrics.get(v, self.default_value) for v in rule.variables))
+        except (ArithmeticError, TypeError) as e:
+            self.logger.warning(f"Règle {rule.name} non évaluable: {str(e)}")
+            return False
+
+    def evaluate_batch(self, campaigns: Dict[str, Dict[str, float]]) -> Dict[str, List[CompiledRule]]:
+        """Règles déclenchées pour chaque campagne, évaluées colonne par colonne"""
+        ids = list(campaigns)
+        rows = [campaigns[campaign_id] for campaign_id in ids]
+        default = self.default_value
+        columns = {metric: [row.get(metric, default) for row in rows] for metric in self.metrics}
+
+        matches: Dict[str, List[CompiledRule]] = {campaign_id: [] for campaign_id in ids}
+        for rule in self.rules:
+            try:
+                indices = rule.batch(columns) if rule.variables else rule.batch(columns, len(ids))
+            except (ArithmeticError, TypeError):
+                # Une valeur invalide (division par zéro...) ne doit pas bloquer tout le lot
+                indices = [i for i, row in enumerate(rows) if self._matches(rule, row)]
+            for index in indices:
+                matches[ids[index]].append(rule)
+        return matches
@@ -0,0 +1,381 @@
+"""
+iFiveMe Marketing MVP - Planificateur de tâches récurrentes et différées
+Tas binaire piloté par une seule coroutine, avec jitter, politiques de rattrapage et persistance SQLite
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Union
+
+JobCallback = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# Politiques appliquées quand une échéance a été manquée (processus arrêté, boucle bloquée)
+MISFIRE_SKIP = "skip"            # Ignorer les échéances manquées, reprendre à la prochaine
+MISFIRE_FIRE_ONCE = "fire_once"  # Une seule exécution de rattrapage
+MISFIRE_FIRE_ALL = "fire_all"    # Une exécution par échéance manquée (bornée par max_catchup)
+
+@dataclass
+class ScheduledJob:
+    """Job planifié: ponctuel (interval None) ou récurrent"""
+    id: str
+    callback: str  # Nom du callback enregistré (le job reste ainsi persistable)
+    base_time: float  # Échéance théorique (epoch), sans jitter
+    interval: Optional[float] = None
+    jitter: float = 0.0
+    misfire_policy: str = MISFIRE_FIRE_ONCE
+    misfire_grace: float = 1.0  # Retard toléré (secondes) avant d'appliquer la politique
+    max_catchup: int = 10
+    exclusive: bool = True  # Avec une base partagée, un seul processus exécute chaque échéance
+    payload: Dict[str, Any] = field(default_factory=dict)
+    run_at: float = 0.0  # Échéance effective (base_time + jitter)
+    runs: int = 0
+    last_run: Optional[float] = None
+
+    def __post_init__(self):
+        if not self.run_at:
+            self.run_at = self.base_time + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+class JobScheduler:
+    """Planificateur en processus
+
+    Les jobs sont rangés dans un tas par échéance; une seule coroutine dort
+    jusqu'à la prochaine échéance (ou jusqu'à l'ajout d'un job plus proche).
+    Les callbacks sont lancés dans leur propre tâche: un job lent ne retarde
+    pas les autres, et un job récurrent encore en cours n'est pas relancé.
+    Avec db_path, le planning est persisté et rechargé au démarrage. Plusieurs
+    processus (workers du serveur web) peuvent partager la base: avant chaque
+    exécution d'un job exclusif, le processus prend un bail sur ce job dans
+    job_leases; tant que le bail d'un autre processus est valide, l'échéance
+    est sautée localement. Les jobs qui traitent un état propre au processus
+    sont planifiés avec exclusive=False.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, lease_ttl: float = 60.0):
+        self.logger = logging.getLogger("scheduler")
+        self._callbacks: Dict[str, JobCallback] = {}
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._parked: Dict[str, set] = {}  # Callback non enregistré -> jobs échus en attente
+        self._driver: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_ttl = lease_ttl
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if db_path is not None:
+            db_path = Path(db_path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_leases (
+                    job_id TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            self._load_jobs()
+
+    # Enregistrement et planification
+
+    def register(self, name: str, callback: JobCallback):
+        """Associe un nom de callback à une coroutine callback(payload)
+
+        Les jobs échus mis en attente faute de ce callback sont replanifiés,
+        puis le driver démarre (jobs rechargés de la base).
+        """
+        self._callbacks[name] = callback
+        for job_id in self._parked.pop(name, ()):
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._push(job)
+        self.ensure_started()
+
+    def schedule_at(self, job_id: str, callback: str, when: Union[datetime, float],
+                    payload: Optional[Dict[str, Any]] = None, replace: bool = True, **options) -> ScheduledJob:
+        """Planifie une exécution ponctuelle à une date donnée"""
+        base_time = when.timestamp() if isinstance(when, datetime) else float(when)
+        return self._add(ScheduledJob(id=job_id, callback=callback, base_time=base_time,
+                                      payload=payload or {}, **options), replace)
+
+    def schedule_in(self, job_id: str, callback: str, delay: float,
+                    payload: Optional[Dict[str, Any]] = None, replace: bool = True, **options) -> ScheduledJob:
+        """Planifie une exécution ponctuelle dans delay secondes"""
+        return self.schedule_at(job_id, callback, time.time() + delay, payload, replace, **options)
+
+    def schedule_every(self, job_id: str, callback: str, interval: float,
+                       payload: Optional[Dict[str, Any]] = None, start_in: Optional[float] = None,
+                       replace: bool = True, **options) -> ScheduledJob:
+        """Planifie une exécution récurrente toutes les interval secondes"""
+        first = time.time() + (interval if start_in is None else start_in)
+        return self._add(ScheduledJob(id=job_id, callback=callback, base_time=first, interval=interval,
+                                      payload=payload or {}, **options), replace)
+
+    def cancel(self, job_id: str) -> bool:
+        """Annule un job (l'entrée du tas est ignorée lorsqu'elle sort)"""
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+        self._delete(job_id)
+        return True
+
+    def get_job(self, job_id: str) -> Optional[ScheduledJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[ScheduledJob]:
+        """Jobs planifiés, par échéance"""
+        return sorted(self._jobs.values(), key=lambda job: job.run_at)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _add(self, job: ScheduledJob, replace: bool) -> ScheduledJob:
+        existing = self._jobs.get(job.id)
+        if existing is not None and not replace:
+            # Job déjà planifié (souvent rechargé de la base): le driver doit tourner
+            self.ensure_started()
+            return existing
+        self._jobs[job.id] = job
+        self._parked.get(job.callback, set()).discard(job.id)
+        self._push(job)
+        self._persist(job)
+        self.ensure_started()
+        return job
+
+    def _push(self, job: ScheduledJob):
+        heapq.heappush(self._heap, (job.run_at, next(self._sequence), job.id, job))
+        # Réveiller le driver si ce job passe en tête
+        if self._wakeup is not None and self._heap[0][3] is job:
+            self._wakeup.set()
+
+    # Boucle d'exécution
+
+    def ensure_started(self):
+        """Démarre la coroutine du planificateur sur la boucle courante, si besoin"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Pas de boucle: le driver démarrera au prochain appel dans une boucle
+        if self._driver is None or self._driver.done() or self._driver.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._driver = loop.create_task(self._run())
+
+    async def stop(self):
+        """Arrête le planificateur (le planning persisté est conservé)"""
+        if self._driver is not None:
+            self._driver.cancel()
+            try:
+                await self._driver
+            except asyncio.CancelledError:
+                pass
+            self._driver = None
+        for task in list(self._running.values()):
+            task.cancel()
+        self._release_leases()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._next_delay()
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.run_pending()
+
+    def _next_delay(self) -> Optional[float]:
+        while self._heap:
+            run_at, _, job_id, job = self._heap[0]
+            if self._jobs.get(job_id) is not job or job.run_at != run_at:
+                heapq.heappop(self._heap)  # Entrée obsolète (job annulé ou replanifié)
+                continue
+            return max(0.0, run_at - time.time())
+        return None
+
+    def run_pending(self) -> int:
+        """Lance tous les jobs échus; retourne le nombre d'exécutions lancées"""
+        launched = 0
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            run_at, _, job_id, job = heapq.heappop(self._heap)
+            if self._jobs.get(job_id) is not job or job.run_at != run_at:
+                continue
+            launched += self._fire(job, now)
+        return launched
+
+    def _fire(self, job: ScheduledJob, now: float) -> int:
+        if job.callback not in self._callbacks:
+            # Callback propre à un autre processus (ou pas encore enregistré): le job reste
+            # persisté, sans bail ni avancement, jusqu'à register() dans ce processus
+            self._parked.setdefault(job.callback, set()).add(job.id)
+            self.logger.debug(f"Job {job.id} en attente du callback '{job.callback}'")
+            return 0
+
+        late = now - job.run_at
+        missed = 0
+        if job.interval:
+            missed = int((now - job.base_time) // job.interval)
+
+        if late <= job.misfire_grace or job.misfire_policy == MISFIRE_FIRE_ONCE:
+            executions = 1
+        elif job.misfire_policy == MISFIRE_FIRE_ALL:
+            executions = min(missed + 1, job.max_catchup) if job.interval else 1
+        else:
+            executions = 0
+            self.logger.warning(f"Job {job.id} ignoré: échéance manquée de {late:.1f}s")
+
+        if executions and self._claim(job, now):
+            self._launch(job, executions)
+
+        if job.interval:
+            # Prochaine échéance sur la grille initiale, après maintenant
+            job.base_time += job.interval * (missed + 1)
+            job.run_at = job.base_time + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+            self._push(job)
+            self._persist(job)
+        else:
+            del self._jobs[job.id]
+            self._delete(job.id)
+        return executions
+
+    def _launch(self, job: ScheduledJob, executions: int = 1):
+        callback = self._callbacks.get(job.callback)
+        if callback is None:
+            self.logger.warning(f"Aucun callback '{job.callback}' enregistré pour le job {job.id}")
+            return
+        running = self._running.get(job.id)
+        if job.interval and running is not None and not running.done():
+            self.logger.warning(f"Job {job.id} encore en cours: exécution ignorée")
+            return
+
+        job.runs += executions
+        job.last_run = time.time()
+        task = asyncio.get_running_loop().create_task(self._execute(job, callback, executions))
+        self._running[job.id] = task
+        task.add_done_callback(lambda _, job_id=job.id: self._running.pop(job_id, None))
+
+    async def _execute(self, job: ScheduledJob, callback: JobCallback, executions: int):
+        # Les rattrapages (fire_all) s'exécutent l'un après l'autre
+        for _ in range(executions):
+            try:
+                await callback(job.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Erreur dans le job {job.id} ({job.callback}): {str(e)}")
+
+    # Bail d'exécution (base partagée entre processus)
+
+    def _claim(self, job: ScheduledJob, now: float) -> bool:
+        """Prend (ou renouvelle) le bail du job; False si un autre processus le détient"""
+        if self._conn is None or not job.exclusive:
+            return True
+        # Un job récurrent garde son bail deux intervalles: si son détenteur
+        # s'arrête, un autre processus reprend le job à l'échéance suivante
+        ttl = max(self.lease_ttl, 2 * job.interval) if job.interval else self.lease_ttl
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT owner, expires_at FROM job_leases WHERE job_id = ?", (job.id,)
+                ).fetchone()
+                claimed = row is None or row[0] == self.owner or row[1] <= now
+                if claimed:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO job_leases (job_id, owner, expires_at) VALUES (?, ?, ?)",
+                        (job.id, self.owner, now + ttl)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if not claimed:
+            self.logger.debug(f"Job {job.id} exécuté par un autre processus ({row[0]})")
+        return claimed
+
+    def _release_leases(self):
+        """Rend les baux du processus (arrêt propre): un autre processus reprend sans attendre"""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM job_leases WHERE owner = ?", (self.owner,))
+
+    # Persistance
+
+    def _persist(self, job: ScheduledJob):
+        if self._conn is None:
+            return
+        payload = json.dumps({
+            "id": job.id, "callback": job.callback, "base_time": job.base_time,
+            "interval": job.interval, "jitter": job.jitter, "misfire_policy": job.misfire_policy,
+            "misfire_grace": job.misfire_grace, "max_catchup": job.max_catchup, "exclusive": job.exclusive,
+            "payload": job.payload, "run_at": job.run_at, "runs": job.runs, "last_run": job.last_run
+        }, default=str, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scheduled_jobs (job_id, payload) VALUES (?, ?)", (job.id, payload)
+            )
+
+    def _delete(self, job_id: str):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM scheduled_jobs WHERE job_id = ?", (job_id,))
+
+    def _load_jobs(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM scheduled_jobs").fetchall()
+        for (payload,) in rows:
+            job = ScheduledJob(**json.loads(payload))
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (job.run_at, next(self._sequence), job.id, job))
+        if rows:
+            self.logger.info(f"{len(rows)} jobs planifiés rechargés")
+
+    def close(self):
+        if self._conn is not None:
+            self._release_leases()
+            self._conn.close()
+            self._conn = None
+
+_shared_scheduler: Optional[JobScheduler] = None
+
+def get_scheduler(db_path: Optional[Path] = None) -> JobScheduler:
+    """Planificateur partagé par les agents du processus (une seule coroutine)
+
+    Le planning est stocké dans DATA_DIR/scheduler.db, indépendamment du
+    répertoire courant; les processus qui le partagent se répartissent les
+    échéances par bail.
+    """
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        if db_path is None:
+            from config.settings import DATA_DIR
+            db_path = DATA_DIR / "scheduler.db"
+        _shared_scheduler = JobScheduler(db_path)
+    _shared_scheduler.ensure_started()
+    return _shared_scheduler
@@ -0,0 +1,272 @@
+"""
+iFiveMe Marketing MVP - Stockage de séries temporelles
+Colonnes array('d') par (campagne, canal, métrique), agrégats minute/heure/jour maintenus à l'insertion
+"""
+
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Union
+
+SeriesKey = Tuple[str, str, str]  # (campaign_id, channel, metric)
+Timestamp = Union[datetime, float, None]
+
+# Résolution des agrégats (secondes) et nombre de buckets conservés
+ROLLUP_RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+DEFAULT_ROLLUP_RETENTION = {"minute": 24 * 60, "hour": 90 * 24, "day": 2 * 365}
+
+# Fenêtres des périodes de rapport ("last_30_days"...)
+PERIODS = {
+    "last_hour": 3600,
+    "last_24_hours": 86400,
+    "last_7_days": 7 * 86400,
+    "last_30_days": 30 * 86400,
+    "last_90_days": 90 * 86400
+}
+
+def _to_epoch(timestamp: Timestamp) -> float:
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+class _Rollup:
+    """Agrégats d'une série à une résolution: une ligne par bucket, en colonnes"""
+
+    __slots__ = ("resolution", "retention", "start", "count", "total", "minimum", "maximum", "last")
+
+    def __init__(self, resolution: int, retention: int):
+        self.resolution = resolution
+        self.retention = retention
+        self.start = array("d")
+        self.count = array("l")
+        self.total = array("d")
+        self.minimum = array("d")
+        self.maximum = array("d")
+        self.last = array("d")
+
+    def add(self, timestamp: float, value: float):
+        bucket = timestamp - timestamp % self.resolution
+        if self.start and self.start[-1] == bucket:
+            index = len(self.start) - 1  # Cas courant: point dans le bucket le plus récent
+        else:
+            index = bisect_left(self.start, bucket)
+            if index == len(self.start) or self.start[index] != bucket:
+                for column, initial in ((self.start, bucket), (self.count, 0), (self.total, 0.0),
+                                        (self.minimum, value), (self.maximum, value), (self.last, value)):
+                    column.insert(index, initial)
+                if len(self.start) > self.retention:
+                    self._truncate(len(self.start) - self.retention)
+                    index = bisect_left(self.start, bucket)
+                    if index == len(self.start) or self.start[index] != bucket:
+                        return  # Bucket plus ancien que la rétention
+
+        self.count[index] += 1
+        self.total[index] += value
+        if value < self.minimum[index]:
+            self.minimum[index] = value
+        if value > self.maximum[index]:
+            self.maximum[index] = value
+        if index == len(self.start) - 1:
+            self.last[index] = value
+
+    def _truncate(self, drop: int):
+        for column in (self.start, self.count, self.total, self.minimum, self.maximum, self.last):
+            del column[:drop]
+
+    def bounds(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        low = 0 if start is None else bisect_left(self.start, start - start % self.resolution)
+        high = len(self.start) if end is None else bisect_right(self.start, end)
+        return low, high
+
+class _Series:
+    """Points bruts d'une série (horodatage et valeur en colonnes) et ses agrégats"""
+
+    __slots__ = ("timestamps", "values", "rollups")
+
+    def __init__(self, rollup_retention: Dict[str, int]):
+        self.timestamps = array("d")
+        self.values = array("d")
+        self.rollups = {
+            name: _Rollup(resolution, rollup_retention[name]) for name, resolution in ROLLUP_RESOLUTIONS.items()
+        }
+
+class TimeSeriesStore:
+    """Historique de performance compact, interrogeable par plage de temps
+
+    Chaque série (campagne, canal, métrique) stocke ses points dans deux
+    colonnes array('d') (16 octets par point) bornées à max_raw_points, et
+    met à jour ses agrégats minute/heure/jour à chaque insertion: un rapport
+    lit quelques buckets au lieu de reparcourir l'historique.
+    """
+
+    def __init__(self, max_raw_points: int = 10_000, rollup_retention: Optional[Dict[str, int]] = None):
+        self.max_raw_points = max_raw_points
+        self.rollup_retention = {**DEFAULT_ROLLUP_RETENTION, **(rollup_retention or {})}
+        self._series: Dict[SeriesKey, _Series] = {}
+        self._by_campaign: Dict[str, Dict[SeriesKey, None]] = {}
+        self.points_recorded = 0
+
+    # Écriture
+
+    def record(self, campaign_id: str, channel: str, metric: str, value: float, timestamp: Timestamp = None):
+        """Ajoute un point à une série"""
+        key = (campaign_id, channel, metric)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(self.rollup_retention)
+            self._by_campaign.setdefault(campaign_id, {})[key] = None
+
+        ts = _to_epoch(timestamp)
+        value = float(value)
+        if not series.timestamps or ts >= series.timestamps[-1]:
+            series.timestamps.append(ts)
+            series.values.append(value)
+        else:
+            index = bisect_right(series.timestamps, ts)
+            series.timestamps.insert(index, ts)
+            series.values.insert(index, value)
+
+        # Éviction par blocs pour amortir le décalage des colonnes
+        if len(series.timestamps) > self.max_raw_points:
+            drop = max(1, self.max_raw_points // 10)
+            del series.timestamps[:drop]
+            del series.values[:drop]
+
+        for rollup in series.rollups.values():
+            rollup.add(ts, value)
+        self.points_recorded += 1
+
+    def record_channels(self, campaign_id: str, channels: Dict[str, Dict[str, Any]], timestamp: Timestamp = None):
+        """Enregistre les métriques numériques de chaque canal ({canal: {métrique: valeur}})"""
+        ts = _to_epoch(timestamp)
+        for channel, metrics in channels.items():
+            for metric, value in metrics.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.record(campaign_id, channel, metric, value, ts)
+
+    def drop_campaign(self, campaign_id: str):
+        for key in self._by_campaign.pop(campaign_id, {}):
+            del self._series[key]
+
+    # Lecture
+
+    def series_keys(self, campaign_id: Optional[str] = None, channel: Optional[str] = None,
+                    metric: Optional[str] = None) -> List[SeriesKey]:
+        keys: Iterable[SeriesKey] = self._by_campaign.get(campaign_id, {}) if campaign_id is not None else self._series
+        return [key for key in keys
+                if (channel is None or key[1] == channel) and (metric is None or key[2] == metric)]
+
+    def has_campaign(self, campaign_id: str) -> bool:
+        return campaign_id in self._by_campaign
+
+    def range(self, campaign_id: str, channel: str, metric: str,
+              start: Timestamp = None, end: Timestamp = None) -> List[Tuple[float, float]]:
+        """Points bruts (horodatage, valeur) de la plage [start, end]"""
+        series = self._series.get((campaign_id, channel, metric))
+        if series is None:
+            return []
+        low = 0 if start is None else bisect_left(series.timestamps, _to_epoch(start))
+        high = len(series.timestamps) if end is None else bisect_right(series.timestamps, _to_epoch(end))
+        return list(zip(series.timestamps[low:high], series.values[low:high]))
+
+    def latest(self, campaign_id: str, channel: str, metric: str) -> Optional[float]:
+        series = self._series.get((campaign_id, channel, metric))
+        if series is None or not series.values:
+            return None
+        return series.values[-1]
+
+    def rollup(self, campaign_id: str, channel: str, metric: str, resolution: str = "hour",
+               start: Timestamp = None, end: Timestamp = None) -> List[Dict[str, float]]:
+        """Buckets agrégés (start, count, sum, min, max, avg, last) de la plage"""
+        series = self._series.get((campaign_id, channel, metric))
+        if series is None:
+            return []
+        rollup = series.rollups[resolution]
+        low, high = rollup.bounds(None if start is None else _to_epoch(start),
+                                  None if end is None else _to_epoch(end))
+        return [
+            {
+                "start": rollup.start[i],
+                "count": rollup.count[i],
+                "sum": rollup.total[i],
+                "min": rollup.minimum[i],
+                "max": rollup.maximum[i],
+                "avg": rollup.total[i] / rollup.count[i] if rollup.count[i] else 0.0,
+                "last": rollup.last[i]
+            }
+            for i in range(low, high)
+        ]
+
+    def summarize(self, campaign_id: str, channel: str, metric: str, resolution: str = "day",
+                  start: Timestamp = None, end: Timestamp = None) -> Optional[Dict[str, float]]:
+        """Statistiques d'une série sur la plage, calculées à partir des agrégats"""
+        series = self._series.get((campaign_id, channel, metric))
+        if series is None:
+            return None
+        rollup = series.rollups[resolution]
+        low, high = rollup.bounds(None if start is None else _to_epoch(start),
+                                  None if end is None else _to_epoch(end))
+        if low >= high:
+            return None
+
+        count = sum(rollup.count[low:high])
+        if not count:
+            return None
+        first_avg = rollup.total[low] / rollup.count[low]
+        last_avg = rollup.total[high - 1] / rollup.count[high - 1]
+        return {
+            "count": count,
+            "avg": sum(rollup.total[low:high]) / count,
+            "min": min(rollup.minimum[low:high]),
+            "max": max(rollup.maximum[low:high]),
+            "last": rollup.last[high - 1],
+            # Variation relative entre le premier et le dernier bucket de la plage
+            "trend": (last_avg - first_avg) / abs(first_avg) if first_avg else 0.0
+        }
+
+    def summarize_campaign(self, campaign_id: str, resolution: str = "day",
+                           start: Timestamp = None, end: Timestamp = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{canal: {métrique: statistiques}} pour toutes les séries d'une campagne"""
+        summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for _, channel, metric in self.series_keys(campaign_id):
+            stats = self.summarize(campaign_id, channel, metric, resolution, start, end)
+            if stats is not None:
+                summary.setdefault(channel, {})[metric] = stats
+        return summary
+
+    def aggregate(self, metric: str, channel: Optional[str] = None, resolution: str = "day",
+                  start: Timestamp = None, end: Timestamp = None) -> Dict[str, Dict[str, float]]:
+        """Moyenne et dernière valeur d'une métrique par canal, toutes campagnes confondues"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for campaign_id, key_channel, _ in self.series_keys(channel=channel, metric=metric):
+            stats = self.summarize(campaign_id, key_channel, metric, resolution, start, end)
+            if stats is None:
+                continue
+            entry = totals.setdefault(key_channel, {"campaigns": 0, "avg_sum": 0.0, "last_sum": 0.0, "trend_sum": 0.0})
+            entry["campaigns"] += 1
+            entry["avg_sum"] += stats["avg"]
+            entry["last_sum"] += stats["last"]
+            entry["trend_sum"] += stats["trend"]
+        return {
+            key_channel: {
+                "campaigns": entry["campaigns"],
+                "avg": entry["avg_sum"] / entry["campaigns"],
+                "last": entry["last_sum"] / entry["campaigns"],
+                "trend": entry["trend_sum"] / entry["campaigns"]
+            }
+            for key_channel, entry in totals.items()
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "series": len(self._series),
+            "campaigns": len(self._by_campaign),
+            "points_recorded": self.points_recorded,
+            "raw_points": sum(len(series.timestamps) for series in self._series.values())
+        }
+
+    def __len__(self) -> int:
+        return len(self._series)
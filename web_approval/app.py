@@ -4,7 +4,6 @@ Interface web pour approuver les posts marketing en ligne 24/7
 """
 
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-import json
 import sqlite3
 import hashlib
 from datetime import datetime, timedelta
@@ -12,7 +11,6 @@ from pathlib import Path
 import os
 import sys
 import asyncio
-import requests
 
 # Configuration simplifiée pour déploiement cloud
 # sys.path.append(str(Path(__file__).parent.parent))
@@ -483,15 +481,10 @@ async def generate_instant_post_content(platform: str, topic: str) -> dict:
         await publisher.execute_tasks()
 
         # Récupérer les résultats
-        results = []
-        for file_path in publisher.data_dir.glob("task_*_result.json"):
-            with open(file_path, 'r') as f:
-                result = json.load(f)
-                if result.get("result"):
-                    results.append(result["result"])
+        saved = await publisher.get_task_result(task.id)
 
         await publisher.stop()
-        return results[-1] if results else {"error": "Génération échouée"}
+        return saved["result"] if saved and saved.get("result") else {"error": "Génération échouée"}
 
     except Exception as e:
         return {"error": f"Erreur génération: {str(e)}"}